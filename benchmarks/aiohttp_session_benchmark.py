@@ -0,0 +1,87 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import time
+import aiohttp
+import aiohttp.web
+
+import octobot_commons.aiohttp_util as aiohttp_util
+
+REQUESTS = 500
+
+
+async def _new_session_per_request(url):
+    for _ in range(REQUESTS):
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url) as resp:
+                await resp.read()
+
+
+async def _shared_connector_session_per_request(url):
+    manager = aiohttp_util.get_client_session_manager()
+    for _ in range(REQUESTS):
+        async with manager.session() as session:
+            async with session.get(url) as resp:
+                await resp.read()
+
+
+async def _shared_session(url):
+    async with aiohttp_util.get_client_session_manager().session() as session:
+        for _ in range(REQUESTS):
+            async with session.get(url) as resp:
+                await resp.read()
+
+
+async def _measure(name, func, url):
+    t0 = time.perf_counter()
+    await func(url)
+    elapsed = time.perf_counter() - t0
+    print(
+        f"{name:<36} {elapsed * 1000:8.1f}ms ({elapsed / REQUESTS * 1e6:6.1f}us/request)"
+    )
+
+
+async def run():
+    """
+    Print the duration of repeated requests to a local server for each session strategy
+    """
+
+    async def _handler(_):
+        return aiohttp.web.Response(text="ok")
+
+    app = aiohttp.web.Application()
+    app.router.add_get("/", _handler)
+    runner = aiohttp.web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = aiohttp.web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    url = f"http://127.0.0.1:{runner.addresses[0][1]}/"
+    try:
+        print(f"{REQUESTS} sequential requests")
+        await _measure("new session per request", _new_session_per_request, url)
+        await _measure(
+            "shared connector, session per request",
+            _shared_connector_session_per_request,
+            url,
+        )
+        await _measure("shared connector, shared session", _shared_session, url)
+    finally:
+        await aiohttp_util.close_client_session_manager()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
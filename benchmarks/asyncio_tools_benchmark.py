@@ -0,0 +1,108 @@
+"""
+Compares asyncio.gather with the bounded concurrency helpers of asyncio_tools
+and RLock with FastRLock.
+Usage: python -m benchmarks.asyncio_tools_benchmark
+"""
+
+import asyncio
+import time
+import tracemalloc
+
+import octobot_commons.asyncio_tools as asyncio_tools
+
+COROS_COUNT = 20000
+MAX_CONCURRENCY = 100
+LOCK_ITERATIONS = 200000
+LOCK_CONTENDING_TASKS = 100
+
+
+async def _coro(value):
+    await asyncio.sleep(0)
+    return value
+
+
+async def _plain_gather():
+    return await asyncio.gather(*(_coro(i) for i in range(COROS_COUNT)))
+
+
+async def _bounded_gather():
+    return await asyncio_tools.gather_with_concurrency_limit(
+        *(_coro(i) for i in range(COROS_COUNT)), max_concurrency=MAX_CONCURRENCY
+    )
+
+
+async def _as_completed():
+    return [
+        result
+        async for result in asyncio_tools.iterate_as_completed(
+            (_coro(i) for i in range(COROS_COUNT)), MAX_CONCURRENCY
+        )
+    ]
+
+
+async def _task_group():
+    async with asyncio_tools.TaskGroup(max_concurrency=MAX_CONCURRENCY) as group:
+        for i in range(COROS_COUNT):
+            group.create_task(_coro(i))
+
+
+async def _measure(name, func):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    await func()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<16} {elapsed * 1000:8.1f}ms  peak memory: {peak / 1024:8.1f}KB")
+
+
+async def _uncontended_lock(lock):
+    t0 = time.perf_counter()
+    for _ in range(LOCK_ITERATIONS):
+        async with lock:
+            async with lock:
+                pass
+    return time.perf_counter() - t0
+
+
+async def _contended_lock(lock):
+    async def _locked():
+        for _ in range(LOCK_ITERATIONS // LOCK_CONTENDING_TASKS // 10):
+            async with lock:
+                await asyncio.sleep(0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_locked() for _ in range(LOCK_CONTENDING_TASKS)))
+    return time.perf_counter() - t0
+
+
+async def _measure_lock(name, lock_factory):
+    uncontended = await _uncontended_lock(lock_factory())
+    contended = await _contended_lock(lock_factory())
+    print(
+        f"{name:<16} uncontended: {uncontended * 1000:8.1f}ms  "
+        f"contended: {contended * 1000:8.1f}ms"
+    )
+
+
+async def run():
+    """
+    Print the duration and peak memory of each gathering strategy
+    and the duration of each lock implementation
+    """
+    print(f"{COROS_COUNT} coros, max concurrency: {MAX_CONCURRENCY}")
+    await _measure("gather", _plain_gather)
+    await _measure("bounded gather", _bounded_gather)
+    await _measure("as completed", _as_completed)
+    await _measure("task group", _task_group)
+    print(
+        f"{LOCK_ITERATIONS} reentrant lock acquisitions, "
+        f"{LOCK_CONTENDING_TASKS} contending tasks"
+    )
+    await _measure_lock("RLock", asyncio_tools.RLock)
+    await _measure_lock("FastRLock", asyncio_tools.FastRLock)
+    await _measure_lock("fair FastRLock", lambda: asyncio_tools.FastRLock(fair=True))
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
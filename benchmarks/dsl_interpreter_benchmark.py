@@ -0,0 +1,145 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+"""
+Compares the tree walk and flat execution backends of the DSL interpreter.
+Flat execution falls back to the tree walk on shallow expressions and is expected to be
+faster on deep ones.
+Usage, from the repository root: python -m benchmarks.dsl_interpreter_benchmark
+"""
+import ast
+import asyncio
+import time
+
+import octobot_commons.dsl_interpreter as dsl_interpreter
+
+ITERATIONS = 20000
+REPEATS = 5
+
+
+class AddOperator(dsl_interpreter.BinaryOperator):
+    SUPPORTS_FLAT_EXECUTION = True
+
+    @staticmethod
+    def get_name() -> str:
+        return ast.Add.__name__
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        left, right = self.get_computed_left_and_right_parameters()
+        return left + right
+
+
+class MultOperator(dsl_interpreter.BinaryOperator):
+    SUPPORTS_FLAT_EXECUTION = True
+
+    @staticmethod
+    def get_name() -> str:
+        return ast.Mult.__name__
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        left, right = self.get_computed_left_and_right_parameters()
+        return left * right
+
+
+class GtOperator(dsl_interpreter.CompareOperator):
+    SUPPORTS_FLAT_EXECUTION = True
+
+    @staticmethod
+    def get_name() -> str:
+        return ast.Gt.__name__
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        left, right = self.get_computed_left_and_right_parameters()
+        return left > right
+
+
+class AndOperator(dsl_interpreter.NaryOperator):
+    SUPPORTS_FLAT_EXECUTION = True
+
+    @staticmethod
+    def get_name() -> str:
+        return ast.And.__name__
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        return all(self.get_computed_parameters())
+
+
+class MaxOperator(dsl_interpreter.CallOperator):
+    SUPPORTS_FLAT_EXECUTION = True
+
+    @staticmethod
+    def get_name() -> str:
+        return "max"
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        return max(self.get_computed_parameters())
+
+
+class CloseOperator(dsl_interpreter.NameOperator):
+    @staticmethod
+    def get_name() -> str:
+        return "close"
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        return 101.5
+
+
+OPERATORS = [
+    AddOperator,
+    MultOperator,
+    GtOperator,
+    AndOperator,
+    MaxOperator,
+    CloseOperator,
+]
+
+EXPRESSIONS = {
+    "small": "close * 1.01",
+    "comparison": "close > 100 and close * 2 > max(close, 150, 180)",
+    "nested": "max(close + 1, (close + 2) * (close + 3), max(close, 1, 2 * close + 1))",
+    "deep": " + ".join(["(close * 2)"] * 50),
+}
+
+
+async def _time_interpreter(interpreter, expression):
+    interpreter.prepare(expression)
+    durations = []
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        for _ in range(ITERATIONS):
+            await interpreter.compute_expression()
+        durations.append(time.perf_counter() - t0)
+    return min(durations)
+
+
+async def run():
+    """
+    Print the computation duration of each expression using both backends
+    """
+    for name, expression in EXPRESSIONS.items():
+        tree_walk = await _time_interpreter(
+            dsl_interpreter.Interpreter(OPERATORS), expression
+        )
+        flat = await _time_interpreter(
+            dsl_interpreter.Interpreter(OPERATORS, flat_execution=True), expression
+        )
+        print(
+            f"{name:<12} tree walk: {tree_walk * 1000:8.1f}ms  "
+            f"flat: {flat * 1000:8.1f}ms  ratio: {tree_walk / flat:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
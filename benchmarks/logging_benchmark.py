@@ -0,0 +1,79 @@
+"""
+Compares uncached loggers and eager debug messages with cached loggers and lazy debug messages
+when debug logs are disabled.
+Usage: python -m benchmarks.logging_benchmark
+"""
+
+import logging
+import time
+
+import octobot_commons.logging as commons_logging
+import octobot_commons.tree as tree
+
+ITERATIONS = 200000
+PATH = ["binance", "BTC/USDT", "1h", "ohlcv"]
+
+
+def _eager_uncached():
+    for index in range(ITERATIONS):
+        commons_logging.BotLogger("EventTreeNode").debug(
+            f"Event triggered for {'|'.join(PATH)} ({index})"
+        )
+
+
+def _eager_cached():
+    for index in range(ITERATIONS):
+        commons_logging.get_logger("EventTreeNode").debug(
+            f"Event triggered for {'|'.join(PATH)} ({index})"
+        )
+
+
+def _lazy_callable():
+    for index in range(ITERATIONS):
+        commons_logging.get_logger("EventTreeNode").debug(
+            lambda: f"Event triggered for {'|'.join(PATH)} ({index})"
+        )
+
+
+def _lazy_args():
+    for index in range(ITERATIONS):
+        commons_logging.get_logger("EventTreeNode").debug(
+            "Event triggered for %s (%s)", PATH, index
+        )
+
+
+def _event_tree_nodes():
+    for _ in range(ITERATIONS // 10):
+        node = tree.EventTreeNode(None)
+        node.trigger()
+        node.clear()
+
+
+def _measure(name, func):
+    t0 = time.perf_counter()
+    func()
+    print(f"{name:<28} {(time.perf_counter() - t0) * 1000:8.1f}ms")
+
+
+def run():
+    """
+    Print the duration of each logging strategy
+    """
+    commons_logging.set_global_logger_level(logging.INFO)
+    print(f"{ITERATIONS} disabled debug logs")
+    _measure("uncached logger, f-string", _eager_uncached)
+    _measure("cached logger, f-string", _eager_cached)
+    _measure("cached logger, callable", _lazy_callable)
+    _measure("cached logger, %-style args", _lazy_args)
+    print(f"{ITERATIONS // 10} event tree nodes")
+    _measure("cached logger", _event_tree_nodes)
+    cached_get_logger = commons_logging.get_logger
+    commons_logging.get_logger = commons_logging.BotLogger
+    try:
+        _measure("uncached logger", _event_tree_nodes)
+    finally:
+        commons_logging.get_logger = cached_get_logger
+
+
+if __name__ == "__main__":
+    run()
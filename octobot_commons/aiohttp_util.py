@@ -1,4 +1,4 @@
-# pylint: disable=W0718
+# pylint: disable=W0718,R0913,R0902
 #  Drakkar-Software OctoBot-Commons
 #  Copyright (c) Drakkar-Software, All rights reserved.
 #
@@ -14,6 +14,12 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import asyncio
+import collections
+import functools
+import hashlib
+import json
+import os
 import ssl
 import time
 import urllib.parse
@@ -25,6 +31,10 @@ import aiohttp.typedefs
 
 import octobot_commons.logging
 import octobot_commons.constants
+import octobot_commons.errors
+import octobot_commons.asyncio_tools as asyncio_tools
+import octobot_commons.metrics_registry as metrics_registry
+import octobot_commons.singleton as singleton
 
 try:
     import certifi
@@ -58,14 +68,7 @@ async def download_stream_file(
     """
     last_modified = None
     async with aiohttp_session.get(file_url) as resp:
-        if resp.status != 200:
-            try:
-                text = await resp.text()
-            except BaseException as err:
-                text = f"error when reading resp text: {err}"
-            raise RuntimeError(
-                f"Failed to download file at url : {file_url} (status: {resp.status}, text: {text})"
-            )
+        await _raise_for_download_status(resp, file_url, (200,))
         while True:
             last_modified = resp.headers.get("Last-Modified", "unknown")
             chunk = await resp.content.read(data_chunk_size)
@@ -79,6 +82,251 @@ async def download_stream_file(
     return last_modified
 
 
+async def download_file(
+    file_path: str,
+    file_url: str,
+    aiohttp_session: aiohttp.ClientSession = None,
+    chunk_size: int = octobot_commons.constants.DOWNLOAD_CHUNK_SIZE,
+    max_parallel_chunks: int = octobot_commons.constants.DOWNLOAD_MAX_PARALLEL_CHUNKS,
+    expected_sha256: str = None,
+    progress_callback=None,
+) -> str:
+    """
+    Download a big file into file_path using parallel HTTP Range requests when supported by the server.
+    Completed chunks are stored in a sidecar manifest file: an interrupted download is resumed on the next
+    call with the same file_path and file_url.
+    :param file_path: the output file path
+    :param file_url: the file to be downloaded url
+    :param aiohttp_session: the aiohttp session, a shared connector session is used when None
+    :param chunk_size: the size of each Range request
+    :param max_parallel_chunks: the maximum number of chunks to download at the same time
+    :param expected_sha256: when set, the downloaded file sha256 hex digest is checked against it
+    :param progress_callback: called with (downloaded bytes, total bytes or None) after each write
+    :return downloaded file last_modified if given as response header
+    """
+    if aiohttp_session is None:
+        async with get_client_session_manager().session() as session:
+            return await download_file(
+                file_path,
+                file_url,
+                aiohttp_session=session,
+                chunk_size=chunk_size,
+                max_parallel_chunks=max_parallel_chunks,
+                expected_sha256=expected_sha256,
+                progress_callback=progress_callback,
+            )
+    return await _ChunkedDownload(
+        file_path,
+        file_url,
+        aiohttp_session,
+        chunk_size,
+        max_parallel_chunks,
+        expected_sha256,
+        progress_callback,
+    ).download()
+
+
+class _ChunkedDownload:
+    """
+    State of a download_file() call
+    """
+
+    def __init__(
+        self,
+        file_path,
+        file_url,
+        aiohttp_session,
+        chunk_size,
+        max_parallel_chunks,
+        expected_sha256,
+        progress_callback,
+    ):
+        self.file_path = file_path
+        self.file_url = file_url
+        self.aiohttp_session = aiohttp_session
+        self.chunk_size = chunk_size
+        self.max_parallel_chunks = max_parallel_chunks
+        self.expected_sha256 = expected_sha256
+        self.progress_callback = progress_callback
+        self.manifest_path = (
+            f"{file_path}{octobot_commons.constants.DOWNLOAD_MANIFEST_EXT}"
+        )
+        self.manifest = None
+        self.size = None
+        self.downloaded_bytes = 0
+        # the checksum is computed in file order: while writing the next chunk to hash or,
+        # for chunks completed out of order, by reading them in an executor
+        self._hasher = hashlib.sha256() if expected_sha256 else None
+        self._next_hashed_chunk = 0
+        self._hashing_lock = asyncio.Lock()
+
+    async def download(self) -> str:
+        """
+        Download the missing chunks of the file
+        :return downloaded file last_modified if given as response header
+        """
+        async with self.aiohttp_session.head(
+            self.file_url, allow_redirects=True
+        ) as resp:
+            last_modified = resp.headers.get("Last-Modified", "unknown")
+            validator = None
+            if (
+                resp.status == 200
+                and resp.headers.get("Accept-Ranges") == "bytes"
+                and "Content-Length" in resp.headers
+            ):
+                self.size = int(resp.headers["Content-Length"])
+                validator = resp.headers.get("ETag", resp.headers.get("Last-Modified"))
+        if self.size is None:
+            # Range requests are not supported: download sequentially
+            last_modified = await self._download_whole_file()
+        else:
+            self._load_or_init_manifest(validator)
+            completed_chunks = set(self.manifest["completed_chunks"])
+            self.downloaded_bytes = sum(
+                self._get_chunk_size(index) for index in completed_chunks
+            )
+            await self._update_checksum()
+            await asyncio_tools.gather_with_concurrency_limit(
+                *(
+                    self._download_chunk(index)
+                    for index in range(self._get_chunks_count())
+                    if index not in completed_chunks
+                ),
+                max_concurrency=self.max_parallel_chunks,
+            )
+        self._check_checksum()
+        if os.path.isfile(self.manifest_path):
+            os.remove(self.manifest_path)
+        return last_modified
+
+    async def _download_whole_file(self):
+        with open(self.file_path, "wb") as output_file:
+            async with self.aiohttp_session.get(self.file_url) as resp:
+                await _raise_for_download_status(resp, self.file_url, (200,))
+                await self._write_response(resp, output_file, self._hasher)
+                return resp.headers.get("Last-Modified", "unknown")
+
+    async def _download_chunk(self, index):
+        start = index * self.chunk_size
+        end = start + self._get_chunk_size(index) - 1
+        async with self.aiohttp_session.get(
+            self.file_url, headers={"Range": f"bytes={start}-{end}"}
+        ) as resp:
+            await _raise_for_download_status(resp, self.file_url, (206,))
+            # hash while writing when every previous chunk is already hashed
+            hasher = self._hasher if index == self._next_hashed_chunk else None
+            with open(self.file_path, "r+b") as output_file:
+                output_file.seek(start)
+                await self._write_response(resp, output_file, hasher)
+        if hasher is not None:
+            self._next_hashed_chunk += 1
+        self.manifest["completed_chunks"].append(index)
+        self._save_manifest()
+        await self._update_checksum()
+
+    async def _write_response(self, resp, output_file, hasher=None):
+        async for data in resp.content.iter_chunked(
+            octobot_commons.constants.DOWNLOAD_READ_SIZE
+        ):
+            output_file.write(data)
+            if hasher is not None:
+                hasher.update(data)
+            self.downloaded_bytes += len(data)
+            if self.progress_callback is not None:
+                self.progress_callback(self.downloaded_bytes, self.size)
+
+    def _load_or_init_manifest(self, validator):
+        manifest = {
+            "url": self.file_url,
+            "size": self.size,
+            "validator": validator,
+            "chunk_size": self.chunk_size,
+            "completed_chunks": [],
+        }
+        try:
+            with open(self.manifest_path, encoding="utf-8") as manifest_file:
+                previous_manifest = json.load(manifest_file)
+            if (
+                os.path.isfile(self.file_path)
+                and os.path.getsize(self.file_path) == self.size
+                and all(
+                    previous_manifest.get(key) == value
+                    for key, value in manifest.items()
+                    if key != "completed_chunks"
+                )
+            ):
+                self.manifest = previous_manifest
+                return
+        except (OSError, ValueError):
+            # no or invalid manifest
+            pass
+        # new download: reserve the file size
+        with open(self.file_path, "wb") as output_file:
+            output_file.truncate(self.size)
+        self.manifest = manifest
+        self._save_manifest()
+
+    def _save_manifest(self):
+        temp_file_path = f"{self.manifest_path}.tmp"
+        with open(temp_file_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(self.manifest, manifest_file)
+        os.replace(temp_file_path, self.manifest_path)
+
+    def _get_chunks_count(self):
+        return -(-self.size // self.chunk_size)
+
+    def _get_chunk_size(self, index):
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+    async def _update_checksum(self):
+        if self._hasher is None:
+            return
+        async with self._hashing_lock:
+            while self._next_hashed_chunk in self.manifest["completed_chunks"]:
+                # don't block the event loop while reading and hashing the chunk
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._hash_chunk, self._next_hashed_chunk
+                )
+                self._next_hashed_chunk += 1
+
+    def _hash_chunk(self, index):
+        remaining = self._get_chunk_size(index)
+        with open(self.file_path, "rb") as output_file:
+            output_file.seek(index * self.chunk_size)
+            while remaining > 0 and (
+                data := output_file.read(
+                    min(remaining, octobot_commons.constants.DOWNLOAD_READ_SIZE)
+                )
+            ):
+                self._hasher.update(data)
+                remaining -= len(data)
+
+    def _check_checksum(self):
+        if self._hasher is None or (checksum := self._hasher.hexdigest()) == (
+            self.expected_sha256
+        ):
+            return
+        # restart from scratch on the next call
+        for path in (self.file_path, self.manifest_path):
+            if os.path.isfile(path):
+                os.remove(path)
+        raise octobot_commons.errors.InvalidChecksumError(
+            f"Invalid {self.file_url} checksum: {checksum}, expected: {self.expected_sha256}"
+        )
+
+
+async def _raise_for_download_status(resp, file_url, expected_statuses):
+    if resp.status not in expected_statuses:
+        try:
+            text = await resp.text()
+        except BaseException as err:
+            text = f"error when reading resp text: {err}"
+        raise RuntimeError(
+            f"Failed to download file at url : {file_url} (status: {resp.status}, text: {text})"
+        )
+
+
 async def _check_local_certificates_availability(
     session: aiohttp.ClientSession, test_url: str
 ):
@@ -101,9 +349,7 @@ async def _check_local_certificates_availability(
 
 
 def _get_certify_aiohttp_client_session() -> aiohttp.ClientSession:
-    # from https://docs.aiohttp.org/en/stable/client_advanced.html#example-use-certifi
-    ssl_context = ssl.create_default_context(cafile=certifi.where())
-    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context))
+    return get_client_session_manager().get_session(use_certifi=True)
 
 
 async def get_ssl_fallback_aiohttp_client_session(
@@ -112,7 +358,7 @@ async def get_ssl_fallback_aiohttp_client_session(
     """
     :return: an aiohttp.ClientSession using certifi ssl certificates if necessary
     """
-    base_session = aiohttp.ClientSession()
+    base_session = get_client_session_manager().get_session()
     if (
         not octobot_commons.constants.ENABLE_CERTIFI_SSL_CERTIFICATES
         or await _check_local_certificates_availability(base_session, test_url)
@@ -163,6 +409,138 @@ async def certify_aiohttp_client_session():
             await session.close()
 
 
+def get_request_path(method: str, str_or_url: aiohttp.typedefs.StrOrURL) -> str:
+    """
+    :return: the "[METHOD] /path" identifier of a request
+    """
+    if isinstance(str_or_url, str):
+        # cache urls without their query: queries can contain timestamps or signatures
+        return _get_request_path(method, str_or_url.split("?", 1)[0].split("#", 1)[0])
+    return f"[{method}] {str_or_url.path}"
+
+
+@functools.lru_cache(maxsize=octobot_commons.constants.REQUEST_PATHS_CACHE_SIZE)
+def _get_request_path(method: str, url: str) -> str:
+    return f"[{method}] { urllib.parse.urlparse(url).path}"
+
+
+class SlidingWindowRateTracker:
+    """
+    Keeps the timestamps of the requests of the last window seconds for each path.
+    Timestamps are expected to be added in increasing order: each timestamp is added and
+    removed once, making updates O(1) amortized.
+    """
+
+    __slots__ = ("window", "_timestamps_by_path", "_adds_count")
+
+    def __init__(
+        self,
+        window: float = octobot_commons.constants.REQUESTS_RATE_TRACKER_WINDOW_SECONDS,
+    ):
+        self.window: float = window
+        self._timestamps_by_path: dict[str, collections.deque] = {}
+        self._adds_count: int = 0
+
+    def add(self, path: str, timestamp: float):
+        """
+        Account for a request to path at timestamp
+        """
+        try:
+            timestamps = self._timestamps_by_path[path]
+        except KeyError:
+            timestamps = self._timestamps_by_path[path] = collections.deque()
+        timestamps.append(timestamp)
+        self._remove_expired(timestamps, timestamp)
+        self._adds_count += 1
+        if (
+            self._adds_count
+            % octobot_commons.constants.REQUESTS_RATE_TRACKER_PRUNE_INTERVAL
+            == 0
+        ):
+            self._prune(timestamp)
+
+    def count(self, path: str, seconds: float = None, now: float = None) -> int:
+        """
+        :param path: the request path
+        :param seconds: count requests of the last seconds, defaults to window. Can't exceed window
+        :param now: the current timestamp, defaults to time.time()
+        :return: the number of requests to path during the last seconds
+        """
+        if (timestamps := self._timestamps_by_path.get(path)) is None:
+            return 0
+        now = time.time() if now is None else now
+        self._remove_expired(timestamps, now)
+        if seconds is None or seconds >= self.window:
+            return len(timestamps)
+        min_timestamp = now - seconds
+        count = 0
+        # most recent requests are last
+        for timestamp in reversed(timestamps):
+            if timestamp <= min_timestamp:
+                break
+            count += 1
+        return count
+
+    def count_all(self, seconds: float = None, now: float = None) -> int:
+        """
+        :return: the number of requests to any path during the last seconds
+        """
+        now = time.time() if now is None else now
+        return sum(
+            self.count(path, seconds=seconds, now=now)
+            for path in list(self._timestamps_by_path)
+        )
+
+    def get_counts(self, seconds: float = None, now: float = None) -> dict:
+        """
+        :return: the number of requests of the last seconds by path, paths without request are removed
+        """
+        now = time.time() if now is None else now
+        counts = {}
+        for path in list(self._timestamps_by_path):
+            if count := self.count(path, seconds=seconds, now=now):
+                counts[path] = count
+            elif not self._timestamps_by_path[path]:
+                self._timestamps_by_path.pop(path)
+        return counts
+
+    def get_delay_before_next_request(
+        self, path: str, max_requests: int, seconds: float = None, now: float = None
+    ) -> float:
+        """
+        :param path: the request path
+        :param max_requests: the maximum number of requests allowed during seconds
+        :param seconds: the rate limit period, defaults to window. Can't exceed window
+        :param now: the current timestamp, defaults to time.time()
+        :return: the time to wait before a request to path can be sent without exceeding max_requests
+        """
+        now = time.time() if now is None else now
+        seconds = self.window if seconds is None else min(seconds, self.window)
+        if self.count(path, seconds=seconds, now=now) < max_requests:
+            return 0
+        # wait for the oldest request allowing a new one to leave the period
+        timestamps = self._timestamps_by_path[path]
+        return max(0, timestamps[-max_requests] + seconds - now)
+
+    def clear(self):
+        """
+        Forget every request
+        """
+        self._timestamps_by_path.clear()
+
+    def _prune(self, now: float):
+        # forget paths without request in the window (ex: paths containing ids)
+        for path, timestamps in list(self._timestamps_by_path.items()):
+            self._remove_expired(timestamps, now)
+            if not timestamps:
+                self._timestamps_by_path.pop(path)
+
+    def _remove_expired(self, timestamps: collections.deque, now: float):
+        min_timestamp = now - self.window
+        while timestamps and timestamps[0] <= min_timestamp:
+            timestamps.popleft()
+
+
 @dataclasses.dataclass
 class RequestCounter:
     """
@@ -180,13 +558,17 @@ class RequestCounter:
         """
         Account for a request, log if period is over
         """
+        self.account_for_path(get_request_path(method, str_or_url), timestamp)
+
+    def account_for_path(self, path: str, timestamp: float):
+        """
+        Account for a request to the given get_request_path() path, log if period is over
+        """
         if timestamp - self.last_period_start > self.period:
             if self.last_period_start != 0:
                 self._log_stats()
             self._clear()
             self.last_period_start = timestamp - timestamp % self.period
-        url = str_or_url if isinstance(str_or_url, str) else str_or_url.human_repr()
-        path = f"[{method}] { urllib.parse.urlparse(url).path}"
         self.paths[path] = self.paths.get(path, 0) + 1
 
     def _clear(self):
@@ -222,6 +604,12 @@ class CounterClientSession(aiohttp.ClientSession):
         self.per_day: RequestCounter = RequestCounter(
             identifier, octobot_commons.constants.DAYS_TO_SECONDS
         )
+        self.rate_tracker: SlidingWindowRateTracker = SlidingWindowRateTracker()
+        self._requests_metric = metrics_registry.get_metrics_registry().counter(
+            "octobot_http_requests_total",
+            "HTTP requests sent by CounterClientSession",
+            ("session", "method"),
+        )
 
     async def _request(
         self, method: str, str_or_url: aiohttp.typedefs.StrOrURL, *args, **kwargs
@@ -235,11 +623,125 @@ class CounterClientSession(aiohttp.ClientSession):
         self, method: str, str_or_url: aiohttp.typedefs.StrOrURL, timestamp: float
     ):
         try:
-            self.per_min.account_for(method, str_or_url, timestamp)
-            self.per_hour.account_for(method, str_or_url, timestamp)
-            self.per_day.account_for(method, str_or_url, timestamp)
+            path = get_request_path(method, str_or_url)
+            self.per_min.account_for_path(path, timestamp)
+            self.per_hour.account_for_path(path, timestamp)
+            self.per_day.account_for_path(path, timestamp)
+            self.rate_tracker.add(path, timestamp)
+            self._requests_metric.inc(labels=(self.per_day.name, method))
         except BaseException as err:
             # never raise or the subsequent request is blocked
             octobot_commons.logging.get_logger(__name__).exception(
                 err, True, "Error when accounting for request: {err}"
             )
+
+
+class ClientSessionManager(singleton.Singleton):
+    """
+    Hands out aiohttp sessions sharing the same connection pool.
+    Sessions are cheap: they can be closed after use while their connector and its
+    kept alive connections are reused by the next sessions.
+    Connectors are bound to the event loop they are created in.
+    Nothing in this library closes them: applications using shared sessions should await
+    close_client_session_manager() in their shutdown sequence, on the event loop that used them.
+    """
+
+    def __init__(
+        self,
+        limit=octobot_commons.constants.AIOHTTP_CONNECTOR_LIMIT,
+        limit_per_host=octobot_commons.constants.AIOHTTP_CONNECTOR_LIMIT_PER_HOST,
+        keepalive_timeout=octobot_commons.constants.AIOHTTP_KEEPALIVE_TIMEOUT_SECONDS,
+        ttl_dns_cache=octobot_commons.constants.AIOHTTP_DNS_CACHE_TTL_SECONDS,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        # (event loop, connector) by use_certifi
+        self._connectors: dict[bool, tuple] = {}
+
+    def get_session(
+        self, identifier: str = None, use_certifi: bool = False, **kwargs
+    ) -> aiohttp.ClientSession:
+        """
+        Should be called from within an event loop
+        :param identifier: when set, a CounterClientSession with this identifier is returned
+        :param use_certifi: when True, certifi ssl certificates are used
+        :param kwargs: other aiohttp.ClientSession arguments
+        :return: a session using the shared connector
+        """
+        connector = self.get_connector(use_certifi)
+        if identifier is None:
+            return aiohttp.ClientSession(
+                connector=connector, connector_owner=False, **kwargs
+            )
+        return CounterClientSession(
+            identifier, connector=connector, connector_owner=False, **kwargs
+        )
+
+    @contextlib.asynccontextmanager
+    async def session(
+        self, identifier: str = None, use_certifi: bool = False, **kwargs
+    ):
+        """
+        yields a session using the shared connector, closes the session (not the connector) on exit
+        """
+        session = self.get_session(identifier, use_certifi, **kwargs)
+        try:
+            yield session
+        finally:
+            await session.close()
+
+    def get_connector(self, use_certifi: bool = False) -> aiohttp.TCPConnector:
+        """
+        :return: the shared connector of the current event loop
+        """
+        loop = asyncio.get_running_loop()
+        if use_certifi in self._connectors:
+            connector_loop, connector = self._connectors[use_certifi]
+            if connector_loop is loop and not connector.closed:
+                return connector
+        connector = self._create_connector(use_certifi)
+        self._connectors[use_certifi] = (loop, connector)
+        return connector
+
+    def _create_connector(self, use_certifi: bool) -> aiohttp.TCPConnector:
+        # from https://docs.aiohttp.org/en/stable/client_advanced.html#example-use-certifi
+        ssl_context = (
+            ssl.create_default_context(cafile=certifi.where()) if use_certifi else True
+        )
+        return aiohttp.TCPConnector(
+            ssl=ssl_context,
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.ttl_dns_cache,
+        )
+
+    async def close(self):
+        """
+        Close the shared connectors of the current event loop and forget the other ones
+        """
+        loop = asyncio.get_running_loop()
+        connectors, self._connectors = self._connectors, {}
+        for connector_loop, connector in connectors.values():
+            if connector_loop is loop:
+                await connector.close()
+
+
+def get_client_session_manager() -> ClientSessionManager:
+    """
+    :return: the process wide ClientSessionManager
+    """
+    return ClientSessionManager.instance()
+
+
+async def close_client_session_manager():
+    """
+    Close the shared connectors and their kept alive connections.
+    Not called by this library: to be awaited by the application when shutting down, from the
+    event loop sessions were used in, after the last session using them is closed.
+    Otherwise, aiohttp warns about unclosed connectors when they are garbage collected.
+    """
+    if (manager := ClientSessionManager.get_instance_if_exists()) is not None:
+        await manager.close()
@@ -15,10 +15,107 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 import asyncio
+import concurrent.futures
+import functools
+import os
+import threading
 import time
 
+import octobot_commons.constants as constants
+import octobot_commons.enums as enums
 import octobot_commons.logging as logging_util
 import octobot_commons.html_util as html_util
+import octobot_commons.histogram as histogram
+import octobot_commons.metrics_registry as metrics_registry
+
+_EXECUTORS = {}
+
+
+def get_executor(
+    executor_type: enums.AsyncJobExecutorTypes,
+) -> concurrent.futures.Executor:
+    """
+    :param executor_type: the type of executor to get
+    :return: the bounded executor shared by every AsyncJob of this executor type
+    """
+    try:
+        return _EXECUTORS[executor_type]
+    except KeyError:
+        if executor_type is enums.AsyncJobExecutorTypes.THREAD:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=constants.ASYNC_JOB_THREAD_POOL_MAX_WORKERS,
+                thread_name_prefix=AsyncJob.__name__,
+            )
+        elif executor_type is enums.AsyncJobExecutorTypes.PROCESS:
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=constants.ASYNC_JOB_PROCESS_POOL_MAX_WORKERS
+            )
+        else:
+            raise ValueError(f"Unknown executor type: {executor_type}")
+        # exit hooks are called in reverse order: called before concurrent.futures joins its
+        # workers at exit, pending callbacks are then cancelled instead of being run
+        threading._register_atexit(  # pylint: disable=protected-access
+            _stop_executors_at_exit, os.getpid()
+        )
+        _EXECUTORS[executor_type] = executor
+        return executor
+
+
+def _stop_executors_at_exit(creator_pid):
+    # forked processes (ex: process executor workers) inherit exit hooks
+    if os.getpid() == creator_pid:
+        stop_executors()
+
+
+def stop_executors():
+    """
+    Stop the executors shared by AsyncJobs without waiting for running callbacks,
+    pending callbacks are cancelled. Executors will be recreated if necessary.
+    Automatically called at exit.
+    """
+    for executor_type, executor in list(_EXECUTORS.items()):
+        executor.shutdown(wait=False, cancel_futures=True)
+        _EXECUTORS.pop(executor_type, None)
+
+
+class AsyncJobMetrics:
+    """
+    AsyncJob execution metrics
+    """
+
+    __slots__ = [
+        "run_durations",
+        "scheduling_lags",
+        "dependencies_waits",
+        "runs",
+        "failures",
+        "overlapping_runs",
+    ]
+
+    def __init__(self):
+        # callback execution time
+        self.run_durations = histogram.Histogram()
+        # delay between the planned periodic execution time and the actual execution start
+        self.scheduling_lags = histogram.Histogram()
+        # time spent waiting for dependencies and self to be idle before executing
+        self.dependencies_waits = histogram.Histogram()
+        self.runs = 0
+        self.failures = 0
+        # executions started while another execution was running
+        self.overlapping_runs = 0
+
+    def to_dict(self) -> dict:
+        """
+        :return: a snapshot of the metrics as a dict
+        """
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "overlapping_runs": self.overlapping_runs,
+            "run_durations": self.run_durations.to_dict(),
+            "scheduling_lags": self.scheduling_lags.to_dict(),
+            "dependencies_waits": self.dependencies_waits.to_dict(),
+        }
 
 
 class AsyncJob:
@@ -40,7 +137,15 @@ class AsyncJob:
         is_periodic=True,
         enable_multiple_runs=False,
         max_successive_failures=MAXIMUM_ALLOWED_SUCCESSIVE_FAILURES,
+        scheduler=None,
+        priority=0,
+        executor_type=None,
     ):
+        """
+        :param executor_type: when set, callback is a synchronous function executed in the
+        shared executor of this enums.AsyncJobExecutorTypes instead of a coroutine function.
+        Process executors require callback and its kwargs to be picklable
+        """
         self.logger = logging_util.get_logger(
             f"{self.__class__.__name__}-{callback.__name__}"
         )
@@ -66,6 +171,22 @@ class AsyncJob:
 
         self.job_task = None
         self.job_periodic_task = None
+        self.metrics = AsyncJobMetrics()
+        self._metrics_labels = (callback.__name__,)
+        registry = metrics_registry.get_metrics_registry()
+        self._run_duration_metric = registry.histogram(
+            "octobot_async_job_run_duration_seconds",
+            "AsyncJob callback execution duration",
+            ("job",),
+        )
+        self._failures_metric = registry.counter(
+            "octobot_async_job_failures_total", "AsyncJob failed runs", ("job",)
+        )
+
+        # when set, periodic runs are handled by this AsyncJobScheduler
+        self.scheduler = scheduler
+        self.priority = priority
+        self.executor_type = executor_type
 
     async def run(
         self,
@@ -83,9 +204,13 @@ class AsyncJob:
         """
         if not self.is_started and self.is_periodic:
             self.should_stop = False
-            self.job_periodic_task = asyncio.create_task(
-                self._run_periodic_task(**kwargs)
-            )
+            if self.scheduler is None:
+                self.job_periodic_task = asyncio.create_task(
+                    self._run_periodic_task(**kwargs)
+                )
+            else:
+                self.is_started = True
+                self.scheduler.schedule(self, priority=self.priority, **kwargs)
         else:
             if self._should_run_job(force=force, ignore_dependencies=True):
                 if wait_for_task_execution:
@@ -124,9 +249,12 @@ class AsyncJob:
                     >= self.execution_interval_delay
                     else self.execution_interval_delay
                 )
+            planned_execution_time = time.time() + sleep_time
             await asyncio.sleep(sleep_time)
             await self._run_task_as_soon_as_possible(
-                error_on_single_failure=False, **kwargs
+                error_on_single_failure=False,
+                planned_execution_time=planned_execution_time,
+                **kwargs,
             )
         self.is_started = False
 
@@ -135,17 +263,27 @@ class AsyncJob:
         force=False,
         ignore_dependencies_check=False,
         error_on_single_failure=True,
+        planned_execution_time=None,
+        skip_wait=False,
         **kwargs,
     ):
         """
         Wait until job _run() can be called
         :param force: if True, force job task execution
+        :param planned_execution_time: the time at which this execution was planned, used in metrics
+        :param skip_wait: if True, run right away without waiting for job dependencies and this job
+        to stop running
         """
-        if self._should_run_job(force=force):
-            await self._run(error_on_single_failure=error_on_single_failure, **kwargs)
+        if skip_wait or self._should_run_job(force=force):
+            await self._run(
+                error_on_single_failure=error_on_single_failure,
+                planned_execution_time=planned_execution_time,
+                **kwargs,
+            )
         else:
             # wait for job dependencies to stop running
             # and also this job to stop running
+            wait_start_time = time.perf_counter()
             try:
                 events_to_wait = []
 
@@ -175,10 +313,21 @@ class AsyncJob:
             except asyncio.TimeoutError:
                 self.logger.warning("Job has been timed out")
             finally:
+                self.metrics.dependencies_waits.observe(
+                    time.perf_counter() - wait_start_time
+                )
                 await self._run(
-                    error_on_single_failure=error_on_single_failure, **kwargs
+                    error_on_single_failure=error_on_single_failure,
+                    planned_execution_time=planned_execution_time,
+                    **kwargs,
                 )
 
+    def get_metrics(self) -> dict:
+        """
+        :return: a snapshot of the job execution metrics
+        """
+        return self.metrics.to_dict()
+
     def is_job_idle(self):
         """
         :return: publicly is_running attribute value
@@ -192,17 +341,32 @@ class AsyncJob:
         """
         self.job_dependencies.append(job)
 
-    async def _run(self, error_on_single_failure=True, **kwargs):
+    async def _run(
+        self, error_on_single_failure=True, planned_execution_time=None, **kwargs
+    ):
         """
         Execute the job callback
         Reset the last_execution_time
         """
+        if planned_execution_time is not None:
+            self.metrics.scheduling_lags.observe(
+                max(0, time.time() - planned_execution_time)
+            )
         # Clear to be able to await the event
         if self.simultaneous_calls == 0:
             self.idle_task_event.clear()
+        else:
+            self.metrics.overlapping_runs += 1
         self.simultaneous_calls += 1
+        start_time = time.perf_counter()
         try:
-            await self.callback(**kwargs)
+            if self.executor_type is None:
+                await self.callback(**kwargs)
+            else:
+                await asyncio.get_running_loop().run_in_executor(
+                    get_executor(self.executor_type),
+                    functools.partial(self.callback, **kwargs),
+                )
             if self.successive_failures > self.max_successive_failures:
                 self.logger.info(
                     f"Job successfully run after {self.successive_failures} failures."
@@ -211,6 +375,10 @@ class AsyncJob:
         except Exception as exception:
             self._handle_run_exception(exception, error_on_single_failure)
         finally:
+            run_duration = time.perf_counter() - start_time
+            self.metrics.run_durations.observe(run_duration)
+            self._run_duration_metric.observe(run_duration, self._metrics_labels)
+            self.metrics.runs += 1
             self.last_execution_time = time.time()
             self.simultaneous_calls -= 1
             if self.simultaneous_calls == 0:
@@ -219,6 +387,8 @@ class AsyncJob:
 
     def _handle_run_exception(self, exception, error_on_single_failure):
         self.successive_failures += 1
+        self.metrics.failures += 1
+        self._failures_metric.inc(labels=self._metrics_labels)
         str_error = html_util.get_html_summary_if_relevant(exception)
         error_message = f"Failed to run job action, exception: {exception.__class__.__name__}: {str_error}"
         if error_on_single_failure:
@@ -279,6 +449,8 @@ class AsyncJob:
         if self.job_periodic_task is not None:
             self.job_periodic_task.cancel()
             self.job_periodic_task = None
+        if self.scheduler is not None:
+            self.scheduler.unschedule(self)
         self.is_started = False
 
     def clear(self):
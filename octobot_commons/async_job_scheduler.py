@@ -0,0 +1,311 @@
+# pylint: disable=R0902
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import heapq
+import itertools
+import time
+
+import octobot_commons.logging as logging_util
+
+
+class _ScheduledJob:
+    """
+    Scheduling state and statistics of a job registered in an AsyncJobScheduler
+    """
+
+    __slots__ = [
+        "job",
+        "priority",
+        "kwargs",
+        "due_time",
+        "is_scheduled",
+        "run_task",
+        "wait_task",
+        "is_wait_timed_out",
+        "runs",
+        "last_lateness",
+        "max_lateness",
+        "total_lateness",
+        "last_run_time",
+        "max_run_time",
+        "total_run_time",
+    ]
+
+    def __init__(self, job, priority, kwargs):
+        self.job = job
+        self.priority = priority
+        self.kwargs = kwargs
+        self.due_time = None
+        self.is_scheduled = True
+        self.run_task = None
+        self.wait_task = None
+        self.is_wait_timed_out = False
+        self.runs = 0
+        self.last_lateness = 0
+        self.max_lateness = 0
+        self.total_lateness = 0
+        self.last_run_time = 0
+        self.max_run_time = 0
+        self.total_run_time = 0
+
+    def get_stats(self) -> dict:
+        """
+        :return: the job statistics as a dict
+        """
+        return {
+            "name": self.job.logger.logger_name,
+            "priority": self.priority,
+            "runs": self.runs,
+            "is_running": self.run_task is not None,
+            "is_waiting": self.wait_task is not None,
+            "last_lateness": self.last_lateness,
+            "max_lateness": self.max_lateness,
+            "average_lateness": self.total_lateness / self.runs if self.runs else 0,
+            "last_run_time": self.last_run_time,
+            "max_run_time": self.max_run_time,
+            "average_run_time": self.total_run_time / self.runs if self.runs else 0,
+        }
+
+
+class AsyncJobScheduler:
+    """
+    Runs periodic AsyncJobs using a single timer heap instead of one sleeping task per job.
+    Due jobs are started by priority (higher first) within the max_concurrent_runs limit.
+    Jobs due within coalescing_delay of each other are started on the same timer wake-up.
+    Due jobs waiting for their dependencies (or their own previous run) don't use a run slot:
+    they are queued again when they can run.
+    """
+
+    DEFAULT_MAX_CONCURRENT_RUNS = 10
+    DEFAULT_COALESCING_DELAY = 0.01
+
+    def __init__(
+        self,
+        max_concurrent_runs=DEFAULT_MAX_CONCURRENT_RUNS,
+        coalescing_delay=DEFAULT_COALESCING_DELAY,
+    ):
+        self.logger = logging_util.get_logger(self.__class__.__name__)
+        self.max_concurrent_runs = max_concurrent_runs
+        self.coalescing_delay = coalescing_delay
+        self._scheduled_jobs = {}
+        # (due_time, sequence, scheduled_job) of waiting jobs
+        self._timer_heap = []
+        # (-priority, due_time, sequence, scheduled_job) of due jobs waiting for a run slot
+        self._ready_heap = []
+        self._sequence = itertools.count()
+        self._running_jobs_count = 0
+        self._timer_handle = None
+
+    def schedule(self, job, priority=0, **kwargs):
+        """
+        Periodically run the given job, first after its first_execution_delay and then every
+        execution_interval_delay after the end of its previous run
+        :param job: the AsyncJob to run
+        :param priority: jobs with a higher priority are started first when run slots are missing
+        :param kwargs: the job callback kwargs
+        """
+        if job in self._scheduled_jobs:
+            return
+        scheduled_job = _ScheduledJob(job, priority, kwargs)
+        self._scheduled_jobs[job] = scheduled_job
+        self._schedule_at(
+            scheduled_job,
+            self._get_loop().time()
+            + (
+                0
+                if job.first_execution_delay == job.NO_DELAY
+                else job.first_execution_delay
+            ),
+        )
+
+    def unschedule(self, job):
+        """
+        Stop running the given job, cancel its current run if any
+        :param job: the AsyncJob to stop
+        """
+        if (scheduled_job := self._scheduled_jobs.pop(job, None)) is None:
+            return
+        # heaps entries are lazily removed
+        scheduled_job.is_scheduled = False
+        if scheduled_job.run_task is not None:
+            scheduled_job.run_task.cancel()
+        if scheduled_job.wait_task is not None:
+            scheduled_job.wait_task.cancel()
+
+    def is_scheduled(self, job) -> bool:
+        """
+        :return: True if the given job is scheduled
+        """
+        return job in self._scheduled_jobs
+
+    def stop(self):
+        """
+        Unschedule every job
+        """
+        for job in list(self._scheduled_jobs):
+            self.unschedule(job)
+        self._timer_heap = []
+        self._ready_heap = []
+        if self._timer_handle is not None:
+            self._timer_handle.cancel()
+            self._timer_handle = None
+
+    def get_queue_depth(self) -> int:
+        """
+        :return: the number of due jobs waiting for a run slot
+        """
+        return sum(
+            1 for *_, scheduled_job in self._ready_heap if scheduled_job.is_scheduled
+        )
+
+    def get_stats(self) -> dict:
+        """
+        :return: the scheduler and scheduled jobs statistics as a dict
+        """
+        return {
+            "scheduled_jobs": len(self._scheduled_jobs),
+            "running_jobs": self._running_jobs_count,
+            "queue_depth": self.get_queue_depth(),
+            "jobs": [
+                scheduled_job.get_stats()
+                for scheduled_job in self._scheduled_jobs.values()
+            ],
+        }
+
+    @staticmethod
+    def _get_loop():
+        return asyncio.get_running_loop()
+
+    def _schedule_at(self, scheduled_job, due_time):
+        scheduled_job.due_time = due_time
+        heapq.heappush(
+            self._timer_heap, (due_time, next(self._sequence), scheduled_job)
+        )
+        self._arm_timer()
+
+    def _arm_timer(self):
+        """
+        Make sure the timer wakes up when the earliest waiting job is due
+        """
+        while self._timer_heap and not self._timer_heap[0][2].is_scheduled:
+            heapq.heappop(self._timer_heap)
+        if not self._timer_heap:
+            return
+        due_time = self._timer_heap[0][0]
+        if self._timer_handle is not None:
+            if self._timer_handle.when() <= due_time:
+                # the timer will wake up on time
+                return
+            self._timer_handle.cancel()
+        self._timer_handle = self._get_loop().call_at(due_time, self._on_timer)
+
+    def _on_timer(self):
+        self._timer_handle = None
+        coalesced_time = self._get_loop().time() + self.coalescing_delay
+        while self._timer_heap and self._timer_heap[0][0] <= coalesced_time:
+            due_time, sequence, scheduled_job = heapq.heappop(self._timer_heap)
+            if scheduled_job.is_scheduled:
+                heapq.heappush(
+                    self._ready_heap,
+                    (-scheduled_job.priority, due_time, sequence, scheduled_job),
+                )
+        self._start_ready_jobs()
+        self._arm_timer()
+
+    def _start_ready_jobs(self):
+        while self._ready_heap and self._running_jobs_count < self.max_concurrent_runs:
+            ready_entry = heapq.heappop(self._ready_heap)
+            scheduled_job = ready_entry[-1]
+            if not scheduled_job.is_scheduled:
+                continue
+            # pylint: disable=protected-access
+            if scheduled_job.is_wait_timed_out or scheduled_job.job._should_run_job(
+                force=True
+            ):
+                scheduled_job.is_wait_timed_out = False
+                self._running_jobs_count += 1
+                scheduled_job.run_task = asyncio.create_task(
+                    self._run_job(scheduled_job)
+                )
+            else:
+                # don't use a run slot while waiting
+                scheduled_job.wait_task = asyncio.create_task(
+                    self._queue_when_runnable(scheduled_job, ready_entry)
+                )
+
+    async def _queue_when_runnable(self, scheduled_job, ready_entry):
+        job = scheduled_job.job
+        # same waits as AsyncJob._run_task_as_soon_as_possible
+        events_to_wait = [
+            asyncio.wait_for(
+                dependency.idle_task_event.wait(), job.DEPENDENCIES_WAIT_TIMEOUT
+            )
+            for dependency in job.job_dependencies
+        ]
+        if not job.enable_multiple_runs:
+            events_to_wait.append(
+                asyncio.wait_for(
+                    job.idle_task_event.wait(), job.SELF_RUNNING_WAIT_TIMEOUT
+                )
+            )
+        wait_start_time = time.perf_counter()
+        try:
+            await asyncio.gather(*events_to_wait)
+        except asyncio.TimeoutError:
+            # run anyway, as AsyncJob does
+            job.logger.warning("Job has been timed out")
+            scheduled_job.is_wait_timed_out = True
+        finally:
+            scheduled_job.wait_task = None
+            job.metrics.dependencies_waits.observe(
+                time.perf_counter() - wait_start_time
+            )
+        if scheduled_job.is_scheduled:
+            # keep the initial priority and due time
+            heapq.heappush(self._ready_heap, ready_entry)
+            self._start_ready_jobs()
+
+    async def _run_job(self, scheduled_job):
+        loop = self._get_loop()
+        start_time = loop.time()
+        lateness = max(0, start_time - scheduled_job.due_time)
+        try:
+            # pylint: disable=protected-access
+            await scheduled_job.job._run_task_as_soon_as_possible(
+                # waits are handled by _queue_when_runnable without using a run slot
+                skip_wait=True,
+                error_on_single_failure=False,
+                planned_execution_time=time.time() - lateness,
+                **scheduled_job.kwargs,
+            )
+        finally:
+            run_time = loop.time() - start_time
+            scheduled_job.runs += 1
+            scheduled_job.last_lateness = lateness
+            scheduled_job.max_lateness = max(scheduled_job.max_lateness, lateness)
+            scheduled_job.total_lateness += lateness
+            scheduled_job.last_run_time = run_time
+            scheduled_job.max_run_time = max(scheduled_job.max_run_time, run_time)
+            scheduled_job.total_run_time += run_time
+            scheduled_job.run_task = None
+            self._running_jobs_count -= 1
+            if scheduled_job.is_scheduled:
+                self._schedule_at(
+                    scheduled_job,
+                    loop.time() + scheduled_job.job.execution_interval_delay,
+                )
+            self._start_ready_jobs()
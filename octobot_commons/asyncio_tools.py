@@ -1,3 +1,4 @@
+# pylint: disable=R0902
 #  Drakkar-Software OctoBot-Commons
 #  Copyright (c) Drakkar-Software, All rights reserved.
 #
@@ -14,10 +15,13 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 import asyncio
+import collections
+import time
 import traceback
 import concurrent.futures
 
 import octobot_commons.constants as constants
+import octobot_commons.errors as errors
 import octobot_commons.logging as logging_util
 
 
@@ -117,6 +121,173 @@ async def gather_waiting_for_all_before_raising(*coros):
     return maybe_exceptions
 
 
+async def gather_with_concurrency_limit(*coros, max_concurrency):
+    """
+    Same as gather_waiting_for_all_before_raising but running at most max_concurrency coros at the same time.
+    :param coros: the coros to gather
+    :param max_concurrency: the maximum number of coros to run at the same time
+    :return: the coros results, in the given coros order
+    """
+    results = [None] * len(coros)
+    done_tasks = _iterate_done_tasks(coros, max_concurrency)
+    try:
+        async for index, task in done_tasks:
+            results[index] = _get_task_result_or_exception(task)
+    finally:
+        # cancel remaining tasks when cancelled
+        await done_tasks.aclose()
+    for maybe_exception in results:
+        if isinstance(maybe_exception, Exception):
+            # raise the first exception in coros order, as gather_waiting_for_all_before_raising
+            raise maybe_exception
+    return results
+
+
+async def iterate_as_completed(coros, max_in_flight, ordered=False):
+    """
+    Async generator running at most max_in_flight coros at the same time and yielding their results.
+    Coros are only created when they can be started when coros is a generator.
+    Failed coros results are skipped, the first raised exception is raised once every coro is done.
+    :param coros: an iterable of coros to run
+    :param max_in_flight: the maximum number of coros to run at the same time
+    :param ordered: when True, results are yielded in coros order, otherwise in completion order
+    :return: an async generator of the coros results
+    """
+    first_error = None
+    next_index = 0
+    # results of coros completed before previous coros when ordered
+    early_results = {}
+    done_tasks = _iterate_done_tasks(coros, max_in_flight)
+    try:
+        async for index, task in done_tasks:
+            result = _get_task_result_or_exception(task)
+            is_error = isinstance(result, Exception)
+            if is_error and first_error is None:
+                first_error = result
+            if not ordered:
+                if not is_error:
+                    yield result
+                continue
+            early_results[index] = (is_error, result)
+            while next_index in early_results:
+                is_error, result = early_results.pop(next_index)
+                next_index += 1
+                if not is_error:
+                    yield result
+    finally:
+        # async generators are not closed when their iteration is interrupted:
+        # close it now to cancel remaining tasks
+        await done_tasks.aclose()
+    if first_error is not None:
+        raise first_error
+
+
+async def _iterate_done_tasks(coros, max_in_flight):
+    """
+    Run coros as tasks, with at most max_in_flight tasks at the same time
+    :return: an async generator of (coro index, done task) in completion order
+    """
+    # iterators create their coros when iterated: don't create coros only to close them
+    are_coros_created = iter(coros) is not coros
+    coros_iterator = enumerate(coros)
+    index_by_task = {}
+    try:
+        while True:
+            while len(index_by_task) < max_in_flight:
+                try:
+                    index, coro = next(coros_iterator)
+                except StopIteration:
+                    break
+                index_by_task[asyncio.ensure_future(coro)] = index
+            if not index_by_task:
+                return
+            done, _ = await asyncio.wait(
+                index_by_task, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield index_by_task.pop(task), task
+    finally:
+        if are_coros_created:
+            # interrupted: close unstarted coros to avoid "never awaited" warnings
+            for _, coro in coros_iterator:
+                if asyncio.iscoroutine(coro):
+                    coro.close()
+        if index_by_task:
+            # interrupted: cancel remaining tasks
+            for task in index_by_task:
+                task.cancel()
+            await asyncio.wait(index_by_task)
+
+
+def _get_task_result_or_exception(task):
+    if task.cancelled():
+        return asyncio.CancelledError()
+    return task.exception() or task.result()
+
+
+class TaskGroup:
+    """
+    Async context manager waiting for all its tasks to be done before leaving.
+    Raises errors.TaskGroupError containing every task error when tasks failed.
+    When the context body raises or is cancelled, remaining tasks are cancelled and awaited.
+    """
+
+    def __init__(self, max_concurrency=None):
+        """
+        :param max_concurrency: when set, at most max_concurrency tasks run at the same time
+        """
+        self._tasks = []
+        self._semaphore = (
+            None if max_concurrency is None else asyncio.Semaphore(max_concurrency)
+        )
+
+    def create_task(self, coro):
+        """
+        Run the given coro in a task of this group
+        :return: the created task
+        """
+        task = asyncio.create_task(
+            coro if self._semaphore is None else self._run_with_semaphore(coro)
+        )
+        self._tasks.append(task)
+        return task
+
+    async def _run_with_semaphore(self, coro):
+        async with self._semaphore:
+            return await coro
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self._cancel_tasks()
+        try:
+            await self._wait_tasks()
+        except asyncio.CancelledError:
+            self._cancel_tasks()
+            await self._wait_tasks()
+            raise
+        if exc_type is not None:
+            return False
+        if task_errors := [
+            task.exception()
+            for task in self._tasks
+            if not task.cancelled() and task.exception() is not None
+        ]:
+            raise errors.TaskGroupError(task_errors)
+        return False
+
+    async def _wait_tasks(self):
+        # tasks can be added while waiting
+        while pending_tasks := [task for task in self._tasks if not task.done()]:
+            await asyncio.wait(pending_tasks)
+
+    def _cancel_tasks(self):
+        for task in self._tasks:
+            task.cancel()
+
+
 class RLock(asyncio.Lock):
     """
     Async Lock implementing reentrancy
@@ -144,3 +315,163 @@ class RLock(asyncio.Lock):
         if self._depth == 0:
             super().release()
             self._task = None
+
+
+class FastRLock:
+    """
+    Reentrant async lock with an uncontended fast path: acquiring a free or already owned lock
+    never yields to the event loop and only looks up the current task once.
+    When fair is True, the lock is handed over to waiters in FIFO order. Otherwise, a task
+    acquiring a released lock can get it before woken up waiters, which improves throughput.
+    Contention metrics are always collected as they are only updated on the waiting path,
+    hold time is only measured when track_hold_time is True.
+    """
+
+    __slots__ = [
+        "fair",
+        "track_hold_time",
+        "contended_acquisitions",
+        "total_wait_time",
+        "max_wait_time",
+        "max_hold_time",
+        "_owner",
+        "_depth",
+        "_waiters",
+        "_acquired_at",
+    ]
+
+    def __init__(self, fair=False, track_hold_time=False):
+        self.fair = fair
+        self.track_hold_time = track_hold_time
+        self.contended_acquisitions = 0
+        self.total_wait_time = 0
+        self.max_wait_time = 0
+        self.max_hold_time = 0
+        self._owner = None
+        self._depth = 0
+        # (future, task) of waiting tasks
+        self._waiters = collections.deque()
+        self._acquired_at = None
+
+    def locked(self):
+        """
+        :return: True when the lock is owned by a task
+        """
+        return self._owner is not None
+
+    async def acquire(self):
+        """
+        Acquire the lock, waiting for it to be released when owned by another task
+        """
+        task = asyncio.current_task()
+        if self._owner is task:
+            self._depth += 1
+            return True
+        if self._owner is None and not (self.fair and self._waiters):
+            self._take(task)
+            return True
+        await self._wait_for_lock(task)
+        return True
+
+    def release(self):
+        """
+        Release the lock, it is given to waiters when released as many times as it has been acquired
+        """
+        if self._depth == 0:
+            raise RuntimeError("FastRLock is not acquired.")
+        self._depth -= 1
+        if self._depth == 0:
+            self._release_ownership()
+
+    def get_metrics(self):
+        """
+        :return: a dict of the lock contention metrics
+        """
+        return {
+            "contended_acquisitions": self.contended_acquisitions,
+            "total_wait_time": self.total_wait_time,
+            "max_wait_time": self.max_wait_time,
+            "max_hold_time": self.max_hold_time,
+            "waiters": len(self._waiters),
+        }
+
+    async def __aenter__(self):
+        # same as acquire(), inlined to avoid creating a nested coroutine
+        task = asyncio.current_task()
+        if self._owner is task:
+            self._depth += 1
+        elif self._owner is None and not (self.fair and self._waiters):
+            self._take(task)
+        else:
+            await self._wait_for_lock(task)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+    def _take(self, task):
+        self._owner = task
+        self._depth = 1
+        if self.track_hold_time:
+            self._acquired_at = time.perf_counter()
+
+    def _release_ownership(self):
+        if self.track_hold_time:
+            self.max_hold_time = max(
+                self.max_hold_time, time.perf_counter() - self._acquired_at
+            )
+        self._owner = None
+        self._depth = 0
+        self._wake_up_next_waiter()
+
+    def _wake_up_next_waiter(self):
+        while self._waiters:
+            future, task = self._waiters.popleft()
+            if future.done():
+                # cancelled waiter
+                continue
+            if self.fair:
+                # hand the lock over to prevent other tasks from taking it
+                self._take(task)
+            future.set_result(True)
+            return
+
+    async def _wait_for_lock(self, task):
+        self.contended_acquisitions += 1
+        wait_start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        retry = False
+        while True:
+            future = loop.create_future()
+            if retry:
+                # keep this waiter first when another task took the lock before it woke up
+                self._waiters.appendleft((future, task))
+            else:
+                self._waiters.append((future, task))
+            try:
+                await future
+            except asyncio.CancelledError:
+                self._on_cancelled_wait(future, task)
+                raise
+            if self._owner is task:
+                # lock handed over in fair mode
+                break
+            if self._owner is None:
+                self._take(task)
+                break
+            retry = True
+        wait_time = time.perf_counter() - wait_start
+        self.total_wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def _on_cancelled_wait(self, future, task):
+        if self._owner is task:
+            # the lock was handed over before cancellation: give it to the next waiter
+            self._release_ownership()
+        elif not future.done() or future.cancelled():
+            try:
+                self._waiters.remove((future, task))
+            except ValueError:
+                pass
+        elif self._owner is None:
+            # woken up but cancelled before taking the lock: wake up the next waiter instead
+            self._wake_up_next_waiter()
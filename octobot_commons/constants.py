@@ -156,6 +156,21 @@ RESOURCES_WATCHER_MINUTES_INTERVAL = int(
     os.getenv("RESOURCES_WATCHER_MINUTES_INTERVAL", "10")
 )
 BYTES_BY_GB = 1000000000
+MEMORY_WATCHER_GROWTH_THRESHOLD_PERCENT = float(
+    os.getenv("MEMORY_WATCHER_GROWTH_THRESHOLD_PERCENT", "20")
+)
+MEMORY_WATCHER_OBJECTS_SAMPLING_STRIDE = 100
+# objects are counted once every MEMORY_WATCHER_OBJECTS_COUNT_CALLS_INTERVAL memory watcher calls
+MEMORY_WATCHER_OBJECTS_COUNT_CALLS_INTERVAL = 6
+MEMORY_WATCHER_TOP_OBJECT_TYPES = 20
+MEMORY_WATCHER_TRACEMALLOC_FRAMES = 5
+SAMPLING_PROFILER_FREQUENCY = float(os.getenv("SAMPLING_PROFILER_FREQUENCY", "20"))
+SAMPLING_PROFILER_ROTATION_MINUTES_INTERVAL = float(
+    os.getenv("SAMPLING_PROFILER_ROTATION_MINUTES_INTERVAL", "10")
+)
+SAMPLING_PROFILER_MIN_DUMP_INTERVAL_SECONDS = 30
+SAMPLING_PROFILER_MAX_FILES = 24
+SAMPLING_PROFILER_FILE_EXT = ".collapsed"
 
 # Evaluators
 MIN_EVAL_TIME_FRAME = enums.TimeFrames.ONE_MINUTE
@@ -196,6 +211,22 @@ METRICS_ROUTE_COMMUNITY = f"{METRICS_ROUTE}/community"
 METRICS_ROUTE_UPTIME = f"{METRICS_ROUTE}/uptime"
 METRICS_ROUTE_REGISTER = f"{METRICS_ROUTE}/register"
 COMMUNITY_TOPS_COUNT = 1000
+LATENCY_HISTOGRAM_BUCKETS_SECONDS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1,
+    5,
+    10,
+    30,
+    60,
+    300,
+)
 
 # default values in config files and interfaces
 DEFAULT_API_KEY = "your-api-key-here"
@@ -225,6 +256,19 @@ UNPROVIDED_CACHE_IDENTIFIER = "_unprovided"
 
 # Async settings
 DEFAULT_FUTURE_TIMEOUT = 120
+ASYNC_JOB_THREAD_POOL_MAX_WORKERS = int(
+    os.getenv("ASYNC_JOB_THREAD_POOL_MAX_WORKERS", "4")
+)
+ASYNC_JOB_PROCESS_POOL_MAX_WORKERS = int(
+    os.getenv("ASYNC_JOB_PROCESS_POOL_MAX_WORKERS", "2")
+)
+EVENT_LOOP_MONITOR_HEARTBEAT_SECONDS = float(
+    os.getenv("EVENT_LOOP_MONITOR_HEARTBEAT_SECONDS", "0.5")
+)
+EVENT_LOOP_SLOW_CALLBACK_THRESHOLD_SECONDS = float(
+    os.getenv("EVENT_LOOP_SLOW_CALLBACK_THRESHOLD_SECONDS", "0.1")
+)
+EVENT_LOOP_MONITOR_MAX_STORED_SLOW_CALLBACKS = 50
 
 # Github urls
 GITHUB_RAW_CONTENT_URL = "https://raw.githubusercontent.com"
@@ -234,6 +278,13 @@ GITHUB_ORGANISATION = "Drakkar-Software"
 
 # External resources
 EXTERNAL_RESOURCE_URL = "https://raw.githubusercontent.com/Drakkar-Software/OctoBot/assets/external_resources.json"
+EXTERNAL_RESOURCE_CACHE_TTL_SECONDS = float(
+    os.getenv("EXTERNAL_RESOURCE_CACHE_TTL_SECONDS", "3600")
+)
+EXTERNAL_RESOURCE_TIMEOUT_SECONDS = 30
+EXTERNAL_RESOURCE_CACHE_FILE_PATH = (
+    f"{USER_FOLDER}/{CACHE_FOLDER}/external_resources.json"
+)
 
 # Run databases
 DATA_FOLDER = "data"
@@ -245,6 +296,9 @@ MAX_OPTIMIZER_RUNS = 50000
 # DSL interpreter
 BASE_OPERATORS_LIBRARY = "base"
 CONTEXTUAL_OPERATORS_LIBRARY = "contextual"
+DSL_STREAM_MAX_BUFFERED_FRAMES = 16
+# FlatExecutor computes shallower operator trees using the regular tree walk
+DSL_FLAT_EXECUTION_MIN_DEPTH = 8
 
 # Logging
 EXCEPTION_DESC = "exception_desc"
@@ -289,5 +343,18 @@ ENABLE_CERTIFI_SSL_CERTIFICATES = parse_boolean_environment_var(
 KNOWN_POTENTIALLY_SSL_FAILED_REQUIRED_URL = (
     "https://tentacles.octobot.online/officials/packages/full/base/1.0.9/metadata.yaml"
 )
+AIOHTTP_CONNECTOR_LIMIT = int(os.getenv("AIOHTTP_CONNECTOR_LIMIT", "100"))
+AIOHTTP_CONNECTOR_LIMIT_PER_HOST = int(
+    os.getenv("AIOHTTP_CONNECTOR_LIMIT_PER_HOST", "20")
+)
+AIOHTTP_KEEPALIVE_TIMEOUT_SECONDS = 30
+AIOHTTP_DNS_CACHE_TTL_SECONDS = 300
+REQUESTS_RATE_TRACKER_WINDOW_SECONDS = 60
+REQUESTS_RATE_TRACKER_PRUNE_INTERVAL = 1000
+REQUEST_PATHS_CACHE_SIZE = 4096
+DOWNLOAD_CHUNK_SIZE = 8 * 2**20
+DOWNLOAD_MAX_PARALLEL_CHUNKS = 4
+DOWNLOAD_READ_SIZE = 2**20
+DOWNLOAD_MANIFEST_EXT = ".manifest.json"
 IS_DEV_MODE_ENABLED = parse_boolean_environment_var(CONFIG_DEBUG_OPTION, "False")
 USE_MINIMAL_LIBS = parse_boolean_environment_var("USE_MINIMAL_LIBS", "false")
@@ -15,6 +15,7 @@
 #  License along with this library.
 import contextlib
 import octobot_commons.logging
+import octobot_commons.metrics_registry as metrics_registry
 
 
 class DocumentDatabase:
@@ -28,6 +29,17 @@ class DocumentDatabase:
         :param database_adaptor: database adaptor
         """
         self.adaptor = database_adaptor
+        self._logger = None
+        self._adaptor_name = (
+            database_adaptor.__name__
+            if isinstance(database_adaptor, type)
+            else database_adaptor.__class__.__name__
+        )
+        self._operations_metric = metrics_registry.get_metrics_registry().counter(
+            "octobot_database_operations_total",
+            "DocumentDatabase operations",
+            ("adaptor", "operation"),
+        )
 
     def initialize(self):
         """
@@ -55,6 +67,7 @@ class DocumentDatabase:
         :param query: select query
         :param uuid: id of the document
         """
+        self._count_operation("select")
         return await self.adaptor.select(table_name, query, uuid=uuid)
 
     async def tables(self) -> list:
@@ -69,6 +82,7 @@ class DocumentDatabase:
         :param table_name: name of the table
         :param row: data to insert
         """
+        self._count_operation("insert")
         return await self.adaptor.insert(table_name, row)
 
     async def upsert(self, table_name: str, row: dict, query, uuid=None) -> int:
@@ -79,6 +93,7 @@ class DocumentDatabase:
         :param query: select query
         :param uuid: id of the document
         """
+        self._count_operation("upsert")
         return await self.adaptor.upsert(table_name, row, query, uuid=uuid)
 
     async def insert_many(self, table_name: str, rows: list) -> list:
@@ -87,6 +102,7 @@ class DocumentDatabase:
         :param table_name: name of the table
         :param rows: data to insert
         """
+        self._count_operation("insert_many")
         return await self.adaptor.insert_many(table_name, rows)
 
     async def update(self, table_name: str, row: dict, query: dict, uuid=None) -> list:
@@ -97,6 +113,7 @@ class DocumentDatabase:
         :param query: select statement
         :param uuid: id of the document
         """
+        self._count_operation("update")
         return await self.adaptor.update(table_name, row, query, uuid=uuid)
 
     async def update_many(self, table_name: str, update_values: list) -> list:
@@ -105,6 +122,7 @@ class DocumentDatabase:
         :param table_name: name of the table
         :param update_values: values to update
         """
+        self._count_operation("update_many")
         return await self.adaptor.update(table_name, update_values)
 
     async def delete(self, table_name: str, query, uuid=None) -> list:
@@ -114,6 +132,7 @@ class DocumentDatabase:
         :param query: select query
         :param uuid: id of the document
         """
+        self._count_operation("delete")
         return await self.adaptor.delete(table_name, query, uuid=uuid)
 
     async def count(self, table_name: str, query) -> int:
@@ -122,6 +141,7 @@ class DocumentDatabase:
         :param table_name: name of the table
         :param query: select query
         """
+        self._count_operation("count")
         return await self.adaptor.count(table_name, query)
 
     async def query_factory(self):
@@ -148,6 +168,7 @@ class DocumentDatabase:
         """
         Flushes the database cache
         """
+        self._count_operation("flush")
         self.get_logger().debug("flushing database")
         return await self.adaptor.flush()
 
@@ -158,11 +179,16 @@ class DocumentDatabase:
         self.get_logger().debug("closing database")
         return await self.adaptor.close()
 
+    def _count_operation(self, operation: str):
+        self._operations_metric.inc(labels=(self._adaptor_name, operation))
+
     def get_logger(self):
         """
         :return: the database logger
         """
-        return octobot_commons.logging.get_logger(str(self))
+        if self._logger is None:
+            self._logger = octobot_commons.logging.get_logger(str(self))
+        return self._logger
 
     def __str__(self):
         return f"{self.__class__.__name__} with adaptor: {self.adaptor}"
@@ -17,6 +17,7 @@
 import octobot_commons.constants as constants
 import octobot_commons.enums as enums
 import octobot_commons.errors as errors
+import octobot_commons.metrics_registry as metrics_registry
 import octobot_commons.databases.cache_manager as cache_manager
 import octobot_commons.databases.implementations as implementations
 import octobot_commons.databases.document_database_adaptors as document_database_adaptors
@@ -34,6 +35,9 @@ class CacheClient:
         config_name=None,
     ):
         self._flush_cache_when_necessary = flush_cache_when_necessary
+        self._cache_reads_metric = metrics_registry.get_metrics_registry().counter(
+            "octobot_cache_reads_total", "CacheClient cached value reads", ("result",)
+        )
         self.cache_manager = cache_manager.CacheManager(
             database_adaptor=document_database_adaptors.TinyDBAdaptor
         )
@@ -152,13 +156,13 @@ class CacheClient:
         :return: the cached value and a boolean (True if cached value is missing from cache)
         """
         try:
-            return (
-                await self.get_cache(
-                    tentacle_name=tentacle_name, config_name=config_name
-                ).get(cache_key, name=value_key),
-                False,
-            )
+            value = await self.get_cache(
+                tentacle_name=tentacle_name, config_name=config_name
+            ).get(cache_key, name=value_key)
+            self._cache_reads_metric.inc(labels=("hit",))
+            return value, False
         except errors.NoCacheValue:
+            self._cache_reads_metric.inc(labels=("miss",))
             return None, True
 
     async def set_cached_value(
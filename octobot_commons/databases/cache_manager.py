@@ -30,7 +30,7 @@ class CacheManager:
     Manages cache as a global dict since caches can be accessed from live, backtesting and optimizers concurrently
     """
 
-    CACHES = tree.BaseTree()
+    CACHES = tree.BaseTree(use_path_index=True)
     DEFAULT_CONFIG_IDENTIFIER = "default"
 
     def __init__(self, database_adaptor=adaptors.TinyDBAdaptor):
@@ -242,7 +242,7 @@ class CacheManager:
         for cache, _ in self._caches():
             if cache.node_value.is_open():
                 await cache.node_value.close()
-        self.__class__.CACHES = tree.BaseTree()
+        self.__class__.CACHES = tree.BaseTree(use_path_index=True)
 
     def _caches(
         self,
@@ -19,9 +19,12 @@ from octobot_commons.dsl_interpreter.operator import (
     Operator,
     OperatorParameterType,
     ComputedOperatorParameterType,
+    clear_parameters_arity_cache,
 )
 from octobot_commons.dsl_interpreter.dictionnaries import (
     get_all_operators,
+    get_operators_by_name,
+    create_interpreter,
     clear_get_all_operators_cache,
 )
 from octobot_commons.dsl_interpreter.operator_parameter import OperatorParameter
@@ -36,10 +39,14 @@ from octobot_commons.dsl_interpreter.operators import (
     ExpressionOperator,
 )
 from octobot_commons.dsl_interpreter.interpreter_dependency import InterpreterDependency
+from octobot_commons.dsl_interpreter.flat_executor import FlatExecutor
 
 __all__ = [
     "get_all_operators",
+    "get_operators_by_name",
+    "create_interpreter",
     "clear_get_all_operators_cache",
+    "clear_parameters_arity_cache",
     "Interpreter",
     "Operator",
     "OperatorParameter",
@@ -52,4 +59,5 @@ __all__ = [
     "NameOperator",
     "ExpressionOperator",
     "InterpreterDependency",
+    "FlatExecutor",
 ]
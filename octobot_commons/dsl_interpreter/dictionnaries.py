@@ -14,6 +14,8 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 import functools
+import types
+import typing
 
 import octobot_commons.dsl_interpreter
 import octobot_commons.tentacles_management
@@ -58,8 +60,41 @@ def get_all_operators(
     return non_abstract_operators
 
 
+@functools.lru_cache(maxsize=16)
+def get_operators_by_name(
+    *libraries: str,
+) -> typing.Mapping[str, typing.Type["octobot_commons.dsl_interpreter.Operator"]]:
+    """
+    Get the read-only operators table of the given libraries, indexed by operator name.
+    This function is cached: the same table is shared by every interpreter
+    created with create_interpreter using the same libraries.
+    :param libraries: List of libraries to filter operators by, see get_all_operators
+    """
+    return types.MappingProxyType(
+        {operator.get_name(): operator for operator in get_all_operators(*libraries)}
+    )
+
+
+def create_interpreter(
+    *libraries: str,
+    flat_execution: bool = False,
+) -> "octobot_commons.dsl_interpreter.Interpreter":
+    """
+    Create an interpreter using the cached operators table of the given libraries.
+    Operators discovery is only performed once per libraries set.
+    :param libraries: List of libraries to filter operators by, see get_all_operators
+    :param flat_execution: see Interpreter
+    """
+    return octobot_commons.dsl_interpreter.Interpreter.from_operators_by_name(
+        get_operators_by_name(*libraries), flat_execution=flat_execution
+    )
+
+
 def clear_get_all_operators_cache():
     """
-    Clear the cache of the get_all_operators function.
+    Clear the cache of the get_all_operators function and the associated
+    operators tables and parameters arity.
     """
     get_all_operators.cache_clear()
+    get_operators_by_name.cache_clear()
+    octobot_commons.dsl_interpreter.clear_parameters_arity_cache()
@@ -0,0 +1,144 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import typing
+
+import octobot_commons.constants
+import octobot_commons.dsl_interpreter.operator as dsl_interpreter_operator
+
+
+class FlatExecutor:
+    """
+    Computes a prepared operator tree without recursion.
+    The tree is compiled once into a postfix list of instructions computed in a tight loop
+    over a value stack: each operator result is pushed on the stack and popped into the
+    preallocated computed parameters list of its parent operator.
+    Only operators with SUPPORTS_FLAT_EXECUTION are flattened, other operators are computed
+    using the regular tree walk.
+    Python function calls being already cheap, the flat execution is only faster on deep
+    operator trees (see benchmarks/dsl_interpreter_benchmark.py): trees shallower than
+    min_depth are computed using the regular tree walk.
+    """
+
+    def __init__(
+        self,
+        operator_tree: dsl_interpreter_operator.Operator,
+        min_depth: typing.Optional[int] = None,
+    ):
+        """
+        :param min_depth: shallower trees are computed using the regular tree walk,
+        defaults to octobot_commons.constants.DSL_FLAT_EXECUTION_MIN_DEPTH
+        """
+        # postfix instructions: (operator.compute, operator, computed parameters list,
+        # nested operators indexes in reversed order). Operators without nested operator
+        # or computed using the regular tree walk only have a compute instruction
+        self._instructions: typing.List[
+            typing.Tuple[
+                typing.Callable,
+                dsl_interpreter_operator.Operator,
+                typing.Optional[list],
+                typing.Optional[typing.Tuple[int, ...]],
+            ]
+        ] = []
+        # set when the operator tree is computed using the regular tree walk
+        self._tree_walk_compute: typing.Optional[typing.Callable] = None
+        if min_depth is None:
+            min_depth = octobot_commons.constants.DSL_FLAT_EXECUTION_MIN_DEPTH
+        if self._compile(operator_tree) < min_depth:
+            # not worth it
+            self._instructions = []
+            self._tree_walk_compute = operator_tree.compute
+
+    def execute(self) -> dsl_interpreter_operator.ComputedOperatorParameterType:
+        """
+        Compute the compiled operator tree.
+        pre_compute() of the operator tree should be awaited beforehand.
+        """
+        if self._tree_walk_compute is not None:
+            return self._tree_walk_compute()
+        # pylint: disable=protected-access
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        try:
+            for compute, operator, computed_parameters, indexes in self._instructions:
+                if indexes is None:
+                    push(compute())
+                    continue
+                for index in indexes:
+                    computed_parameters[index] = pop()
+                operator._flat_execution_parameters = computed_parameters
+                push(compute())
+                operator._flat_execution_parameters = None
+                # don't keep nested operators results alive
+                for index in indexes:
+                    computed_parameters[index] = None
+        except BaseException:
+            for _, operator, computed_parameters, indexes in self._instructions:
+                if indexes is not None:
+                    operator._flat_execution_parameters = None
+                    for index in indexes:
+                        computed_parameters[index] = None
+            raise
+        return stack[0]
+
+    def get_instructions_count(self) -> int:
+        """
+        :return: the number of compiled instructions, 0 when using the regular tree walk
+        """
+        return len(self._instructions)
+
+    def _compile(self, operator_tree: dsl_interpreter_operator.Operator) -> int:
+        """
+        Compile the operator tree into self._instructions
+        :return: the depth of the flattened operator tree
+        """
+        max_depth = 0
+        to_visit = [(operator_tree, False, 1)]
+        while to_visit:
+            operator, are_parameters_visited, depth = to_visit.pop()
+            max_depth = max(max_depth, depth)
+            indexes = (
+                tuple(
+                    index
+                    for index, parameter in enumerate(operator.parameters)
+                    if isinstance(parameter, dsl_interpreter_operator.Operator)
+                )
+                if operator.SUPPORTS_FLAT_EXECUTION
+                else ()
+            )
+            if not indexes:
+                # no nested operator or computed using the regular tree walk
+                self._instructions.append((operator.compute, operator, None, None))
+                continue
+            if are_parameters_visited:
+                self._instructions.append(
+                    (
+                        operator.compute,
+                        operator,
+                        [
+                            None if index in indexes else parameter
+                            for index, parameter in enumerate(operator.parameters)
+                        ],
+                        # nested operators results are popped in reversed order
+                        tuple(reversed(indexes)),
+                    )
+                )
+                continue
+            to_visit.append((operator, True, depth))
+            # push in reverse order to compute parameters from left to right
+            for index in reversed(indexes):
+                to_visit.append((operator.parameters[index], False, depth + 1))
+        return max_depth
@@ -15,10 +15,17 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 import ast
+import asyncio
 import typing
+
+import octobot_commons.constants
 import octobot_commons.errors
 import octobot_commons.dsl_interpreter.operator as dsl_interpreter_operator
 import octobot_commons.dsl_interpreter.interpreter_dependency as dsl_interpreter_dependency
+import octobot_commons.dsl_interpreter.flat_executor as dsl_interpreter_flat_executor
+
+
+_END_OF_STREAM = object()
 
 
 class Interpreter:
@@ -28,16 +35,22 @@ class Interpreter:
     """
 
     def __init__(
-        self, operators: typing.List[typing.Type[dsl_interpreter_operator.Operator]]
+        self,
+        operators: typing.List[typing.Type[dsl_interpreter_operator.Operator]],
+        flat_execution: bool = False,
     ):
         """
         Initialize the interpreter with a list of operator classes.
 
         Args:
             operators: List of Operator subclasses to be used for interpretation
+            flat_execution: When True, prepared expressions are computed using a
+                FlatExecutor instead of recursively computing the operator tree.
+                Shallow operator trees are still computed recursively
         """
         # Save operators as a dictionary mapping operator name to operator class
-        self.operators_by_name: typing.Dict[
+        # (can be a shared read-only mapping until extend() is called)
+        self.operators_by_name: typing.Mapping[
             str, typing.Type[dsl_interpreter_operator.Operator]
         ] = {}
         self.extend(operators)
@@ -45,6 +58,26 @@ class Interpreter:
             dsl_interpreter_operator.Operator,
             dsl_interpreter_operator.ComputedOperatorParameterType,
         ] = None
+        self.flat_execution: bool = flat_execution
+        self._flat_executor: typing.Optional[
+            dsl_interpreter_flat_executor.FlatExecutor
+        ] = None
+
+    @classmethod
+    def from_operators_by_name(
+        cls,
+        operators_by_name: typing.Mapping[
+            str, typing.Type[dsl_interpreter_operator.Operator]
+        ],
+        flat_execution: bool = False,
+    ) -> "Interpreter":
+        """
+        Create an interpreter sharing the given operators table instead of building its own.
+        The shared table is copied only if the interpreter is extended.
+        """
+        interpreter = cls([], flat_execution=flat_execution)
+        interpreter.operators_by_name = operators_by_name
+        return interpreter
 
     def extend(
         self, operators: typing.List[typing.Type[dsl_interpreter_operator.Operator]]
@@ -52,6 +85,9 @@ class Interpreter:
         """
         Extend the interpreter with a list of operator classes.
         """
+        if not isinstance(self.operators_by_name, dict):
+            # don't update shared operators tables
+            self.operators_by_name = dict(self.operators_by_name)
         self.operators_by_name.update(
             {operator_class.get_name(): operator_class for operator_class in operators}
         )
@@ -71,6 +107,94 @@ class Interpreter:
         self._parse_expression(expression)
         return await self.compute_expression()
 
+    async def interprete_stream(
+        self,
+        expression: str,
+        frames: typing.AsyncIterator[typing.Any],
+        max_buffered_frames: int = octobot_commons.constants.DSL_STREAM_MAX_BUFFERED_FRAMES,
+    ) -> typing.AsyncGenerator[
+        dsl_interpreter_operator.ComputedOperatorParameterType, None
+    ]:
+        """
+        Interpret a string expression for each frame of the given frames stream.
+
+        Args:
+            expression: String expression to interpret
+            frames: Async iterator of input frames (ex: candles or market updates)
+            max_buffered_frames: Maximum number of frames read ahead from frames
+
+        Yields:
+            The result of the expression after each frame
+        """
+        self.prepare(expression)
+        async for result in self.compute_expression_stream(
+            frames, max_buffered_frames=max_buffered_frames
+        ):
+            yield result
+
+    async def compute_expression_stream(
+        self,
+        frames: typing.AsyncIterator[typing.Any],
+        max_buffered_frames: int = octobot_commons.constants.DSL_STREAM_MAX_BUFFERED_FRAMES,
+    ) -> typing.AsyncGenerator[
+        dsl_interpreter_operator.ComputedOperatorParameterType, None
+    ]:
+        """
+        Compute the prepared expression for each frame of the given frames stream.
+        Operators are kept between frames, operators state is updated by on_frame().
+        Frames are read ahead in a bounded buffer of max_buffered_frames frames.
+        """
+        frame_operators = self._get_frame_operators()
+        buffered_frames = asyncio.Queue(maxsize=max_buffered_frames)
+        frames_reader = asyncio.create_task(self._read_frames(frames, buffered_frames))
+        try:
+            while (frame := await buffered_frames.get()) is not _END_OF_STREAM:
+                for operator in frame_operators:
+                    operator.on_frame(frame)
+                yield await self.compute_expression()
+            if error := await frames_reader:
+                raise error
+        finally:
+            if not frames_reader.done():
+                frames_reader.cancel()
+
+    @staticmethod
+    async def _read_frames(
+        frames: typing.AsyncIterator[typing.Any], buffered_frames: asyncio.Queue
+    ) -> typing.Optional[Exception]:
+        error = None
+        try:
+            async for frame in frames:
+                await buffered_frames.put(frame)
+        except Exception as err:  # pylint: disable=broad-except
+            error = err
+        await buffered_frames.put(_END_OF_STREAM)
+        return error
+
+    def _get_frame_operators(self) -> typing.List[dsl_interpreter_operator.Operator]:
+        """
+        :return: the operators of the prepared expression overriding on_frame()
+        """
+        if not isinstance(
+            self._operator_tree_or_constant, dsl_interpreter_operator.Operator
+        ):
+            return []
+        frame_operators = []
+        to_visit = [self._operator_tree_or_constant]
+        while to_visit:
+            operator = to_visit.pop()
+            if (
+                type(operator).on_frame
+                is not dsl_interpreter_operator.Operator.on_frame
+            ):
+                frame_operators.append(operator)
+            to_visit.extend(
+                parameter
+                for parameter in reversed(operator.parameters)
+                if isinstance(parameter, dsl_interpreter_operator.Operator)
+            )
+        return frame_operators
+
     def get_dependencies(
         self,
     ) -> typing.List[dsl_interpreter_dependency.InterpreterDependency]:
@@ -113,6 +237,16 @@ class Interpreter:
 
         # Visit the AST and convert nodes to Operator instances
         self._operator_tree_or_constant = self._visit_node(tree.body)
+        self._flat_executor = None
+        if self.flat_execution and isinstance(
+            self._operator_tree_or_constant, dsl_interpreter_operator.Operator
+        ):
+            flat_executor = dsl_interpreter_flat_executor.FlatExecutor(
+                self._operator_tree_or_constant
+            )
+            if flat_executor.get_instructions_count():
+                # otherwise the tree is too shallow to be flattened
+                self._flat_executor = flat_executor
 
     async def compute_expression(
         self,
@@ -126,6 +260,8 @@ class Interpreter:
             self._operator_tree_or_constant, dsl_interpreter_operator.Operator
         ):
             await self._operator_tree_or_constant.pre_compute()
+            if self._flat_executor is not None:
+                return self._flat_executor.execute()
             return self._operator_tree_or_constant.compute()
         return self._operator_tree_or_constant
 
@@ -28,6 +28,10 @@ OperatorParameterType = typing.Union[
 ComputedOperatorParameterType = typing.Union[
     str, int, float, bool, None, list, np.ndarray
 ]
+# (min, max) number of parameters described in get_parameters() by operator class
+_PARAMETERS_ARITY_BY_OPERATOR_CLASS: typing.Dict[
+    type, typing.Tuple[typing.Optional[int], typing.Optional[int]]
+] = {}
 
 
 class Operator:
@@ -47,6 +51,14 @@ class Operator:
     )
     DESCRIPTION: str = ""  # description of the operator
     EXAMPLE: str = ""  # example of the operator in the DSL
+    # set to True when compute() only reads nested operators results through get_computed_parameters()
+    # without mutating or keeping the returned list: FlatExecutor can then compute nested operators
+    # beforehand and reuse the same computed parameters list on each execution
+    SUPPORTS_FLAT_EXECUTION: bool = False
+    # set by FlatExecutor while compute() is called: precomputed parameters
+    _flat_execution_parameters: typing.Optional[
+        typing.List["ComputedOperatorParameterType"]
+    ] = None
 
     def __init__(self, *parameters: OperatorParameterType, **kwargs: typing.Any):
         self._validate_parameters(parameters)
@@ -81,19 +93,39 @@ class Operator:
             raise octobot_commons.errors.InvalidParametersError(
                 f"{self.get_name()} supports up to {self.MAX_PARAMS} parameters"
             )
-        if expected_parameters := self.get_parameters():
-            min_params = len(tuple(p for p in expected_parameters if p.required))
-            max_params = len(tuple(p for p in expected_parameters))
-            if len(parameters) < min_params:
-                raise octobot_commons.errors.InvalidParametersError(
-                    f"{self.get_name()} requires at least {min_params} "
-                    f"parameter(s): {self.get_parameters_description()}"
-                )
-            if max_params is not None and len(parameters) > max_params:
-                raise octobot_commons.errors.InvalidParametersError(
-                    f"{self.get_name()} supports up to {max_params} "
-                    f"parameters: {self.get_parameters_description()}"
+        min_params, max_params = self.get_parameters_arity()
+        if min_params is not None and len(parameters) < min_params:
+            raise octobot_commons.errors.InvalidParametersError(
+                f"{self.get_name()} requires at least {min_params} "
+                f"parameter(s): {self.get_parameters_description()}"
+            )
+        if max_params is not None and len(parameters) > max_params:
+            raise octobot_commons.errors.InvalidParametersError(
+                f"{self.get_name()} supports up to {max_params} "
+                f"parameters: {self.get_parameters_description()}"
+            )
+
+    @classmethod
+    def get_parameters_arity(
+        cls,
+    ) -> typing.Tuple[typing.Optional[int], typing.Optional[int]]:
+        """
+        Get the min and max number of parameters described in get_parameters().
+        Computed only once per operator class.
+        :return: (None, None) when get_parameters() describes no parameter
+        """
+        try:
+            return _PARAMETERS_ARITY_BY_OPERATOR_CLASS[cls]
+        except KeyError:
+            if expected_parameters := cls.get_parameters():
+                arity = (
+                    sum(1 for parameter in expected_parameters if parameter.required),
+                    len(expected_parameters),
                 )
+            else:
+                arity = (None, None)
+            _PARAMETERS_ARITY_BY_OPERATOR_CLASS[cls] = arity
+            return arity
 
     @classmethod
     def get_parameters_description(cls) -> str:
@@ -124,6 +156,14 @@ class Operator:
         """
         return []
 
+    def on_frame(self, frame: typing.Any) -> None:
+        """
+        Called for each input frame when the operator is computed on a stream of frames,
+        before pre_compute(). Override to update the operator state kept between frames
+        (ex: rolling windows or last values).
+        Nested operators receive the frame independently.
+        """
+
     async def pre_compute(self) -> None:  # rename pre_compute
         """
         Refreshes the operator data, override if necessary.
@@ -144,6 +184,8 @@ class Operator:
         Get the computed parameters of the operator.
         Here computed means that any nested operator has already been computed.
         """
+        if self._flat_execution_parameters is not None:
+            return self._flat_execution_parameters
         return [
             parameter.compute() if isinstance(parameter, Operator) else parameter
             for parameter in self.parameters
@@ -160,3 +202,10 @@ class Operator:
             if isinstance(parameter, Operator):
                 dependencies.extend(parameter.get_dependencies())
         return dependencies
+
+
+def clear_parameters_arity_cache():
+    """
+    Clear the cached number of parameters of each operator class.
+    """
+    _PARAMETERS_ARITY_BY_OPERATOR_CLASS.clear()
@@ -525,3 +525,8 @@ class ProfileType(enum.Enum):
 
 class SignalHistoryTypes(enum.Enum):
     GPT = "gpt"
+
+
+class AsyncJobExecutorTypes(enum.Enum):
+    THREAD = "thread"
+    PROCESS = "process"
@@ -151,3 +151,29 @@ class InvalidParametersError(DSLInterpreterError):
     """
     Raised when the parameters of an operator are invalid
     """
+
+
+class TaskGroupError(Exception):
+    """
+    Raised when tasks of a TaskGroup raised errors, errors are available in self.errors
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(
+            f"{len(errors)} task(s) failed: "
+            + ", ".join(f"{error.__class__.__name__}: {error}" for error in errors)
+        )
+
+
+class InvalidMetricError(Exception):
+    """
+    Raised when a metric is registered with a different type or labels than an existing one
+    or when used with invalid labels
+    """
+
+
+class InvalidChecksumError(Exception):
+    """
+    Raised when a downloaded file checksum is not the expected one
+    """
@@ -0,0 +1,198 @@
+# pylint: disable=R0902
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import collections
+import sys
+import threading
+import time
+import traceback
+
+import octobot_commons.constants as commons_constants
+import octobot_commons.histogram as histogram
+import octobot_commons.logging as logging
+import octobot_commons.singleton as singleton
+import octobot_commons.timestamp_util as timestamp_util
+
+
+class EventLoopMonitor(singleton.Singleton):
+    """
+    Measures the event loop lag using a periodic heartbeat: the lag is the delay between the
+    planned and actual heartbeat wake up, it is high when the loop is blocked by a slow callback.
+    In sampling mode, a watchdog thread captures the stack of the event loop thread
+    when it is blocked for more than slow_callback_threshold seconds.
+    """
+
+    def __init__(
+        self,
+        heartbeat_interval=commons_constants.EVENT_LOOP_MONITOR_HEARTBEAT_SECONDS,
+        slow_callback_threshold=commons_constants.EVENT_LOOP_SLOW_CALLBACK_THRESHOLD_SECONDS,
+        sampling=False,
+    ):
+        super().__init__()
+        self.logger = logging.get_logger(self.__class__.__name__)
+        self.heartbeat_interval = heartbeat_interval
+        self.slow_callback_threshold = slow_callback_threshold
+        self.sampling = sampling
+        self.lag_histogram = histogram.Histogram()
+        self.slow_callbacks = collections.deque(
+            maxlen=commons_constants.EVENT_LOOP_MONITOR_MAX_STORED_SLOW_CALLBACKS
+        )
+        self.slow_callbacks_count = 0
+        self.heartbeats_count = 0
+
+        self._heartbeat_task = None
+        self._sampling_thread = None
+        self._stop_event = threading.Event()
+        self._loop_thread_id = None
+        self._last_heartbeat_time = None
+        # stack captured by the sampling thread during the current heartbeat
+        self._sampled_stack = None
+
+    async def start(self):
+        """
+        Start the heartbeat and, in sampling mode, the sampling thread
+        """
+        if self.is_running():
+            return
+        self.logger.debug(f"Starting event loop monitor (sampling: {self.sampling})")
+        self._loop_thread_id = threading.get_ident()
+        self._last_heartbeat_time = time.monotonic()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        if self.sampling:
+            self._stop_event.clear()
+            self._sampling_thread = threading.Thread(
+                target=self._sampling_loop,
+                name=f"{self.__class__.__name__}-sampling",
+                daemon=True,
+            )
+            self._sampling_thread.start()
+
+    def stop(self):
+        """
+        Stop the heartbeat and the sampling thread
+        """
+        if self._heartbeat_task is not None:
+            self.logger.debug("Stopping event loop monitor")
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        if self._sampling_thread is not None:
+            self._stop_event.set()
+            self._sampling_thread.join()
+            self._sampling_thread = None
+
+    def is_running(self):
+        """
+        :return: True when the heartbeat is running
+        """
+        return self._heartbeat_task is not None and not self._heartbeat_task.done()
+
+    def get_stats(self):
+        """
+        :return: a snapshot of the event loop lag and slow callbacks stats
+        """
+        return {
+            "heartbeats": self.heartbeats_count,
+            "lag": self.lag_histogram.to_dict(),
+            "slow_callbacks_count": self.slow_callbacks_count,
+            "slow_callbacks": list(self.slow_callbacks),
+        }
+
+    def reset_stats(self):
+        """
+        Clear the collected stats
+        """
+        self.lag_histogram.reset()
+        self.slow_callbacks.clear()
+        self.slow_callbacks_count = 0
+        self.heartbeats_count = 0
+
+    async def _heartbeat_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            planned_time = loop.time() + self.heartbeat_interval
+            await asyncio.sleep(self.heartbeat_interval)
+            self._on_heartbeat(max(0, loop.time() - planned_time))
+
+    def _on_heartbeat(self, lag):
+        self._last_heartbeat_time = time.monotonic()
+        self.heartbeats_count += 1
+        self.lag_histogram.observe(lag)
+        if lag >= self.slow_callback_threshold:
+            self._on_slow_callback(lag, self._sampled_stack)
+        self._sampled_stack = None
+
+    def _on_slow_callback(self, lag, stack):
+        self.slow_callbacks_count += 1
+        self.slow_callbacks.append(
+            {
+                "timestamp": timestamp_util.get_now_time(),
+                "duration": lag,
+                "stack": stack,
+            }
+        )
+        if stack is None:
+            self.logger.warning(f"Event loop blocked for {round(lag, 3)}s")
+        else:
+            self.logger.warning(
+                f"Event loop blocked for {round(lag, 3)}s by:\n{''.join(stack)}"
+            )
+
+    def _sampling_loop(self):
+        # check the heartbeat twice per threshold to sample blocked loops in time
+        while not self._stop_event.wait(self.slow_callback_threshold / 2):
+            self._sample_blocked_loop()
+
+    def _sample_blocked_loop(self):
+        blocked_time = (
+            time.monotonic() - self._last_heartbeat_time - self.heartbeat_interval
+        )
+        if blocked_time < self.slow_callback_threshold or self._sampled_stack:
+            return
+        # pylint: disable=protected-access
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is not None:
+            self._sampled_stack = traceback.format_stack(frame)
+
+
+async def start_event_loop_monitor(
+    heartbeat_interval=commons_constants.EVENT_LOOP_MONITOR_HEARTBEAT_SECONDS,
+    slow_callback_threshold=commons_constants.EVENT_LOOP_SLOW_CALLBACK_THRESHOLD_SECONDS,
+    sampling=False,
+):
+    """
+    Start the event loop monitor
+    """
+    await EventLoopMonitor.instance(
+        heartbeat_interval, slow_callback_threshold, sampling
+    ).start()
+
+
+async def stop_event_loop_monitor():
+    """
+    Stop the event loop monitor
+    """
+    if (monitor := EventLoopMonitor.get_instance_if_exists()) is not None:
+        monitor.stop()
+
+
+def get_event_loop_stats():
+    """
+    :return: the event loop monitor stats snapshot, None when the monitor is not created
+    """
+    if (monitor := EventLoopMonitor.get_instance_if_exists()) is None:
+        return None
+    return monitor.get_stats()
@@ -1,4 +1,4 @@
-# pylint: disable=W0703,W3101
+# pylint: disable=W0703,W3101,R0902
 #  Drakkar-Software OctoBot
 #  Copyright (c) Drakkar-Software, All rights reserved.
 #
@@ -14,11 +14,211 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import asyncio
 import json
+import os
+import threading
+import time
+import aiohttp
 import requests
 
 import octobot_commons.logging as logging_util
 import octobot_commons.constants as constants
+import octobot_commons.singleton as singleton
+import octobot_commons.aiohttp_util as aiohttp_util
+
+
+class ExternalResourcesClient(singleton.Singleton):
+    """
+    Fetches and caches the external resources document.
+    The parsed document is kept for ttl seconds, it is then revalidated using
+    ETag / Last-Modified headers. Concurrent async fetches are coalesced into a single request.
+    The last fetched document is stored in cache_file_path and used when the document can't be fetched.
+    """
+
+    def __init__(
+        self,
+        url=constants.EXTERNAL_RESOURCE_URL,
+        ttl=constants.EXTERNAL_RESOURCE_CACHE_TTL_SECONDS,
+        cache_file_path=constants.EXTERNAL_RESOURCE_CACHE_FILE_PATH,
+        timeout=constants.EXTERNAL_RESOURCE_TIMEOUT_SECONDS,
+    ):
+        self.logger = logging_util.get_logger(self.__class__.__name__)
+        self.url = url
+        self.ttl = ttl
+        self.cache_file_path = cache_file_path
+        self.timeout = timeout
+        self.fetches_count = 0
+        self._resources = None
+        self._etag = None
+        self._last_modified = None
+        self._fetched_at = None
+        self._loaded_cache_file = False
+        self._fetch_task = None
+        self._sync_lock = threading.Lock()
+        self._requests_session = None
+        self._aiohttp_session = None
+
+    def get_resources(self) -> dict:
+        """
+        Blocking call
+        :return: the external resources document
+        """
+        if self._is_fresh():
+            return self._resources
+        with self._sync_lock:
+            # resources might have been fetched while waiting for the lock
+            if self._is_fresh():
+                return self._resources
+            return self._fetch()
+
+    async def async_get_resources(self, aiohttp_session=None) -> dict:
+        """
+        :param aiohttp_session: the aiohttp session to use, a client owned session is used when None
+        :return: the external resources document
+        """
+        if self._is_fresh():
+            return self._resources
+        if self._fetch_task is None or self._fetch_task.done():
+            self._fetch_task = asyncio.create_task(self._async_fetch(aiohttp_session))
+        # shield the shared fetch: cancelling a waiter should not cancel other waiters
+        return await asyncio.shield(self._fetch_task)
+
+    def invalidate(self):
+        """
+        Revalidate the cached document on the next call
+        """
+        self._fetched_at = None
+
+    async def close(self):
+        """
+        Close the client owned sessions
+        """
+        if self._aiohttp_session is not None:
+            await self._aiohttp_session.close()
+            self._aiohttp_session = None
+        if self._requests_session is not None:
+            self._requests_session.close()
+            self._requests_session = None
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._fetched_at is not None
+            and time.monotonic() - self._fetched_at < self.ttl
+        )
+
+    def _fetch(self) -> dict:
+        try:
+            if self._requests_session is None:
+                self._requests_session = requests.Session()
+            self.fetches_count += 1
+            with self._requests_session.get(
+                self.url,
+                headers=self._get_revalidation_headers(),
+                timeout=self.timeout,
+            ) as resp:
+                if resp.status_code == 304:
+                    return self._on_not_modified()
+                resp.raise_for_status()
+                return self._on_fetched(json.loads(resp.text), resp.headers)
+        except Exception as err:
+            return self._on_fetch_error(err)
+
+    async def _async_fetch(self, aiohttp_session) -> dict:
+        try:
+            if aiohttp_session is None:
+                if self._aiohttp_session is None or self._aiohttp_session.closed:
+                    self._aiohttp_session = (
+                        aiohttp_util.get_client_session_manager().get_session()
+                    )
+                aiohttp_session = self._aiohttp_session
+            self.fetches_count += 1
+            async with aiohttp_session.get(
+                self.url,
+                headers=self._get_revalidation_headers(),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            ) as resp:
+                if resp.status == 304:
+                    return self._on_not_modified()
+                resp.raise_for_status()
+                return self._on_fetched(json.loads(await resp.text()), resp.headers)
+        except Exception as err:
+            return self._on_fetch_error(err)
+
+    def _get_revalidation_headers(self) -> dict:
+        self._load_cache_file_if_necessary()
+        headers = {}
+        if self._resources is None:
+            return headers
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+        return headers
+
+    def _on_not_modified(self) -> dict:
+        self._fetched_at = time.monotonic()
+        return self._resources
+
+    def _on_fetched(self, resources, headers) -> dict:
+        self._resources = resources
+        self._etag = headers.get("ETag")
+        self._last_modified = headers.get("Last-Modified")
+        self._fetched_at = time.monotonic()
+        self._save_cache_file()
+        return self._resources
+
+    def _on_fetch_error(self, err) -> dict:
+        self._load_cache_file_if_necessary()
+        if self._resources is None:
+            raise err
+        self.logger.warning(
+            f"Impossible to fetch external resources ({err.__class__.__name__}: {err}), "
+            f"using the last fetched version"
+        )
+        # wait for ttl before trying again
+        self._fetched_at = time.monotonic()
+        return self._resources
+
+    def _load_cache_file_if_necessary(self):
+        if self._loaded_cache_file or self._resources is not None:
+            return
+        self._loaded_cache_file = True
+        if not self.cache_file_path or not os.path.isfile(self.cache_file_path):
+            return
+        try:
+            with open(self.cache_file_path, encoding="utf-8") as cache_file:
+                content = json.load(cache_file)
+            self._resources = content["resources"]
+            self._etag = content.get("etag")
+            self._last_modified = content.get("last_modified")
+        except Exception as err:
+            self.logger.warning(
+                f"Ignored invalid external resources cache file {self.cache_file_path}: {err}"
+            )
+
+    def _save_cache_file(self):
+        if not self.cache_file_path:
+            return
+        try:
+            if directory := os.path.dirname(self.cache_file_path):
+                os.makedirs(directory, exist_ok=True)
+            # write in a temporary file first to never leave a partially written cache
+            temp_file_path = f"{self.cache_file_path}.tmp"
+            with open(temp_file_path, "w", encoding="utf-8") as cache_file:
+                json.dump(
+                    {
+                        "etag": self._etag,
+                        "last_modified": self._last_modified,
+                        "resources": self._resources,
+                    },
+                    cache_file,
+                )
+            os.replace(temp_file_path, self.cache_file_path)
+        except Exception as err:
+            self.logger.warning(
+                f"Impossible to save external resources cache file {self.cache_file_path}: {err}"
+            )
 
 
 def _handle_exception(exception, resource_key, catch_exception, default_response):
@@ -49,10 +249,7 @@ def get_external_resource(
     :return: the external resource key value
     """
     try:
-        external_resources = json.loads(
-            requests.get(constants.EXTERNAL_RESOURCE_URL).text
-        )
-        return external_resources[resource_key]
+        return ExternalResourcesClient.instance().get_resources()[resource_key]
     except Exception as global_exception:
         return _handle_exception(
             global_exception, resource_key, catch_exception, default_response
@@ -71,9 +268,11 @@ async def async_get_external_resource(
     :return: the external resource key value
     """
     try:
-        async with aiohttp_session.get(constants.EXTERNAL_RESOURCE_URL) as resp:
-            external_resources = json.loads(resp.text())
-            return external_resources[resource_key]
+        return (
+            await ExternalResourcesClient.instance().async_get_resources(
+                aiohttp_session
+            )
+        )[resource_key]
     except Exception as global_exception:
         return _handle_exception(
             global_exception, resource_key, catch_exception, default_response
@@ -0,0 +1,107 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import bisect
+
+import octobot_commons.constants as constants
+
+
+class Histogram:
+    """
+    Fixed buckets histogram: bucket counts are preallocated and observing a value is O(log(buckets))
+    """
+
+    __slots__ = ["bounds", "bucket_counts", "count", "total", "min", "max"]
+
+    def __init__(self, bounds=constants.LATENCY_HISTOGRAM_BUCKETS_SECONDS):
+        """
+        :param bounds: sorted buckets upper bounds, an extra bucket is used for values above the last bound
+        """
+        self.bounds = tuple(bounds)
+        self.bucket_counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        """
+        Add the given value to the histogram
+        """
+        self.bucket_counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def get_percentile(self, percentile):
+        """
+        :param percentile: the percentile to get, between 0 and 100
+        :return: the upper bound of the bucket containing the given percentile
+        (or the max observed value when in the last bucket), None when empty
+        """
+        if self.count == 0:
+            return None
+        threshold = self.count * percentile / 100
+        cumulated_count = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            cumulated_count += bucket_count
+            if cumulated_count >= threshold and bucket_count:
+                return (
+                    min(self.bounds[index], self.max)
+                    if index < len(self.bounds)
+                    else self.max
+                )
+        return self.max
+
+    def get_average(self):
+        """
+        :return: the average of observed values, None when empty
+        """
+        return self.total / self.count if self.count else None
+
+    def reset(self):
+        """
+        Remove every observed value
+        """
+        self.bucket_counts = [0] * len(self.bucket_counts)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def to_dict(self) -> dict:
+        """
+        :return: a snapshot of the histogram as a dict
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "average": self.get_average(),
+            "p50": self.get_percentile(50),
+            "p90": self.get_percentile(90),
+            "p99": self.get_percentile(99),
+            "buckets": {
+                **{
+                    str(bound): bucket_count
+                    for bound, bucket_count in zip(self.bounds, self.bucket_counts)
+                },
+                "+Inf": self.bucket_counts[-1],
+            },
+        }
@@ -14,6 +14,11 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 
+from octobot_commons.logging import logs_store
+from octobot_commons.logging.logs_store import (
+    StoredLog,
+    LogsRingBuffer,
+)
 from octobot_commons.logging import logging_util
 from octobot_commons.logging.logging_util import (
     BotLogger,
@@ -21,6 +26,9 @@ from octobot_commons.logging.logging_util import (
     get_global_logger_level,
     temporary_log_level,
     get_logger_level_per_handler,
+    enable_queue_logging_pipeline,
+    disable_queue_logging_pipeline,
+    is_queue_logging_pipeline_enabled,
     get_logger,
     set_logging_level,
     get_backtesting_errors_count,
@@ -33,6 +41,8 @@ from octobot_commons.logging.logging_util import (
     error_notifier_callbacks,
     LOGS_MAX_COUNT,
     add_log,
+    get_logs_cursor,
+    iter_logs_since,
     get_errors_count,
     reset_errors_count,
     register_error_notifier,
@@ -41,11 +51,16 @@ from octobot_commons.logging.logging_util import (
 )
 
 __all__ = [
+    "StoredLog",
+    "LogsRingBuffer",
     "BotLogger",
     "set_global_logger_level",
     "get_global_logger_level",
     "temporary_log_level",
     "get_logger_level_per_handler",
+    "enable_queue_logging_pipeline",
+    "disable_queue_logging_pipeline",
+    "is_queue_logging_pipeline_enabled",
     "get_logger",
     "set_logging_level",
     "get_backtesting_errors_count",
@@ -58,6 +73,8 @@ __all__ = [
     "error_notifier_callbacks",
     "LOGS_MAX_COUNT",
     "add_log",
+    "get_logs_cursor",
+    "iter_logs_since",
     "get_errors_count",
     "reset_errors_count",
     "register_error_notifier",
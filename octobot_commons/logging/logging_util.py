@@ -14,29 +14,34 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import atexit
+import collections.abc
 import contextlib
 import logging
+import logging.handlers
+import queue
+import time
 import typing
 
 import octobot_commons.constants as constants
-import octobot_commons.timestamp_util as timestamp_util
 import octobot_commons.html_util as html_util
+import octobot_commons.logging.logs_store as logs_store
 
 LOG_DATABASE = "log_db"
 LOG_NEW_ERRORS_COUNT = "log_new_errors_count"
 
 BACKTESTING_NEW_ERRORS_COUNT: str = "log_backtesting_errors_count"
 
+LOGS_MAX_COUNT = 1000
+
 logs_database = {
-    LOG_DATABASE: [],
+    LOG_DATABASE: logs_store.LogsRingBuffer(LOGS_MAX_COUNT),
     LOG_NEW_ERRORS_COUNT: 0,
     BACKTESTING_NEW_ERRORS_COUNT: 0,
 }
 
 error_notifier_callbacks = []
 
-LOGS_MAX_COUNT = 1000
-
 STORED_LOG_MIN_LEVEL = logging.WARNING
 ENABLE_WEB_INTERFACE_LOGS = True
 ERROR_PUBLICATION_ENABLED = True
@@ -49,6 +54,10 @@ def _default_callback(*_, **__):
 
 _ERROR_CALLBACK = _default_callback
 _LOG_CALLBACK: typing.Union[None, typing.Callable[[str], str]] = None
+# BotLogger instances returned by get_logger
+_BOT_LOGGERS_BY_NAME: typing.Dict[str, "BotLogger"] = {}
+# background thread emitting logs to the root logger handlers when the queue pipeline is enabled
+_QUEUE_LISTENER: typing.Optional[logging.handlers.QueueListener] = None
 
 
 def set_global_logger_level(level, handler_levels=None) -> None:
@@ -58,8 +67,9 @@ def set_global_logger_level(level, handler_levels=None) -> None:
     """
     logger = logging.getLogger()
     logger.setLevel(level)
-    levels = handler_levels or [level] * len(logger.handlers)
-    for handler, updated_level in zip(logger.handlers, levels):
+    handlers = _get_root_handlers()
+    levels = handler_levels or [level] * len(handlers)
+    for handler, updated_level in zip(handlers, levels):
         handler.setLevel(updated_level)
 
 
@@ -84,21 +94,85 @@ def temporary_log_level(level):
         set_global_logger_level(previous_level)
 
 
+def _get_root_logger_level() -> int:
+    # same as get_global_logger_level() as the root logger has no parent, but only an attribute read.
+    # Not cached to follow any root level change (ex: from logging.config)
+    return logging.root.level
+
+
 def get_logger_level_per_handler() -> list:
     """
     Return the global logger level
     :return: order handles logging levels
     """
-    return [handler.level for handler in logging.getLogger().handlers]
+    return [handler.level for handler in _get_root_handlers()]
+
+
+def _get_root_handlers() -> list:
+    if _QUEUE_LISTENER is None:
+        return logging.getLogger().handlers
+    return list(_QUEUE_LISTENER.handlers)
+
+
+def enable_queue_logging_pipeline() -> None:
+    """
+    Emit logs to the root logger handlers from a background thread: the root logger handlers
+    are replaced by a QueueHandler and moved to a QueueListener, logging calls then only
+    enqueue log records and handlers I/O does not block the calling thread anymore.
+    """
+    global _QUEUE_LISTENER
+    if _QUEUE_LISTENER is not None:
+        return
+    root_logger = logging.getLogger()
+    handlers = list(root_logger.handlers)
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _QUEUE_LISTENER = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _QUEUE_LISTENER.start()
+    atexit.register(disable_queue_logging_pipeline)
+
+
+def disable_queue_logging_pipeline() -> None:
+    """
+    Emit the remaining queued logs and give its handlers back to the root logger
+    """
+    global _QUEUE_LISTENER
+    if _QUEUE_LISTENER is None:
+        return
+    atexit.unregister(disable_queue_logging_pipeline)
+    listener = _QUEUE_LISTENER
+    _QUEUE_LISTENER = None
+    # waits for every queued log to be handled
+    listener.stop()
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root_logger.removeHandler(handler)
+    for handler in listener.handlers:
+        root_logger.addHandler(handler)
+
+
+def is_queue_logging_pipeline_enabled() -> bool:
+    """
+    :return: True when logs are handled in a background thread
+    """
+    return _QUEUE_LISTENER is not None
 
 
 def get_logger(logger_name="Anonymous"):
     """
     Return the logger from the logger_name
     :param logger_name: the logger name
-    :return: the logger from the logger name
+    :return: the logger from the logger name, loggers are cached by name
     """
-    return BotLogger(logger_name)
+    try:
+        return _BOT_LOGGERS_BY_NAME[logger_name]
+    except KeyError:
+        return _BOT_LOGGERS_BY_NAME.setdefault(logger_name, BotLogger(logger_name))
 
 
 def set_logging_level(logger_names, level) -> None:
@@ -121,16 +195,8 @@ def add_log(level, source, message, keep_log=True, call_notifiers=True):
     :param call_notifiers: if the log should trigger the notifiers
     """
     if keep_log:
-        logs_database[LOG_DATABASE].append(
-            {
-                "Time": timestamp_util.get_now_time(),
-                "Level": logging.getLevelName(level),
-                "Source": str(source),
-                "Message": message,
-            }
-        )
-        if len(logs_database[LOG_DATABASE]) > LOGS_MAX_COUNT:
-            logs_database[LOG_DATABASE].pop(0)
+        # logs are formatted when read
+        logs_database[LOG_DATABASE].add(time.time(), level, source, message)
         # do not count this error if keep_log is False
         if level >= logging.ERROR:
             logs_database[LOG_NEW_ERRORS_COUNT] += 1
@@ -140,6 +206,21 @@ def add_log(level, source, message, keep_log=True, call_notifiers=True):
             callback()
 
 
+def get_logs_cursor() -> int:
+    """
+    :return: the cursor to give to iter_logs_since to only read logs added from now
+    """
+    return logs_database[LOG_DATABASE].get_cursor()
+
+
+def iter_logs_since(cursor: int = 0) -> typing.Iterator[logs_store.StoredLog]:
+    """
+    :param cursor: the cursor returned by get_logs_cursor or the index of the next log to read
+    :return: an iterator over the stored logs added since the given cursor
+    """
+    return logs_database[LOG_DATABASE].iter_since(cursor)
+
+
 def get_errors_count(counter=LOG_NEW_ERRORS_COUNT):
     """
     Return the error count according to the specified counter
@@ -167,7 +248,9 @@ def register_error_notifier(callback):
 
 class BotLogger:
     """
-    The bot logger that manage all OctoBot's logs
+    The bot logger that manage all OctoBot's logs.
+    Messages can be given lazily, either as a callable returning the message or as a %-style
+    message and its arguments: they are only formatted when the log is emitted or published.
     """
 
     def __init__(self, logger_name):
@@ -179,27 +262,33 @@ class BotLogger:
         Called for a debug log
         :param message: the log message
         """
-        message = self._process_log_callback(message)
+        if self._is_ignored(logging.DEBUG):
+            return
+        message = self._process_log_callback(_get_message(message))
         self.logger.debug(message, *args, **kwargs)
-        self._publish_log_if_necessary(message, logging.DEBUG)
+        self._publish_log_if_necessary(message, logging.DEBUG, args)
 
     def info(self, message: str, *args, **kwargs) -> None:
         """
         Called for an info log
         :param message: the log message
         """
-        message = self._process_log_callback(message)
+        if self._is_ignored(logging.INFO):
+            return
+        message = self._process_log_callback(_get_message(message))
         self.logger.info(message, *args, **kwargs)
-        self._publish_log_if_necessary(message, logging.INFO)
+        self._publish_log_if_necessary(message, logging.INFO, args)
 
     def warning(self, message: str, *args, **kwargs) -> None:
         """
         Called for a warning log
         :param message: the log message
         """
-        message = self._process_log_callback(message)
+        if self._is_ignored(logging.WARNING):
+            return
+        message = self._process_log_callback(_get_message(message))
         self.logger.warning(message, *args, **kwargs)
-        self._publish_log_if_necessary(message, logging.WARNING)
+        self._publish_log_if_necessary(message, logging.WARNING, args)
 
     def error(self, message: str, *args, skip_post_callback=False, **kwargs) -> None:
         """
@@ -207,9 +296,12 @@ class BotLogger:
         :param message: the log message
         :param skip_post_callback: when True, the error callback wont be called
         """
-        message = self._process_log_callback(message)
-        self.logger.error(message, *args, **kwargs)
-        self._publish_log_if_necessary(message, logging.ERROR)
+        is_ignored = self._is_ignored(logging.ERROR)
+        message = self._process_log_callback(_get_message(message))
+        if not is_ignored:
+            self.logger.error(message, *args, **kwargs)
+            self._publish_log_if_necessary(message, logging.ERROR, args)
+        # the error callback is always called
         self._post_callback_if_necessary(None, message, skip_post_callback)
 
     def exception(
@@ -259,18 +351,29 @@ class BotLogger:
         Called for a critical log
         :param message: the log message
         """
-        message = self._process_log_callback(message)
+        if self._is_ignored(logging.CRITICAL):
+            return
+        message = self._process_log_callback(_get_message(message))
         self.logger.critical(message, *args, **kwargs)
-        self._publish_log_if_necessary(message, logging.CRITICAL)
+        self._publish_log_if_necessary(message, logging.CRITICAL, args)
 
     def fatal(self, message: str, *args, **kwargs) -> None:
         """
         Called for a fatal log
         :param message: the log message
         """
-        message = self._process_log_callback(message)
+        if self._is_ignored(logging.FATAL):
+            return
+        message = self._process_log_callback(_get_message(message))
         self.logger.fatal(message, *args, **kwargs)
-        self._publish_log_if_necessary(message, logging.FATAL)
+        self._publish_log_if_necessary(message, logging.FATAL, args)
+
+    def is_enabled_for(self, level) -> bool:
+        """
+        :param level: the log level
+        :return: True if a log of the given level would be processed by this logger
+        """
+        return self.logger.isEnabledFor(level)
 
     def disable(self, disabled):
         """
@@ -279,27 +382,36 @@ class BotLogger:
         """
         self.logger.disabled = disabled
 
+    def _is_ignored(self, level) -> bool:
+        # True when the log would neither be emitted nor published
+        return not self.logger.isEnabledFor(level) and not self._is_published(level)
+
     def _process_log_callback(self, message: str) -> str:
         if _LOG_CALLBACK is None:
             return message
         return _LOG_CALLBACK(message)
 
-    def _publish_log_if_necessary(self, message, level) -> None:
+    def _publish_log_if_necessary(self, message, level, args=None) -> None:
         """
         Publish the log message if necessary
         :param message: the log message
         :param level: the log level
+        :param args: the %-style message arguments
         """
-        if (
-            ENABLE_WEB_INTERFACE_LOGS
-            and STORED_LOG_MIN_LEVEL <= level
-            and get_global_logger_level() <= level
-        ):
-            self._web_interface_publish_log(message, level)
+        if self._is_published(level):
+            self._web_interface_publish_log(_format_message(message, args), level)
             if not ERROR_PUBLICATION_ENABLED and logging.ERROR <= level:
                 global SHOULD_PUBLISH_LOGS_WHEN_RE_ENABLED
                 SHOULD_PUBLISH_LOGS_WHEN_RE_ENABLED = True
 
+    @staticmethod
+    def _is_published(level) -> bool:
+        return (
+            ENABLE_WEB_INTERFACE_LOGS
+            and STORED_LOG_MIN_LEVEL <= level
+            and _get_root_logger_level() <= level
+        )
+
     def _web_interface_publish_log(self, message, level) -> None:
         """
         Publish log to web interface
@@ -328,6 +440,22 @@ class BotLogger:
             _ERROR_CALLBACK(exception, error_message)
 
 
+def _get_message(message):
+    # messages can be given as callables to only be built when the log is processed
+    return message() if callable(message) else message
+
+
+def _format_message(message, args):
+    # same formatting as logging.LogRecord.getMessage: a single mapping argument is used
+    # as the mapping of %(key)s-style messages
+    message = str(message)
+    if not args:
+        return message
+    if len(args) == 1 and isinstance(args[0], collections.abc.Mapping) and args[0]:
+        args = args[0]
+    return message % args
+
+
 def register_log_callback(callback: typing.Union[None, typing.Callable[[str], str]]):
     """
     :param callback: the callback to be called upon any log of any level
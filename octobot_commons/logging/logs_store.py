@@ -0,0 +1,120 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import logging
+
+import octobot_commons.timestamp_util as timestamp_util
+
+STORED_LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class StoredLog:
+    """
+    Compact log record: its displayed representation is only computed when read
+    """
+
+    __slots__ = ["index", "timestamp", "level", "source", "message"]
+
+    def __init__(self, index, timestamp, level, source, message):
+        self.index = index
+        self.timestamp = timestamp
+        self.level = level
+        self.source = source
+        self.message = message
+
+    def to_dict(self):
+        """
+        :return: the displayed representation of this log
+        """
+        return {
+            "Time": timestamp_util.convert_timestamp_to_datetime(
+                self.timestamp, time_format=STORED_LOG_TIME_FORMAT, local_timezone=True
+            ),
+            "Level": logging.getLevelName(self.level),
+            "Source": str(self.source),
+            "Message": self.message,
+        }
+
+
+class LogsRingBuffer:
+    """
+    Fixed capacity logs storage: when full, adding a log replaces the oldest one in O(1).
+    Iterating over it or indexing it returns logs as dicts, from the oldest to the most recent.
+    Each log gets an always increasing index which can be used as a cursor to read new logs only.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._records = [None] * capacity
+        # index of the next added log
+        self._next_index = 0
+        # index of the oldest available log
+        self._first_index = 0
+
+    def add(self, timestamp, level, source, message):
+        """
+        Store the given log, replacing the oldest log when full
+        """
+        self._records[self._next_index % self.capacity] = StoredLog(
+            self._next_index, timestamp, level, source, message
+        )
+        self._next_index += 1
+        if self._next_index - self._first_index > self.capacity:
+            self._first_index = self._next_index - self.capacity
+
+    def get_cursor(self):
+        """
+        :return: the index of the next added log
+        """
+        return self._next_index
+
+    def iter_since(self, cursor=0):
+        """
+        :param cursor: the index of the first log to read, logs that are not stored anymore are skipped
+        :return: an iterator over the StoredLog added from the given cursor
+        """
+        for index in range(max(cursor, self._first_index), self._next_index):
+            yield self._records[index % self.capacity]
+
+    def clear(self):
+        """
+        Remove every stored log, log indexes are not reset
+        """
+        self._records = [None] * self.capacity
+        self._first_index = self._next_index
+
+    def __len__(self):
+        return self._next_index - self._first_index
+
+    def __iter__(self):
+        return (record.to_dict() for record in self.iter_since(self._first_index))
+
+    def __reversed__(self):
+        return (
+            self._records[index % self.capacity].to_dict()
+            for index in range(self._next_index - 1, self._first_index - 1, -1)
+        )
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [
+                self._records[(self._first_index + index) % self.capacity].to_dict()
+                for index in range(*item.indices(len(self)))
+            ]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("log index out of range")
+        return self._records[(self._first_index + item) % self.capacity].to_dict()
@@ -0,0 +1,419 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import contextlib
+import os
+import threading
+import typing
+
+import octobot_commons.constants as constants
+import octobot_commons.errors as errors
+import octobot_commons.histogram as histogram
+import octobot_commons.singleton as singleton
+
+# reusable no-op context manager used instead of a lock when thread safety is not required
+_NO_LOCK = contextlib.nullcontext()
+
+
+class _Metric:
+    """
+    Base class of metrics: values are stored by labels values tuple, in label_names order.
+    Metrics are not thread safe unless created with thread_safe=True: a single threaded
+    asyncio usage does not require any lock.
+    """
+
+    TYPE = ""
+
+    __slots__ = ["name", "description", "label_names", "_values", "_lock"]
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        label_names: typing.Sequence[str] = (),
+        thread_safe: bool = False,
+    ):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock() if thread_safe else _NO_LOCK
+
+    def get_labels_values(self) -> list:
+        """
+        :return: the labels values tuples of this metric
+        """
+        return list(self._values)
+
+    def reset(self):
+        """
+        Remove every recorded value
+        """
+        with self._lock:
+            self._values.clear()
+
+    def to_dict(self) -> dict:
+        """
+        :return: a snapshot of this metric as a dict
+        """
+        with self._lock:
+            return {
+                "type": self.TYPE,
+                "description": self.description,
+                "label_names": list(self.label_names),
+                "values": [
+                    {
+                        "labels": dict(zip(self.label_names, labels)),
+                        "value": self._value_to_dict(value),
+                    }
+                    for labels, value in self._values.items()
+                ],
+            }
+
+    def to_prometheus_lines(self) -> list:
+        """
+        :return: the Prometheus text format lines of this metric
+        """
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.TYPE}",
+        ]
+        with self._lock:
+            for labels, value in self._values.items():
+                lines += self._value_to_prometheus_lines(labels, value)
+        return lines
+
+    def _check_labels(self, labels: tuple):
+        if len(labels) != len(self.label_names):
+            raise errors.InvalidMetricError(
+                f"{self.name} expects {len(self.label_names)} labels "
+                f"({', '.join(self.label_names)}), {len(labels)} given"
+            )
+
+    def _format_labels(self, labels: tuple, extra_labels=()) -> str:
+        labels = tuple(
+            f'{name}="{_escape_label_value(value)}"'
+            for name, value in (*zip(self.label_names, labels), *extra_labels)
+        )
+        return "{" + ",".join(labels) + "}" if labels else ""
+
+    def _value_to_dict(self, value):
+        return value
+
+    def _value_to_prometheus_lines(self, labels: tuple, value) -> list:
+        return [f"{self.name}{self._format_labels(labels)} {value}"]
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing value
+    """
+
+    TYPE = "counter"
+    __slots__ = []
+
+    def inc(self, amount: float = 1, labels: tuple = ()):
+        """
+        Increase the counter of the given labels values by amount
+        """
+        with self._lock:
+            try:
+                self._values[labels] += amount
+            except KeyError:
+                self._check_labels(labels)
+                self._values[labels] = amount
+
+    def get(self, labels: tuple = ()) -> float:
+        """
+        :return: the counter value of the given labels values
+        """
+        return self._values.get(labels, 0)
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down
+    """
+
+    TYPE = "gauge"
+    __slots__ = []
+
+    def set(self, value: float, labels: tuple = ()):
+        """
+        Set the gauge value of the given labels values
+        """
+        with self._lock:
+            if labels not in self._values:
+                self._check_labels(labels)
+            self._values[labels] = value
+
+    def inc(self, amount: float = 1, labels: tuple = ()):
+        """
+        Increase the gauge value of the given labels values by amount
+        """
+        with self._lock:
+            try:
+                self._values[labels] += amount
+            except KeyError:
+                self._check_labels(labels)
+                self._values[labels] = amount
+
+    def dec(self, amount: float = 1, labels: tuple = ()):
+        """
+        Decrease the gauge value of the given labels values by amount
+        """
+        self.inc(-amount, labels=labels)
+
+    def get(self, labels: tuple = ()) -> float:
+        """
+        :return: the gauge value of the given labels values
+        """
+        return self._values.get(labels, 0)
+
+
+class HistogramMetric(_Metric):
+    """
+    Distribution of observed values, using a histogram.Histogram by labels values
+    """
+
+    TYPE = "histogram"
+    __slots__ = ["bounds"]
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        label_names: typing.Sequence[str] = (),
+        thread_safe: bool = False,
+        bounds: typing.Sequence[float] = constants.LATENCY_HISTOGRAM_BUCKETS_SECONDS,
+    ):
+        super().__init__(
+            name,
+            description=description,
+            label_names=label_names,
+            thread_safe=thread_safe,
+        )
+        self.bounds = tuple(bounds)
+
+    def observe(self, value: float, labels: tuple = ()):
+        """
+        Add the given value to the histogram of the given labels values
+        """
+        with self._lock:
+            try:
+                self._values[labels].observe(value)
+            except KeyError:
+                self._check_labels(labels)
+                self._values[labels] = histogram.Histogram(self.bounds)
+                self._values[labels].observe(value)
+
+    def get(self, labels: tuple = ()) -> typing.Optional[histogram.Histogram]:
+        """
+        :return: the histogram of the given labels values, None if nothing has been observed
+        """
+        return self._values.get(labels)
+
+    def _value_to_dict(self, value):
+        return value.to_dict()
+
+    def _value_to_prometheus_lines(self, labels: tuple, value) -> list:
+        lines = []
+        cumulated_count = 0
+        for bound, bucket_count in zip((*value.bounds, "+Inf"), value.bucket_counts):
+            cumulated_count += bucket_count
+            lines.append(
+                f"{self.name}_bucket"
+                f"{self._format_labels(labels, (('le', bound),))} {cumulated_count}"
+            )
+        formatted_labels = self._format_labels(labels)
+        lines.append(f"{self.name}_sum{formatted_labels} {value.total}")
+        lines.append(f"{self.name}_count{formatted_labels} {value.count}")
+        return lines
+
+
+class MetricsRegistry(singleton.Singleton):
+    """
+    Process wide metrics registry: subsystems get or create their metrics from
+    MetricsRegistry.instance() and snapshots are exported as a dict or in Prometheus text format
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._metrics: typing.Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def counter(
+        self,
+        name: str,
+        description: str = "",
+        label_names: typing.Sequence[str] = (),
+        thread_safe: bool = False,
+    ) -> Counter:
+        """
+        :return: the name counter, created if missing
+        """
+        return self._get_or_create(
+            Counter, name, description, label_names, thread_safe=thread_safe
+        )
+
+    def gauge(
+        self,
+        name: str,
+        description: str = "",
+        label_names: typing.Sequence[str] = (),
+        thread_safe: bool = False,
+    ) -> Gauge:
+        """
+        :return: the name gauge, created if missing
+        """
+        return self._get_or_create(
+            Gauge, name, description, label_names, thread_safe=thread_safe
+        )
+
+    def histogram(
+        self,
+        name: str,
+        description: str = "",
+        label_names: typing.Sequence[str] = (),
+        thread_safe: bool = False,
+        bounds: typing.Sequence[float] = constants.LATENCY_HISTOGRAM_BUCKETS_SECONDS,
+    ) -> HistogramMetric:
+        """
+        :return: the name histogram, created if missing
+        """
+        return self._get_or_create(
+            HistogramMetric,
+            name,
+            description,
+            label_names,
+            thread_safe=thread_safe,
+            bounds=bounds,
+        )
+
+    def get_metric(self, name: str) -> typing.Optional[_Metric]:
+        """
+        :return: the name metric, None if missing
+        """
+        return self._metrics.get(name)
+
+    def reset(self):
+        """
+        Remove every recorded value, metrics stay registered
+        """
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+    def to_dict(self) -> dict:
+        """
+        :return: a snapshot of every metric as a dict
+        """
+        return {name: metric.to_dict() for name, metric in list(self._metrics.items())}
+
+    def to_prometheus_text(self) -> str:
+        """
+        :return: a snapshot of every metric in Prometheus text format
+        """
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines += metric.to_prometheus_lines()
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def export_to_file(self, file_path: str):
+        """
+        Write a Prometheus text format snapshot into file_path (can be read by the node
+        exporter textfile collector). The file is replaced at once to never be read partially.
+        """
+        temp_file_path = f"{file_path}.tmp"
+        with open(temp_file_path, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(self.to_prometheus_text())
+        os.replace(temp_file_path, file_path)
+
+    async def start_server(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """
+        Serve Prometheus text format snapshots over HTTP on the given local socket
+        :return: the port the server is listening on
+        """
+        if self._server is None:
+            self._server = await asyncio.start_server(
+                self._handle_scrape_request, host, port
+            )
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop_server(self):
+        """
+        Stop the metrics server
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_scrape_request(self, reader, writer):
+        try:
+            # any request gets the metrics: only read the request line and headers
+            await reader.readuntil(b"\r\n\r\n")
+            body = self.to_prometheus_text().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/plain; version=0.0.4\r\n"
+                + f"Content-Length: {len(body)}\r\n".encode()
+                + b"Connection: close\r\n\r\n"
+                + body
+            )
+            await writer.drain()
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+            ConnectionError,
+        ):
+            pass
+        finally:
+            writer.close()
+
+    def _get_or_create(self, metric_class, name, description, label_names, **kwargs):
+        try:
+            metric = self._metrics[name]
+        except KeyError:
+            with self._lock:
+                metric = self._metrics.setdefault(
+                    name,
+                    metric_class(
+                        name,
+                        description=description,
+                        label_names=label_names,
+                        **kwargs,
+                    ),
+                )
+        if not isinstance(metric, metric_class) or metric.label_names != tuple(
+            label_names
+        ):
+            raise errors.InvalidMetricError(
+                f"{name} is already registered as a {metric.TYPE} "
+                f"with labels: {', '.join(metric.label_names)}"
+            )
+        return metric
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """
+    :return: the process metrics registry
+    """
+    return MetricsRegistry.instance()
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -0,0 +1,184 @@
+# pylint: disable=W0718,R0902
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import collections
+import glob
+import os
+import sys
+import threading
+import time
+
+import octobot_commons.constants as commons_constants
+import octobot_commons.logging as logging
+
+
+class SamplingProfiler:
+    """
+    Low overhead statistical profiler: a background thread samples every thread stack using
+    sys._current_frames() and counts identical stacks. Counted stacks are written in the
+    collapsed stacks format ("thread;outer_function;...;inner_function count" lines),
+    which can be turned into flame graphs, into a new file every rotation_interval seconds.
+    """
+
+    def __init__(
+        self,
+        file_path_prefix,
+        frequency=commons_constants.SAMPLING_PROFILER_FREQUENCY,
+        rotation_interval=commons_constants.SAMPLING_PROFILER_ROTATION_MINUTES_INTERVAL
+        * commons_constants.MINUTE_TO_SECONDS,
+        max_files=commons_constants.SAMPLING_PROFILER_MAX_FILES,
+        min_dump_interval=commons_constants.SAMPLING_PROFILER_MIN_DUMP_INTERVAL_SECONDS,
+    ):
+        self.logger = logging.get_logger(self.__class__.__name__)
+        self.file_path_prefix = file_path_prefix
+        self.sampling_interval = 1 / frequency
+        self.rotation_interval = rotation_interval
+        self.max_files = max_files
+        self.min_dump_interval = min_dump_interval
+        self.samples_count = 0
+
+        self._stack_counts = collections.Counter()
+        self._stack_counts_lock = threading.Lock()
+        # function labels by code object, code objects are reused by every call
+        self._labels_by_code = {}
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._last_dump_time = 0
+        self._last_rotation_time = 0
+
+    def start(self):
+        """
+        Start sampling threads stacks
+        """
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._last_rotation_time = time.time()
+        self._thread = threading.Thread(
+            target=self._sampling_loop, name=self.__class__.__name__, daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop sampling and write the remaining samples
+        """
+        if not self.is_running():
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self._write_samples()
+
+    def is_running(self):
+        """
+        :return: True when sampling
+        """
+        return self._thread is not None
+
+    def dump(self):
+        """
+        Write the current samples now, at most once every min_dump_interval seconds
+        :return: the written file path, None when called too early or without samples
+        """
+        if time.time() - self._last_dump_time < self.min_dump_interval:
+            self.logger.debug("Skipped profiler dump: last dump is too recent")
+            return None
+        self._last_dump_time = time.time()
+        return self._write_samples()
+
+    def sample(self):
+        """
+        Count the current stack of every thread but the sampling thread
+        """
+        sampling_thread_id = threading.get_ident()
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        # pylint: disable=protected-access
+        frames = sys._current_frames()
+        stacks = [
+            self._get_collapsed_stack(
+                thread_names.get(thread_id, str(thread_id)), frame
+            )
+            for thread_id, frame in frames.items()
+            if thread_id != sampling_thread_id
+        ]
+        with self._stack_counts_lock:
+            self._stack_counts.update(stacks)
+        self.samples_count += 1
+
+    def _sampling_loop(self):
+        while not self._stop_event.wait(self.sampling_interval):
+            try:
+                self.sample()
+                if time.time() - self._last_rotation_time >= self.rotation_interval:
+                    self._write_samples()
+            except Exception as err:
+                self.logger.exception(err, True, f"Error when sampling stacks: {err}")
+
+    def _get_collapsed_stack(self, thread_name, frame):
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            try:
+                labels.append(self._labels_by_code[code])
+            except KeyError:
+                label = (
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:"
+                    f"{code.co_firstlineno})"
+                ).replace(";", ",")
+                self._labels_by_code[code] = label
+                labels.append(label)
+            frame = frame.f_back
+        labels.append(thread_name.replace(";", ","))
+        return ";".join(reversed(labels))
+
+    def _write_samples(self):
+        self._last_rotation_time = time.time()
+        with self._stack_counts_lock:
+            stack_counts = self._stack_counts
+            self._stack_counts = collections.Counter()
+        if not stack_counts:
+            return None
+        file_path = (
+            f"{self.file_path_prefix}_{int(self._last_rotation_time * 1000)}"
+            f"{commons_constants.SAMPLING_PROFILER_FILE_EXT}"
+        )
+        with open(file_path, "w", encoding="utf-8") as profile_file:
+            for stack, count in stack_counts.most_common():
+                profile_file.write(f"{stack} {count}\n")
+        self._remove_old_files()
+        self.logger.debug(
+            f"Written {len(stack_counts)} sampled stacks into {file_path}"
+        )
+        return file_path
+
+    def _remove_old_files(self):
+        files = sorted(
+            glob.glob(
+                f"{glob.escape(self.file_path_prefix)}_*"
+                f"{commons_constants.SAMPLING_PROFILER_FILE_EXT}"
+            ),
+            key=os.path.getmtime,
+        )
+        for file_path in files[: max(0, len(files) - self.max_files)]:
+            os.remove(file_path)
+
+
+def get_profile_file_path_prefix(output_file):
+    """
+    :return: the profile files path prefix associated to the given output file
+    """
+    return f"{os.path.splitext(output_file)[0]}_profile"
@@ -18,6 +18,7 @@ from octobot_commons.symbols import symbol_util
 
 from octobot_commons.symbols.symbol_util import (
     parse_symbol,
+    parse_symbols,
     merge_symbol,
     merge_currencies,
     convert_symbol,
@@ -30,11 +31,14 @@ from octobot_commons.symbols import symbol
 
 from octobot_commons.symbols.symbol import (
     Symbol,
+    merge_symbol_parts,
+    get_symbols_table_size,
 )
 
 
 __all__ = [
     "parse_symbol",
+    "parse_symbols",
     "merge_symbol",
     "merge_currencies",
     "convert_symbol",
@@ -42,4 +46,6 @@ __all__ = [
     "is_usd_like_coin",
     "get_most_common_usd_like_symbol",
     "Symbol",
+    "merge_symbol_parts",
+    "get_symbols_table_size",
 ]
@@ -1,3 +1,4 @@
+# pylint: disable=R0913
 #  Drakkar-Software OctoBot-Commons
 #  Copyright (c) Drakkar-Software, All rights reserved.
 #
@@ -15,14 +16,27 @@
 #  License along with this library.
 import re
 import typing
+import weakref
 
 import octobot_commons
 
 _FULL_SYMBOL_GROUPS_REGEX = r"([^//]*)\/([^:]*):?([^-]*)-?([^-]*)-?([^-]*)-?([^-]*)"
+_FULL_SYMBOL_MARKET_SEPARATOR = "/"
+_FULL_SYMBOL_SETTLEMENT_SEPARATOR = ":"
+_FULL_SYMBOL_DETAILS_SEPARATOR = "-"
+_FULL_SYMBOL_DETAILS_COUNT = 4
+
+# symbol table: every created Symbol is interned by its string and separators, symbols
+# are removed from the table when they are not used anymore
+_SYMBOLS_TABLE = weakref.WeakValueDictionary()
 
 
-# pylint: disable=R0902
 class Symbol:
+    """
+    Immutable parsed symbol. Symbols are interned: creating a Symbol from an already parsed
+    symbol string returns the existing instance.
+    """
+
     #                             base   /  quote : settlement-identifier-strike price-type
     # Inspired from CCXT https://docs.ccxt.com/en/latest/manual.html#option:
     # //
@@ -47,47 +61,67 @@ class Symbol:
     # 'ETH/USDT:USDT-210625-5000-C'  // ETH/USDT call option contract strike price 5000 USDT settled in USDT (linear,
     # vanilla) on 2021-06-25
 
-    def __init__(
-        self,
+    __slots__ = [
+        "symbol_str",
+        "base",
+        "quote",
+        "settlement_asset",
+        "identifier",
+        "strike_price",
+        "option_type",
+        "_table_key",
+        "_hash",
+        "__weakref__",
+    ]
+
+    # slots are only set in _from_parts, declare them for type checkers and linters
+    symbol_str: str
+    base: str
+    quote: typing.Optional[str]
+    settlement_asset: str
+    identifier: str
+    strike_price: str
+    option_type: typing.Optional[str]
+    _table_key: tuple
+    _hash: int
+
+    def __new__(
+        cls,
         symbol_str: str,
         market_separator: str = octobot_commons.MARKET_SEPARATOR,
         settlement_separator: str = octobot_commons.SETTLEMENT_ASSET_SEPARATOR,
         option_separator: str = octobot_commons.OPTION_SEPARATOR,
     ):
-        self.symbol_str: str = symbol_str
-        self.base: typing.Optional[str] = None
-        self.quote: typing.Optional[str] = None
-        self.settlement_asset: typing.Optional[str] = None
-        self.identifier: typing.Optional[str] = None
-        self.strike_price: typing.Optional[str] = None
-        self.option_type: typing.Optional[str] = None
-        self.market_separator: str = market_separator
-        self.settlement_separator: str = settlement_separator
-        self.option_separator: str = option_separator
-        self.parse_symbol(self.symbol_str)
-
-    def parse_symbol(self, symbol_str: str):
-        """
-        Parse the specified symbol
-        :param symbol_str: the symbol to parse
-        """
-        if self.settlement_separator in symbol_str:
-            (
-                self.base,
-                self.quote,
-                self.settlement_asset,
-                self.identifier,
-                self.strike_price,
-                self.option_type,
-            ) = _parse_symbol_full(_FULL_SYMBOL_GROUPS_REGEX, symbol_str)
-            self.option_type = _parse_option_type(self.option_type)
-        else:
-            # simple (probably spot) pair, use str.split as it is much faster
-            self.base, self.quote = _parse_spot_symbol(
-                self.market_separator, symbol_str
+        key = (symbol_str, market_separator, settlement_separator, option_separator)
+        try:
+            return _SYMBOLS_TABLE[key]
+        except KeyError:
+            symbol = cls._from_parts(
+                key,
+                _parse_symbol_parts(symbol_str, market_separator, settlement_separator),
             )
-            self.settlement_asset = self.identifier = self.strike_price = ""
-            self.option_type = None
+            _SYMBOLS_TABLE[key] = symbol
+            return symbol
+
+    @classmethod
+    def _from_parts(cls, key, parts):
+        symbol = object.__new__(cls)
+        for attribute, value in zip(
+            (
+                "base",
+                "quote",
+                "settlement_asset",
+                "identifier",
+                "strike_price",
+                "option_type",
+            ),
+            parts,
+        ):
+            object.__setattr__(symbol, attribute, value)
+        object.__setattr__(symbol, "symbol_str", key[0])
+        object.__setattr__(symbol, "_table_key", key)
+        object.__setattr__(symbol, "_hash", hash(key[0]))
+        return symbol
 
     def base_and_quote(self) -> typing.Tuple[str, str]:
         """
@@ -104,20 +138,17 @@ class Symbol:
         """
         return the base/quote representation of this symbol. includes settlement asset if set
         """
-        merged_symbol = f"{self.base}{market_separator}{self.quote}"
-        if self.settlement_asset:
-            merged_symbol = (
-                f"{merged_symbol}{settlement_separator}{self.settlement_asset}"
-            )
-            if self.strike_price and self.identifier and self.option_type:
-                details = [
-                    "",
-                    self.identifier,
-                    str(self.strike_price),
-                    _parse_option_type(self.option_type),
-                ]
-                merged_symbol = f"{merged_symbol}{option_separator.join(details)}"
-        return merged_symbol
+        return merge_symbol_parts(
+            self.base,
+            self.quote,
+            self.settlement_asset,
+            self.identifier,
+            self.strike_price,
+            self.option_type,
+            market_separator=market_separator,
+            settlement_separator=settlement_separator,
+            option_separator=option_separator,
+        )
 
     def merged_str_base_and_quote_only_symbol(
         self,
@@ -209,12 +240,103 @@ class Symbol:
             and self.option_type == other.option_type
         )
 
+    def __hash__(self):
+        return self._hash
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __reduce__(self):
+        # unpickle through the constructor to get the interned symbol
+        return self.__class__, self._table_key
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     def __str__(self):
         return self.symbol_str
 
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.symbol_str!r})"
+
+
+def merge_symbol_parts(
+    base: str,
+    quote: str,
+    settlement_asset: typing.Optional[str] = None,
+    identifier: typing.Optional[str] = None,
+    strike_price: typing.Optional[str] = None,
+    option_type: typing.Optional[str] = None,
+    market_separator: str = octobot_commons.MARKET_SEPARATOR,
+    settlement_separator: str = octobot_commons.SETTLEMENT_ASSET_SEPARATOR,
+    option_separator: str = octobot_commons.OPTION_SEPARATOR,
+) -> str:
+    """
+    return the string representation of the given symbol parts. includes settlement asset if set
+    and option details if set
+    """
+    merged_symbol = f"{base}{market_separator}{quote}"
+    if settlement_asset:
+        merged_symbol = f"{merged_symbol}{settlement_separator}{settlement_asset}"
+        if strike_price and identifier and option_type:
+            details = [
+                "",
+                identifier,
+                str(strike_price),
+                _parse_option_type(option_type),
+            ]
+            merged_symbol = f"{merged_symbol}{option_separator.join(details)}"
+    return merged_symbol
+
+
+def get_symbols_table_size() -> int:
+    """
+    :return: the number of currently interned symbols
+    """
+    return len(_SYMBOLS_TABLE)
+
+
+def _parse_symbol_parts(symbol_str, market_separator, settlement_separator):
+    if settlement_separator in symbol_str:
+        (
+            base,
+            quote,
+            settlement_asset,
+            identifier,
+            strike_price,
+            option_type,
+        ) = _parse_symbol_full(symbol_str)
+        return (
+            base,
+            quote,
+            settlement_asset,
+            identifier,
+            strike_price,
+            _parse_option_type(option_type),
+        )
+    # simple (probably spot) pair, use str.split as it is much faster
+    base, quote = _parse_spot_symbol(market_separator, symbol_str)
+    return base, quote, "", "", "", None
+
 
-def _parse_symbol_full(full_symbol_regex, symbol_str):
-    return re.search(full_symbol_regex, symbol_str).groups()
+def _parse_symbol_full(symbol_str):
+    if _FULL_SYMBOL_MARKET_SEPARATOR not in symbol_str:
+        # unparsable symbol: keep raising the same way as when using the full regex
+        return re.search(_FULL_SYMBOL_GROUPS_REGEX, symbol_str).groups()
+    # equivalent to the _FULL_SYMBOL_GROUPS_REGEX groups using str methods as it is much faster
+    base, _, remaining = symbol_str.partition(_FULL_SYMBOL_MARKET_SEPARATOR)
+    quote, _, remaining = remaining.partition(_FULL_SYMBOL_SETTLEMENT_SEPARATOR)
+    details = remaining.split(
+        _FULL_SYMBOL_DETAILS_SEPARATOR, _FULL_SYMBOL_DETAILS_COUNT
+    )[:_FULL_SYMBOL_DETAILS_COUNT]
+    details += [""] * (_FULL_SYMBOL_DETAILS_COUNT - len(details))
+    return (base, quote, *details)
 
 
 def _parse_spot_symbol(separator, symbol_str):
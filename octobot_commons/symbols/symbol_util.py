@@ -36,6 +36,16 @@ def parse_symbol(symbol: str):
     return octobot_commons.symbols.symbol.Symbol(symbol)
 
 
+def parse_symbols(symbols: typing.Iterable[str]) -> list:
+    """
+    Parse the specified symbols into Symbol objects, each distinct symbol is parsed only once
+    :param symbols: the symbols to parse
+    :return: the list of Symbol objects, in the given symbols order
+    """
+    # Symbol instances are interned: each distinct symbol is parsed once
+    return [octobot_commons.symbols.symbol.Symbol(symbol) for symbol in symbols]
+
+
 def merge_symbol(symbol: str) -> str:
     """
     Return merged currency and market without /
@@ -79,18 +89,13 @@ def merge_currencies(
     :param option_separator: the separator between the option details
     :return: currency and market merged
     """
-    symbol = octobot_commons.symbols.symbol.Symbol(
-        f"{currency}{market_separator}{market}", market_separator=market_separator
-    )
-    if settlement_asset is not None:
-        symbol.settlement_asset = settlement_asset
-    if strike_price:
-        symbol.strike_price = strike_price
-    if identifier:
-        symbol.identifier = identifier
-    if option_type:
-        symbol.option_type = option_type
-    return symbol.merged_str_symbol(
+    return octobot_commons.symbols.symbol.merge_symbol_parts(
+        currency,
+        market,
+        settlement_asset=settlement_asset,
+        identifier=identifier,
+        strike_price=strike_price,
+        option_type=option_type,
         market_separator=market_separator,
         settlement_separator=settlement_separator,
         option_separator=option_separator,
@@ -138,8 +143,7 @@ def get_most_common_usd_like_symbol(pairs: list[str]) -> str:
     if not pairs:
         raise ValueError("Pairs cannot be empty")
     symbols = []
-    for pair in pairs:
-        parsed = octobot_commons.symbols.symbol.Symbol(pair)
+    for parsed in parse_symbols(pairs):
         symbols.append(parsed.quote)
         symbols.append(parsed.base)
     counter = collections.Counter(symbols)
@@ -14,17 +14,97 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import asyncio
+import collections
+import json
 import threading
 import tracemalloc
-import csv
 import gc
 
 import octobot_commons.constants as commons_constants
+import octobot_commons.enums as commons_enums
 import octobot_commons.singleton as singleton
 import octobot_commons.timestamp_util as timestamp_util
 import octobot_commons.logging as logging
 import octobot_commons.async_job as async_job
 import octobot_commons.os_util as os_util
+import octobot_commons.metrics_registry as metrics_registry
+import octobot_commons.sampling_profiler as sampling_profiler
+import octobot_commons.databases.cache_manager as cache_manager
+import octobot_commons.databases.global_storage.global_shared_memory_storage as global_shared_memory_storage
+
+
+def _get_logs_database_size():
+    return len(logging.logs_database[logging.LOG_DATABASE])
+
+
+def _get_caches_count():
+    # the root node is returned as a leaf when no cache is open
+    return sum(
+        1
+        for _, path in cache_manager.CacheManager.CACHES.get_nested_children_with_path()
+        if path
+    )
+
+
+def _get_global_shared_memory_storage_size():
+    if (
+        storage := global_shared_memory_storage.GlobalSharedMemoryStorage.get_instance_if_exists()
+    ) is None:
+        return 0
+    return len(storage)
+
+
+# size getters of known big containers by name
+_MEMORY_CONTAINERS = {
+    "logs_database": _get_logs_database_size,
+    "caches": _get_caches_count,
+    "global_shared_memory_storage": _get_global_shared_memory_storage_size,
+}
+
+
+def register_memory_container(name, size_getter):
+    """
+    Watch the size of a container when watching RAM
+    :param name: the container name in watched resources
+    :param size_getter: a callable returning the container size
+    """
+    _MEMORY_CONTAINERS[name] = size_getter
+
+
+def get_memory_containers_sizes() -> dict:
+    """
+    :return: the size of each registered container
+    """
+    return {name: size_getter() for name, size_getter in _MEMORY_CONTAINERS.items()}
+
+
+def get_sampled_objects_count(
+    stride=commons_constants.MEMORY_WATCHER_OBJECTS_SAMPLING_STRIDE,
+    top_types=commons_constants.MEMORY_WATCHER_TOP_OBJECT_TYPES,
+) -> dict:
+    """
+    Estimate the number of garbage collector tracked objects by type from one object out of stride.
+    The list of every tracked object is still built: to be called once in a while
+    :return: the estimated count of the top_types most common types
+    """
+    counts = collections.Counter(
+        type(element).__name__ for element in gc.get_objects()[::stride]
+    )
+    return {
+        type_name: count * stride for type_name, count in counts.most_common(top_types)
+    }
+
+
+async def _get_memory_containers_sizes_async() -> dict:
+    return get_memory_containers_sizes()
+
+
+def _get_running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
 
 
 class SystemResourcesWatcher(singleton.Singleton):
@@ -34,7 +114,19 @@ class SystemResourcesWatcher(singleton.Singleton):
     )
     CPU_WATCHING_SECONDS = 2
 
-    def __init__(self, dump_resources, watch_ram, output_file):
+    CONTAINERS_SNAPSHOT_TIMEOUT = 10
+
+    def __init__(self, dump_resources, watch_ram, output_file, profile_cpu=False):
+        """
+        :param dump_resources: when True, watched resources are appended to output_file
+        :param watch_ram: when True, objects counts, memory containers sizes and allocations
+        are watched
+        :param output_file: path of the JSON lines file resources are written to: each watcher cycle
+        appends one JSON document line (it was a ";" separated CSV file before). The file is
+        truncated on the first write.
+        :param profile_cpu: when True, threads stacks are sampled and written in collapsed stacks
+        files next to output_file
+        """
         super().__init__()
         self.watcher_job = None
         self.watcher_interval = self.DEFAULT_WATCHER_INTERVAL
@@ -45,6 +137,25 @@ class SystemResourcesWatcher(singleton.Singleton):
         self.initialized_output = False
         self.first_memory_snapshot = None
         self.largest_peak = 0
+        self.reference_process_ram = None
+        self._watch_memory_calls = 0
+        # memory containers are updated from this event loop
+        self._loop = None
+        self._output_file_handle = None
+        # output file is written from the watcher thread and closed from the event loop thread
+        self._output_lock = threading.Lock()
+        self._is_output_closed = False
+        self.profiler = None
+        if profile_cpu:
+            if output_file is None:
+                self.logger.warning(
+                    "CPU sampling profiler disabled: profiles are written next to the output file "
+                    "and no output file is set"
+                )
+            else:
+                self.profiler = sampling_profiler.SamplingProfiler(
+                    sampling_profiler.get_profile_file_path_prefix(output_file)
+                )
 
     def _log_memory(self):
         self.logger.debug("Memory snapshot:")
@@ -82,7 +193,6 @@ class SystemResourcesWatcher(singleton.Singleton):
         print("Total allocated size: %.1f KiB" % (total / 1024))
 
         latest_size, latest_peak = tracemalloc.get_traced_memory()
-        tracemalloc.reset_peak()
 
         # Memory peaks
         self.largest_peak = max(latest_peak, self.largest_peak)
@@ -90,10 +200,62 @@ class SystemResourcesWatcher(singleton.Singleton):
             f"{latest_size=}, latest_peak={latest_peak/1024} largest_peak={self.largest_peak/1024}"
         )
 
-    def _exec_log_used_resources(self):
-        try:
+    def _watch_memory(self, process_ram) -> dict:
+        """
+        Cheap memory accounting on each call. When the process RAM grew by more than
+        MEMORY_WATCHER_GROWTH_THRESHOLD_PERCENT since the reference RAM, tracemalloc is
+        started until the next call which logs the allocations made in the meantime.
+        :return: the memory watching details
+        """
+        memory_details = {
+            "containers": self._get_memory_containers_sizes(),
+            "tracemalloc": self.first_memory_snapshot is not None,
+        }
+        if (
+            self._watch_memory_calls
+            % commons_constants.MEMORY_WATCHER_OBJECTS_COUNT_CALLS_INTERVAL
+            == 0
+            or self.first_memory_snapshot is not None
+        ):
+            # building the list of tracked objects is not free: only count objects once in a while
+            # and at the end of tracemalloc windows
+            memory_details["objects"] = get_sampled_objects_count()
+        self._watch_memory_calls += 1
+        if self.first_memory_snapshot is not None:
+            # end of tracemalloc window
             # trigger garbage collector to get a fresh memory picture
             gc.collect()
+            self._log_memory()
+            self._stop_tracemalloc()
+            self.reference_process_ram = process_ram
+        elif self.reference_process_ram is None:
+            self.reference_process_ram = process_ram
+        elif process_ram > self.reference_process_ram * (
+            1 + commons_constants.MEMORY_WATCHER_GROWTH_THRESHOLD_PERCENT / 100
+        ):
+            self.logger.info(
+                f"Process RAM grew from {round(self.reference_process_ram, 3)} GB to "
+                f"{round(process_ram, 3)} GB, tracing allocations until next check"
+            )
+            tracemalloc.start(commons_constants.MEMORY_WATCHER_TRACEMALLOC_FRAMES)
+            self.first_memory_snapshot = tracemalloc.take_snapshot()
+        return memory_details
+
+    def _get_memory_containers_sizes(self) -> dict:
+        if self._loop is None or self._loop is _get_running_loop():
+            return get_memory_containers_sizes()
+        # containers are updated from the event loop: measure them from there
+        return asyncio.run_coroutine_threadsafe(
+            _get_memory_containers_sizes_async(), self._loop
+        ).result(self.CONTAINERS_SNAPSHOT_TIMEOUT)
+
+    def _stop_tracemalloc(self):
+        self.first_memory_snapshot = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _exec_log_used_resources(self):
+        try:
             # warning: blocking to monitor CPU usage, to be used in a thread
             cpu, percent_ram, ram, process_ram = os_util.get_cpu_and_ram_usage(
                 self.CPU_WATCHING_SECONDS
@@ -102,63 +264,69 @@ class SystemResourcesWatcher(singleton.Singleton):
                 f"Used system resources: {cpu}% CPU, {round(ram, 3)} GB in RAM ({percent_ram}% of total "
                 f"including {process_ram} GB from this process). "
             )
-            if self.dump_resources:
-                self._dump_resources(cpu, percent_ram, ram, process_ram)
+            self._publish_resources(cpu, percent_ram, ram, process_ram)
+            resources = {
+                "time": timestamp_util.get_now_time(),
+                "process_used_ram": process_ram,
+                "used_cpu_percent": cpu,
+                "used_ram_percent": percent_ram,
+                "total_used_ram": ram,
+            }
             if self.watch_ram:
-                self._log_memory()
+                resources.update(self._watch_memory(process_ram))
+            if self.dump_resources:
+                self._dump_resources(resources)
         except Exception as err:
             self.logger.exception(err, False)
             self.logger.debug(f"Error when checking system resources: {err}")
 
-    async def _log_used_resources(self):
-        threading.Thread(
-            target=self._exec_log_used_resources,
-            daemon=True,
-            name=f"{self.__class__.__name__}-_exec_log_used_resources",
-        ).start()
-
-    def _dump_resources(self, cpu, percent_ram, ram, process_ram):
-        reset_file = not self.initialized_output
-        self.initialized_output = True
-        mode = "w" if reset_file else "a"
-        row = (
-            str(element).replace(".", ",")
-            for element in (
-                timestamp_util.get_now_time(),
-                process_ram,
-                cpu,
-                percent_ram,
-                ram,
-            )
-        )
-        with open(self.output_file, mode, newline="") as csv_file:
-            writer = csv.writer(csv_file, delimiter=";")
-            if reset_file:
-                writer.writerow(
-                    [
-                        "TIME",
-                        "PROCESS USED RAM",
-                        "% USED CPU",
-                        "% USED RAM",
-                        "TOTAL USED RAM",
-                    ]
+    @staticmethod
+    def _publish_resources(cpu, percent_ram, ram, process_ram):
+        registry = metrics_registry.get_metrics_registry()
+        # updated from the watcher thread
+        for name, description, value in (
+            ("octobot_cpu_percent", "Used CPU percent", cpu),
+            ("octobot_ram_percent", "Used RAM percent", percent_ram),
+            ("octobot_ram_gb", "Total used RAM in GB", ram),
+            ("octobot_process_ram_gb", "RAM used by this process in GB", process_ram),
+        ):
+            registry.gauge(name, description, thread_safe=True).set(value)
+
+    def _dump_resources(self, resources):
+        # one json document per line: only appended to
+        with self._output_lock:
+            if self._is_output_closed:
+                # stopped while collecting resources
+                return
+            if self._output_file_handle is None:
+                mode = "a" if self.initialized_output else "w"
+                self._output_file_handle = open(  # pylint: disable=consider-using-with
+                    self.output_file, mode, encoding="utf-8"
                 )
-            writer.writerow(row)
+                self.initialized_output = True
+            self._output_file_handle.write(f"{json.dumps(resources)}\n")
+            self._output_file_handle.flush()
 
     async def start(self):
         """
         Synch the clock and start the clock synchronization loop if possible on this system
         """
         self.logger.debug("Starting system resources watcher")
+        self._loop = asyncio.get_running_loop()
+        with self._output_lock:
+            self._is_output_closed = False
         self.watcher_job = async_job.AsyncJob(
-            self._log_used_resources,
+            # warning: blocking to monitor CPU usage, executed in a thread
+            self._exec_log_used_resources,
             execution_interval_delay=self.watcher_interval,
+            executor_type=commons_enums.AsyncJobExecutorTypes.THREAD,
         )
         await self.watcher_job.run()
         if self.watch_ram:
             self.logger.debug("RAM watched enabled")
-            stored_frames = 5
-            tracemalloc.start(stored_frames)
+        if self.profiler is not None:
+            self.logger.debug("CPU sampling profiler enabled")
+            self.profiler.start()
 
     def stop(self):
         """
@@ -169,15 +337,34 @@ class SystemResourcesWatcher(singleton.Singleton):
             self.watcher_job.stop()
         if self.watch_ram:
             self.logger.debug("Stopping RAM watcher")
-            tracemalloc.stop()
+            self._stop_tracemalloc()
+        with self._output_lock:
+            self._is_output_closed = True
+            if self._output_file_handle is not None:
+                self._output_file_handle.close()
+                self._output_file_handle = None
+        if self.profiler is not None:
+            self.logger.debug("Stopping CPU sampling profiler")
+            self.profiler.stop()
 
+    def dump_profile(self):
+        """
+        Write the current sampling profiler samples now, rate limited by the profiler
+        :return: the written file path, None when nothing was written
+        """
+        if self.profiler is None:
+            return None
+        return self.profiler.dump()
 
-async def start_system_resources_watcher(dump_resources, watch_ram, output_file):
+
+async def start_system_resources_watcher(
+    dump_resources, watch_ram, output_file, profile_cpu=False
+):
     """
     Start the resources watcher loop
     """
     await SystemResourcesWatcher.instance(
-        dump_resources, watch_ram, output_file
+        dump_resources, watch_ram, output_file, profile_cpu=profile_cpu
     ).start()
 
 
@@ -186,3 +373,13 @@ async def stop_system_resources_watcher():
     Stop the watcher loop
     """
     return SystemResourcesWatcher.instance().stop()
+
+
+def dump_system_resources_profile():
+    """
+    Write the current sampling profiler samples now
+    :return: the written file path, None when nothing was written
+    """
+    if (watcher := SystemResourcesWatcher.get_instance_if_exists()) is None:
+        return None
+    return watcher.dump_profile()
@@ -0,0 +1,101 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import typing
+
+import numpy as np
+
+import octobot_commons.enums as enums
+import octobot_commons.time_frame_manager as time_frame_manager
+
+
+def align_timestamps(
+    timestamps: np.ndarray, time_frames: typing.Iterable[enums.TimeFrames]
+) -> np.ndarray:
+    """
+    Compute the candle start of each timestamp in each time frame in a single vectorized pass
+    :param timestamps: the timestamps in seconds
+    :param time_frames: the time frames to align timestamps on
+    :return: a (len(time_frames), len(timestamps)) array of candle starts
+    """
+    timestamps = np.asarray(timestamps)
+    time_frames_seconds = np.fromiter(
+        (
+            time_frame_manager.get_time_frame_seconds(time_frame)
+            for time_frame in time_frames
+        ),
+        dtype=np.int64,
+    )[:, np.newaxis]
+    return timestamps - np.remainder(timestamps, time_frames_seconds)
+
+
+def get_group_indices(
+    timestamps: np.ndarray, time_frames: typing.Iterable[enums.TimeFrames]
+) -> np.ndarray:
+    """
+    Compute the candle index of each timestamp in each time frame
+    :param timestamps: the sorted timestamps in seconds
+    :param time_frames: the time frames to group timestamps by
+    :return: a (len(time_frames), len(timestamps)) array of group indexes: timestamps of the same
+    time frame candle share the same group index, the first candle of each time frame is 0
+    """
+    bucket_starts = align_timestamps(timestamps, time_frames)
+    group_indices = np.zeros(bucket_starts.shape, dtype=np.int64)
+    np.cumsum(np.diff(bucket_starts, axis=1) != 0, axis=1, out=group_indices[:, 1:])
+    return group_indices
+
+
+def get_group_start_indices(group_indices: np.ndarray) -> np.ndarray:
+    """
+    :param group_indices: the group indexes of a time frame, as returned by get_group_indices
+    :return: the index of the first element of each group
+    """
+    return np.flatnonzero(np.diff(group_indices, prepend=-1))
+
+
+def resample_candles(candles: np.ndarray, time_frame: enums.TimeFrames) -> np.ndarray:
+    """
+    Aggregate candles into time_frame candles
+    :param candles: a 2D array of sorted candles, columns following enums.PriceIndexes
+    :param time_frame: the time frame of the aggregated candles
+    :return: the 2D array of aggregated candles, the last candle can be incomplete
+    """
+    candles = np.asarray(candles)
+    if len(candles) == 0:
+        return candles.copy()
+    times = candles[:, enums.PriceIndexes.IND_PRICE_TIME.value]
+    group_indices = get_group_indices(times, [time_frame])[0]
+    starts = get_group_start_indices(group_indices)
+    ends = np.append(starts[1:], len(candles)) - 1
+    resampled = np.empty((len(starts), candles.shape[1]), dtype=candles.dtype)
+    resampled[:, enums.PriceIndexes.IND_PRICE_TIME.value] = align_timestamps(
+        times[starts], [time_frame]
+    )[0]
+    resampled[:, enums.PriceIndexes.IND_PRICE_OPEN.value] = candles[
+        starts, enums.PriceIndexes.IND_PRICE_OPEN.value
+    ]
+    resampled[:, enums.PriceIndexes.IND_PRICE_HIGH.value] = np.maximum.reduceat(
+        candles[:, enums.PriceIndexes.IND_PRICE_HIGH.value], starts
+    )
+    resampled[:, enums.PriceIndexes.IND_PRICE_LOW.value] = np.minimum.reduceat(
+        candles[:, enums.PriceIndexes.IND_PRICE_LOW.value], starts
+    )
+    resampled[:, enums.PriceIndexes.IND_PRICE_CLOSE.value] = candles[
+        ends, enums.PriceIndexes.IND_PRICE_CLOSE.value
+    ]
+    resampled[:, enums.PriceIndexes.IND_PRICE_VOL.value] = np.add.reduceat(
+        candles[:, enums.PriceIndexes.IND_PRICE_VOL.value], starts
+    )
+    return resampled
@@ -13,6 +13,8 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import numpy as np
+
 import octobot_commons.constants as constants
 import octobot_commons.logging as logging_util
 import octobot_commons.enums as enums
@@ -25,15 +27,62 @@ def _sort_time_frames(time_frames, reverse=False):
         time_frames = (
             time_frames
             if isinstance(time_frames[0], enums.TimeFrames)
-            else [enums.TimeFrames(tf) for tf in time_frames]
-        )
-        return sorted(
-            time_frames, key=enums.TimeFramesMinutes.__getitem__, reverse=reverse
+            else [_get_time_frame(tf) for tf in time_frames]
         )
+        return sorted(time_frames, key=_TIME_FRAMES_RANK.__getitem__, reverse=reverse)
     return time_frames
 
 
-TimeFramesRank = _sort_time_frames(list(enums.TimeFramesMinutes))
+TimeFramesRank = sorted(enums.TimeFramesMinutes, key=enums.TimeFramesMinutes.get)
+
+# precomputed lookup tables
+_TIME_FRAMES_RANK = {time_frame: rank for rank, time_frame in enumerate(TimeFramesRank)}
+_TIME_FRAMES_SECONDS = {
+    time_frame: minutes * constants.MINUTE_TO_SECONDS
+    for time_frame, minutes in enums.TimeFramesMinutes.items()
+}
+_LOWER_TIME_FRAMES = {
+    time_frame: TimeFramesRank[rank - 1] if rank > 0 else None
+    for time_frame, rank in _TIME_FRAMES_RANK.items()
+}
+_HIGHER_TIME_FRAMES = {
+    time_frame: TimeFramesRank[rank + 1] if rank < len(TimeFramesRank) - 1 else None
+    for time_frame, rank in _TIME_FRAMES_RANK.items()
+}
+# time frames by value and by themselves
+_TIME_FRAMES_BY_KEY = {
+    **{time_frame.value: time_frame for time_frame in enums.TimeFrames},
+    **{time_frame: time_frame for time_frame in enums.TimeFrames},
+}
+
+
+def _get_time_frame(value) -> enums.TimeFrames:
+    try:
+        return _TIME_FRAMES_BY_KEY[value]
+    except (KeyError, TypeError):
+        # raise the usual ValueError
+        return enums.TimeFrames(value)
+
+
+def get_time_frame_seconds(time_frame: enums.TimeFrames) -> int:
+    """
+    :return: the duration of the given time frame in seconds
+    """
+    return _TIME_FRAMES_SECONDS[time_frame]
+
+
+def get_lower_time_frame(time_frame: enums.TimeFrames):
+    """
+    :return: the time frame right below the given time frame, None if there is no lower time frame
+    """
+    return _LOWER_TIME_FRAMES[time_frame]
+
+
+def get_higher_time_frame(time_frame: enums.TimeFrames):
+    """
+    :return: the time frame right above the given time frame, None if there is no higher time frame
+    """
+    return _HIGHER_TIME_FRAMES[time_frame]
 
 
 def get_config_time_frame(config) -> list:
@@ -87,13 +136,12 @@ def get_previous_time_frame(config_time_frames, time_frame, origin_time_frame):
     :param origin_time_frame: the origin time frame list
     :return: the previous time frame of the specified time frame
     """
-    current_time_frame_index = TimeFramesRank.index(time_frame)
-
-    if current_time_frame_index > 0:
-        previous = TimeFramesRank[current_time_frame_index - 1]
+    previous = _LOWER_TIME_FRAMES[time_frame]
+    while previous is not None:
         if previous in config_time_frames:
             return previous
-        return get_previous_time_frame(config_time_frames, previous, origin_time_frame)
+        time_frame = previous
+        previous = _LOWER_TIME_FRAMES[time_frame]
     if time_frame in config_time_frames:
         return time_frame
     return origin_time_frame
@@ -106,27 +154,17 @@ def find_min_time_frame(time_frames, min_time_frame=None):
     :param min_time_frame: the min time frame
     :return: the minimal time frame
     """
-    time_frame_list = time_frames
-    if time_frames and isinstance(next(iter(time_frames)), enums.TimeFrames):
-        time_frame_list = [t.value for t in time_frames]
-
-    if (
-        not time_frame_list
-    ):  # if exchange has no time frame list, returns minimal time frame
+    if not time_frames:
+        # if exchange has no time frame list, returns minimal time frame
         return TimeFramesRank[0]
-
-    min_index = 0
-    if min_time_frame:
-        min_index = TimeFramesRank.index(min_time_frame)
-    # TimeFramesRank is the ordered list of timeframes
-    for index, time_frame in enumerate(TimeFramesRank):
-        tf_val = time_frame.value
-        if index >= min_index and tf_val in time_frame_list:
-            try:
-                return enums.TimeFrames(tf_val)
-            except ValueError:
-                pass
-    return min_time_frame
+    min_rank = _TIME_FRAMES_RANK[min_time_frame] if min_time_frame else 0
+    found_rank = None
+    for time_frame in time_frames:
+        # unknown time frames get a -1 rank
+        rank = _TIME_FRAMES_RANK.get(_TIME_FRAMES_BY_KEY.get(time_frame), -1)
+        if rank >= min_rank and (found_rank is None or rank < found_rank):
+            found_rank = rank
+    return min_time_frame if found_rank is None else TimeFramesRank[found_rank]
 
 
 def parse_time_frames(time_frames_string_list):
@@ -137,9 +175,9 @@ def parse_time_frames(time_frames_string_list):
     """
     result_list = []
     for time_frame_string in time_frames_string_list:
-        try:
-            result_list.append(enums.TimeFrames(time_frame_string))
-        except ValueError:
+        if time_frame := _TIME_FRAMES_BY_KEY.get(time_frame_string):
+            result_list.append(time_frame)
+        else:
             logging_util.get_logger(LOGGER_TAG).error(
                 "No time frame available for: '{0}'. Available time "
                 "frames are: {1}. '{0}' time frame requirement "
@@ -155,9 +193,9 @@ def is_time_frame(value):
     :return: True if the value represents a TimeFrame
     """
     try:
-        enums.TimeFrames(value)
-        return True
-    except ValueError:
+        return value in _TIME_FRAMES_BY_KEY
+    except TypeError:
+        # unhashable value
         return False
 
 
@@ -167,5 +205,18 @@ def get_last_timeframe_time(
     """
     :return: the exact timestamp of the last give time_frame tick relatively to the given base_timestamp
     """
-    tf_seconds = enums.TimeFramesMinutes[time_frame] * constants.MINUTE_TO_SECONDS
+    tf_seconds = _TIME_FRAMES_SECONDS[time_frame]
     return base_timestamp - (base_timestamp % tf_seconds)
+
+
+def get_last_timeframe_times(
+    time_frame: enums.TimeFrames, base_timestamps: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorized get_last_timeframe_time
+    :return: the exact timestamps of the last give time_frame ticks relatively to each given base_timestamps
+    """
+    base_timestamps = np.asarray(base_timestamps)
+    return base_timestamps - np.remainder(
+        base_timestamps, _TIME_FRAMES_SECONDS[time_frame]
+    )
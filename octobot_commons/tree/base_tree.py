@@ -62,13 +62,16 @@ class BaseTree:
     """
 
     TREE_NODE_CLASS = BaseTreeNode
-    __slots__ = ["root"]
+    __slots__ = ["root", "_nodes_by_path"]
 
-    def __init__(self):
+    def __init__(self, use_path_index=False):
         """
         Init the root node
+        :param use_path_index: when True, nodes are indexed by their path from the root node
+        for O(1) lookups. When enabled, nodes should only be deleted using delete_node or clear
         """
         self.root = self.TREE_NODE_CLASS(None, None)
+        self._nodes_by_path = {} if use_path_index else None
 
     def set_node(self, value, node_type, node, timestamp=0):
         """
@@ -128,6 +131,8 @@ class BaseTree:
         Clears the whole tree
         """
         self.root = self.TREE_NODE_CLASS(None, None)
+        if self._nodes_by_path is not None:
+            self._nodes_by_path = {}
 
     def delete_node(self, path, starting_node=None):
         """
@@ -143,6 +148,8 @@ class BaseTree:
             deleted_node = self._delete_node(path, starting_node=starting_node)
             if deleted_node is None:
                 raise NodeExistsError
+            if self._nodes_by_path is not None:
+                self._remove_from_path_index(path, deleted_node, starting_node)
             return deleted_node
         except KeyError:
             raise NodeExistsError
@@ -175,14 +182,16 @@ class BaseTree:
         return self._get_nested_children_with_path(path, select_leaves_only)
 
     def _get_nested_children_with_path(self, parent_path, select_leaves_only):
-        children_keys = self.get_children_keys(parent_path)
-        node = self.get_node(parent_path)
-        if not children_keys or not select_leaves_only:
-            yield node, parent_path
-        for key in children_keys:
-            path = list(parent_path)
-            path.append(key)
-            yield from self._get_nested_children_with_path(path, select_leaves_only)
+        to_visit = [(self.get_node(parent_path), parent_path)]
+        while to_visit:
+            node, path = to_visit.pop()
+            if not node.children or not select_leaves_only:
+                yield node, path
+            # push in reverse order to visit children in insertion order
+            for key, child in reversed(list(node.children.items())):
+                child_path = list(path)
+                child_path.append(key)
+                to_visit.append((child, child_path))
 
     def get_children_keys(self, path):
         """
@@ -201,11 +210,42 @@ class BaseTree:
         :param starting_node: the node to start the path, root if None
         :return: BaseTreeNode at path
         """
-        current_node = self.root if starting_node is None else starting_node
+        if starting_node is None and self._nodes_by_path is not None:
+            path_key = tuple(path)
+            try:
+                return self._nodes_by_path[path_key]
+            except KeyError:
+                # not indexed yet (or missing, in which case a KeyError will be raised)
+                node = self._walk_path(path, self.root)
+                self._nodes_by_path[path_key] = node
+                return node
+        return self._walk_path(
+            path, self.root if starting_node is None else starting_node
+        )
+
+    @staticmethod
+    def _walk_path(path, starting_node):
+        current_node = starting_node
         for key in path:
             current_node = current_node.children[key]
         return current_node
 
+    def _remove_from_path_index(self, path, deleted_node, starting_node):
+        """
+        Remove the deleted node and its nested children from the path index
+        """
+        if starting_node is not None:
+            # absolute path is unknown: reset the index
+            self._nodes_by_path = {}
+            return
+        to_remove = [(deleted_node, tuple(path))]
+        while to_remove:
+            node, path_key = to_remove.pop()
+            self._nodes_by_path.pop(path_key, None)
+            to_remove.extend(
+                (child, path_key + (key,)) for key, child in node.children.items()
+            )
+
     def _delete_node(self, path, starting_node=None):
         """
         Return the node corresponding to the path
@@ -234,7 +274,8 @@ class BaseTree:
                 # create a new node as the current node child
                 # us it as the new node
                 current_node = self.child_factory(current_node, key, **kwargs)
-
+        if starting_node is None and self._nodes_by_path is not None:
+            self._nodes_by_path[tuple(path)] = current_node
         return current_node
 
     def child_factory(self, node, key, **kwargs):
@@ -15,6 +15,7 @@
 #  License along with this library.
 import asyncio
 import concurrent.futures
+import contextlib
 
 import octobot_commons.singleton as singleton
 import octobot_commons.logging as logging
@@ -41,6 +42,8 @@ class EventProvider(singleton.Singleton):
     def __init__(self):
         self.logger = logging.get_logger(self.__class__.__name__)
         self._event_tree_by_bot_id = {}
+        # (path, allow_creation) of triggers deferred until the end of deferred_triggers()
+        self._deferred_triggers_by_bot_id = {}
 
     @_create_tree_if_missing
     def get_or_create_event(self, bot_id, path, allow_creation=True):
@@ -60,6 +63,11 @@ class EventProvider(singleton.Singleton):
         """
         Trigger the event at the given path for the given bot_id (or create it)
         """
+        if (
+            deferred_triggers := self._deferred_triggers_by_bot_id.get(bot_id)
+        ) is not None:
+            deferred_triggers.append((path, allow_creation))
+            return
         try:
             self._event_tree_by_bot_id[bot_id].get_node(path).trigger()
         except base_tree.NodeExistsError:
@@ -67,6 +75,52 @@ class EventProvider(singleton.Singleton):
                 self.create_event_at_path(bot_id, path, triggered=True)
                 self._event_tree_by_bot_id[bot_id].get_node(path).trigger()
 
+    def trigger_events(self, bot_id, paths, allow_creation=True):
+        """
+        Trigger the events at the given paths for the given bot_id (or create them).
+        Ancestor events are updated only once, after every given event is triggered
+        """
+        triggers = [(path, allow_creation) for path in paths]
+        if (
+            deferred_triggers := self._deferred_triggers_by_bot_id.get(bot_id)
+        ) is not None:
+            deferred_triggers.extend(triggers)
+            return
+        self._trigger_events(bot_id, triggers)
+
+    @contextlib.contextmanager
+    def deferred_triggers(self, bot_id):
+        """
+        Defer trigger_event and trigger_events calls for the given bot_id until the end of this context.
+        Deferred events are then triggered at once, updating each ancestor event only once
+        """
+        if bot_id in self._deferred_triggers_by_bot_id:
+            # already deferring: triggers will be applied by the outer context
+            yield
+            return
+        self._deferred_triggers_by_bot_id[bot_id] = []
+        try:
+            yield
+        finally:
+            self._trigger_events(bot_id, self._deferred_triggers_by_bot_id.pop(bot_id))
+
+    @_create_tree_if_missing
+    def _trigger_events(self, bot_id, triggers):
+        tree = self._event_tree_by_bot_id[bot_id]
+        existing_paths = []
+        for path, allow_creation in triggers:
+            try:
+                tree.get_node(path)
+                existing_paths.append(path)
+            except base_tree.NodeExistsError:
+                if allow_creation:
+                    if existing_paths:
+                        # keep triggers order: apply previous triggers before creating the event
+                        tree.trigger_nodes(existing_paths)
+                        existing_paths = []
+                    self.create_event_at_path(bot_id, path, triggered=True)
+        tree.trigger_nodes(existing_paths)
+
     @_create_tree_if_missing
     def create_event_at_path(self, bot_id, path, triggered=False):
         """
@@ -78,7 +132,7 @@ class EventProvider(singleton.Singleton):
         """
         Create a new event tree for the given bot_id
         """
-        self._event_tree_by_bot_id[bot_id] = event_tree.EventTree()
+        self._event_tree_by_bot_id[bot_id] = event_tree.EventTree(use_path_index=True)
 
     def remove_event_tree(self, bot_id):
         """
@@ -15,6 +15,7 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 import asyncio
+import logging as std_logging
 
 import octobot_commons.tree.base_tree as base_tree
 import octobot_commons.logging as logging
@@ -25,10 +26,14 @@ class EventTreeNode(base_tree.BaseTreeNode):
     Node element of an EventTreeNode. self.node_value is an asyncio.Event() that is triggered when all of its children
     are triggered or is manually triggered. Adding an unset child will clear self. Children updates will overwrite
     any manual trigger
+    Each node keeps track of its number of untriggered children and of its key in its parent children
+    to propagate changes in O(depth).
     """
 
     __slots__ = [
         "_parent",
+        "_parent_key",
+        "_untriggered_children_count",
         "_logger",
     ]
 
@@ -37,6 +42,8 @@ class EventTreeNode(base_tree.BaseTreeNode):
         if triggered:
             self._trigger()
         self._parent = None
+        self._parent_key = None
+        self._untriggered_children_count = 0
         self._logger = logging.get_logger(self.__class__.__name__)
 
     def bind_parent(self, parent):
@@ -44,7 +51,11 @@ class EventTreeNode(base_tree.BaseTreeNode):
         Set the parent node and propagate the local state to the parent node
         """
         self._parent = parent
-        self._propagate()
+        if self._is_registered_in_parent():
+            # already accounted for in parent's children count
+            parent.on_untriggered_children_count_change()
+        else:
+            parent.on_child_change()
 
     def is_triggered(self):
         """
@@ -71,9 +82,10 @@ class EventTreeNode(base_tree.BaseTreeNode):
         Set the event and log
         """
         self._trigger()
-        path_to_root = self.get_path_to_root()
-        if path_to_root:
-            self._logger.debug(f"Event triggered for {'|'.join(path_to_root)}")
+        if self._logger.is_enabled_for(std_logging.DEBUG):
+            path_to_root = self.get_path_to_root()
+            if path_to_root:
+                self._logger.debug(f"Event triggered for {'|'.join(path_to_root)}")
 
     def _trigger(self):
         """
@@ -86,9 +98,10 @@ class EventTreeNode(base_tree.BaseTreeNode):
         Clear the event and log
         """
         self.node_value.clear()
-        path_to_root = self.get_path_to_root()
-        if path_to_root:
-            self._logger.debug(f"Event cleared for {'|'.join(path_to_root)}")
+        if self._logger.is_enabled_for(std_logging.DEBUG):
+            path_to_root = self.get_path_to_root()
+            if path_to_root:
+                self._logger.debug(f"Event cleared for {'|'.join(path_to_root)}")
 
     def get_parent(self):
         """
@@ -102,13 +115,16 @@ class EventTreeNode(base_tree.BaseTreeNode):
         """
         node = self
         path = []
-        while node.get_parent() is not None:
-            parent = node.get_parent()
-            try:
-                path = [parent.get_child_key(node)] + path
-            except KeyError:
-                return path
+        while (parent := node.get_parent()) is not None:
+            if node._is_registered_in_parent():  # pylint: disable=protected-access
+                path.append(node._parent_key)  # pylint: disable=protected-access
+            else:
+                try:
+                    path.append(parent.get_child_key(node))
+                except KeyError:
+                    break
             node = parent
+        path.reverse()
         return path
 
     def get_child_key(self, child_to_find):
@@ -132,15 +148,21 @@ class EventTreeNode(base_tree.BaseTreeNode):
         """
         Set a child at the given key
         """
+        if (previous_child := self.children.get(key)) is not None:
+            self._untriggered_children_count -= not previous_child.is_triggered()
         super(EventTreeNode, self).set_child(key, child)
-        self.on_child_change()
+        child._parent_key = key  # pylint: disable=protected-access
+        self._untriggered_children_count += not child.is_triggered()
+        self.on_untriggered_children_count_change()
 
     def pop_child(self, key, default):
         """
         Pop the child the given key
         """
         node = super(EventTreeNode, self).pop_child(key, default)
-        self.on_child_change()
+        if node is not None and node is not default:
+            self._untriggered_children_count -= not node.is_triggered()
+        self.on_untriggered_children_count_change()
         return node
 
     def _untriggered_children(self):
@@ -149,23 +171,41 @@ class EventTreeNode(base_tree.BaseTreeNode):
         """
         return [key for key, child in self.children.items() if not child.is_triggered()]
 
+    def _is_registered_in_parent(self):
+        """
+        Return True when self is the parent's child at self._parent_key
+        """
+        return (
+            self._parent_key is not None
+            and self._parent.children.get(self._parent_key) is self
+        )
+
     def on_child_change(self):
         """
-        Trigger or clear the local event depending on children states
+        Count untriggered children, trigger or clear the local event depending on children states
+        then propagate to the parent if any change
+        """
+        self._count_untriggered_children()
+        self.on_untriggered_children_count_change()
+
+    def on_untriggered_children_count_change(self):
+        """
+        Trigger or clear the local event depending on the untriggered children count
         then propagate to the parent if any change
         """
         if not self.children:
             # do not change event when no children
             return
-        should_be_triggered = True
-        untriggered_children = self._untriggered_children()
-        if untriggered_children:
-            should_be_triggered = False
-            if not self.is_triggered():
-                self._logger.debug(
-                    f"Waiting children trigger for {'|'.join(self.get_path_to_root())}. "
-                    f"Untriggered children: {untriggered_children}"
-                )
+        should_be_triggered = self._untriggered_children_count == 0
+        if (
+            not should_be_triggered
+            and not self.is_triggered()
+            and self._logger.is_enabled_for(std_logging.DEBUG)
+        ):
+            self._logger.debug(
+                f"Waiting children trigger for {'|'.join(self.get_path_to_root())}. "
+                f"Untriggered children: {self._untriggered_children()}"
+            )
         if should_be_triggered != self.is_triggered():
             if self.is_triggered():
                 self._clear()
@@ -175,10 +215,89 @@ class EventTreeNode(base_tree.BaseTreeNode):
 
     def _propagate(self):
         """
-        Calls parent's on_child_change
+        Update the parent's untriggered children count after a local event change
         """
         if self._parent is not None:
-            self._parent.on_child_change()
+            self._update_parent_untriggered_children_count()
+            self._parent.on_untriggered_children_count_change()
+
+    def _update_parent_untriggered_children_count(self):
+        """
+        Update the parent's untriggered children count without updating the parent event
+        """
+        if self._is_registered_in_parent():
+            # pylint: disable=protected-access
+            self._parent._untriggered_children_count += -1 if self.is_triggered() else 1
+        else:
+            # pylint: disable=protected-access
+            self._parent._count_untriggered_children()
+
+    def _count_untriggered_children(self, pending_states=None):
+        """
+        Count untriggered children
+        :param pending_states: when given, children states from pending_states are used
+        """
+        if pending_states is None:
+            self._untriggered_children_count = sum(
+                1 for child in self.children.values() if not child.is_triggered()
+            )
+        else:
+            self._untriggered_children_count = sum(
+                1
+                for child in self.children.values()
+                # pylint: disable=protected-access
+                if not child._get_pending_state(pending_states)
+            )
+
+    def _get_pending_state(self, pending_states):
+        """
+        Return the local state from pending_states or the local event state when not pending
+        """
+        if (pending_state := pending_states.get(id(self))) is None:
+            return self.is_triggered()
+        return pending_state[1]
+
+    def trigger_without_event_update(self, pending_states):
+        """
+        Trigger the local state and propagate it to the parents untriggered children count and state
+        like trigger() does but without setting or clearing any event.
+        Use apply_pending_states to update events from pending_states.
+        :param pending_states: the {id(node): [node, triggered]} states that are not applied to events yet
+        """
+        if self._get_pending_state(pending_states):
+            return
+        node = self
+        triggered = True
+        while True:
+            pending_states[id(node)] = [node, triggered]
+            if (parent := node.get_parent()) is None:
+                return
+            # pylint: disable=protected-access
+            if node._is_registered_in_parent():
+                parent._untriggered_children_count += -1 if triggered else 1
+            else:
+                parent._count_untriggered_children(pending_states)
+            if not parent.children:
+                # do not change event when no children
+                return
+            triggered = parent._untriggered_children_count == 0
+            if triggered == parent._get_pending_state(pending_states):
+                return
+            node = parent
+
+    @staticmethod
+    def apply_pending_states(pending_states):
+        """
+        Set or clear the events of the nodes in pending_states that changed
+        :param pending_states: the {id(node): [node, triggered]} states to apply
+        """
+        for node, triggered in pending_states.values():
+            if triggered != node.is_triggered():
+                # pylint: disable=protected-access
+                if triggered:
+                    node._trigger_and_log()
+                else:
+                    node._clear()
 
 
 class EventTree(base_tree.BaseTree):
@@ -211,3 +330,19 @@ class EventTree(base_tree.BaseTree):
         )
         new_child.bind_parent(node)
         return new_child
+
+    def trigger_nodes(self, paths):
+        """
+        Trigger the nodes at the given paths, then set or clear each changed event only once.
+        Untriggered children counts are updated in the given paths order: results are the same
+        as calling trigger() on each node in the given paths order.
+        Can raise a NodeExistsError if a node doesn't exist. In this case, nodes that were already
+        triggered are still propagated to their ancestors.
+        :param paths: the nodes paths (as lists of string)
+        """
+        pending_states = {}
+        try:
+            for path in paths:
+                self.get_node(path).trigger_without_event_update(pending_states)
+        finally:
+            self.TREE_NODE_CLASS.apply_pending_states(pending_states)
@@ -16,6 +16,7 @@
 import pytest
 
 import octobot_commons.constants
+import octobot_commons.errors
 import octobot_commons.dsl_interpreter
 
 
@@ -139,3 +140,58 @@ def test_clear_get_all_operators_cache():
     assert len(second_get_all_operators) == len(first_get_all_operators) + 1
     assert new_operator_class in second_get_all_operators
     assert ContextualOperator not in second_get_all_operators
+
+
+def test_get_operators_by_name():
+    octobot_commons.dsl_interpreter.clear_get_all_operators_cache()
+    operators_by_name = octobot_commons.dsl_interpreter.get_operators_by_name()
+    assert operators_by_name is octobot_commons.dsl_interpreter.get_operators_by_name()
+    assert operators_by_name["b1"] is BinOperator1
+    assert operators_by_name["u2"] is UnaryOperator2
+    assert "c1" not in operators_by_name
+    with pytest.raises(TypeError):
+        operators_by_name["b1"] = BinOperator2
+    assert octobot_commons.dsl_interpreter.get_operators_by_name("unknown_library") == {}
+    assert octobot_commons.dsl_interpreter.get_operators_by_name("unknown_library") is not operators_by_name
+    octobot_commons.dsl_interpreter.clear_get_all_operators_cache()
+    assert octobot_commons.dsl_interpreter.get_operators_by_name() is not operators_by_name
+    assert octobot_commons.dsl_interpreter.get_operators_by_name() == operators_by_name
+
+
+def test_create_interpreter():
+    interpreter_1 = octobot_commons.dsl_interpreter.create_interpreter()
+    interpreter_2 = octobot_commons.dsl_interpreter.create_interpreter(flat_execution=True)
+    assert interpreter_1.operators_by_name is interpreter_2.operators_by_name
+    assert interpreter_2.flat_execution is True
+    assert interpreter_1.operators_by_name["b1"] is BinOperator1
+    # extending an interpreter does not update the shared operators table
+    interpreter_1.extend([ContextualOperator])
+    assert interpreter_1.operators_by_name["c1"] is ContextualOperator
+    assert "c1" not in interpreter_2.operators_by_name
+    assert "c1" not in octobot_commons.dsl_interpreter.get_operators_by_name()
+
+
+def test_get_parameters_arity():
+    class ParamsOperator(octobot_commons.dsl_interpreter.CallOperator):
+        @staticmethod
+        def get_name() -> str:
+            return "params_op"
+
+        @staticmethod
+        def get_parameters() -> list[octobot_commons.dsl_interpreter.OperatorParameter]:
+            return [
+                octobot_commons.dsl_interpreter.OperatorParameter(name="x", description="x", required=True, type=int),
+                octobot_commons.dsl_interpreter.OperatorParameter(name="y", description="y", required=False, type=int),
+            ]
+
+        def compute(self) -> octobot_commons.dsl_interpreter.ComputedOperatorParameterType:
+            return 0
+
+    assert BinOperator1.get_parameters_arity() == (None, None)
+    assert ParamsOperator.get_parameters_arity() == (1, 2)
+    ParamsOperator(1)
+    ParamsOperator(1, 2)
+    with pytest.raises(octobot_commons.errors.InvalidParametersError):
+        ParamsOperator()
+    with pytest.raises(octobot_commons.errors.InvalidParametersError):
+        ParamsOperator(1, 2, 3)
@@ -0,0 +1,268 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import ast
+import mock
+import pytest
+
+import octobot_commons.constants
+
+import octobot_commons.dsl_interpreter as dsl_interpreter
+
+
+class AddOperator(dsl_interpreter.BinaryOperator):
+    SUPPORTS_FLAT_EXECUTION = True
+
+    @staticmethod
+    def get_name() -> str:
+        return ast.Add.__name__
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        left, right = self.get_computed_left_and_right_parameters()
+        return left + right
+
+
+class MultOperator(dsl_interpreter.BinaryOperator):
+    SUPPORTS_FLAT_EXECUTION = True
+
+    @staticmethod
+    def get_name() -> str:
+        return ast.Mult.__name__
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        left, right = self.get_computed_left_and_right_parameters()
+        return left * right
+
+
+class DivOperator(dsl_interpreter.BinaryOperator):
+    SUPPORTS_FLAT_EXECUTION = True
+
+    @staticmethod
+    def get_name() -> str:
+        return ast.Div.__name__
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        left, right = self.get_computed_left_and_right_parameters()
+        return left / right
+
+
+class USubOperator(dsl_interpreter.UnaryOperator):
+    SUPPORTS_FLAT_EXECUTION = True
+
+    @staticmethod
+    def get_name() -> str:
+        return ast.USub.__name__
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        return -self.get_computed_operand()
+
+
+class GtOperator(dsl_interpreter.CompareOperator):
+    SUPPORTS_FLAT_EXECUTION = True
+
+    @staticmethod
+    def get_name() -> str:
+        return ast.Gt.__name__
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        left, right = self.get_computed_left_and_right_parameters()
+        return left > right
+
+
+class PopSumOperator(dsl_interpreter.CallOperator):
+    @staticmethod
+    def get_name() -> str:
+        return "pop_sum"
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        computed_parameters = self.get_computed_parameters()
+        # mutates its computed parameters
+        total = 0
+        while computed_parameters:
+            total += computed_parameters.pop()
+        return total
+
+
+class CounterOperator(dsl_interpreter.NameOperator):
+    def __init__(self, *parameters, **kwargs):
+        super().__init__(*parameters, **kwargs)
+        self.value = 0
+
+    @staticmethod
+    def get_name() -> str:
+        return "counter"
+
+    async def pre_compute(self) -> None:
+        await super().pre_compute()
+        self.value += 1
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        return self.value
+
+
+class ListOperator(dsl_interpreter.NaryOperator):
+    @staticmethod
+    def get_name() -> str:
+        return ast.List.__name__
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        # returns its computed parameters
+        return self.get_computed_parameters()
+
+
+class IfExpOperator(dsl_interpreter.ExpressionOperator):
+    @staticmethod
+    def get_name() -> str:
+        return ast.IfExp.__name__
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        test, body, orelse = self.parameters
+        if test.compute() if isinstance(test, dsl_interpreter.Operator) else test:
+            return body.compute() if isinstance(body, dsl_interpreter.Operator) else body
+        return orelse.compute() if isinstance(orelse, dsl_interpreter.Operator) else orelse
+
+
+class FirstParameterOnlyOperator(dsl_interpreter.CallOperator):
+    @staticmethod
+    def get_name() -> str:
+        return "first"
+
+    def get_computed_parameters(self):
+        parameter = self.parameters[0]
+        return [parameter.compute() if isinstance(parameter, dsl_interpreter.Operator) else parameter]
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        return self.get_computed_parameters()[0]
+
+
+OPERATORS = [
+    AddOperator, MultOperator, DivOperator, USubOperator, GtOperator, PopSumOperator,
+    CounterOperator, IfExpOperator, FirstParameterOnlyOperator, ListOperator,
+]
+
+EXPRESSIONS = [
+    "1 + 2",
+    "-(1 + 2) * 3",
+    "pop_sum(1, 2 * 3, pop_sum(4, 5), 6)",
+    "(1 + 2) * (3 + (4 * (5 + -6)))",
+    "counter + counter * 2",
+    "pop_sum(counter, 1) > 2",
+    "1 if counter > 1 else 2",
+    "1 / (counter + -counter) if counter > 1000 else 3 + counter",
+    "first(counter + 1, 1 / 0)",
+    "[counter, 2, [counter + 1]]",
+]
+
+
+@pytest.fixture(autouse=True)
+def flatten_any_depth():
+    with mock.patch.object(octobot_commons.constants, "DSL_FLAT_EXECUTION_MIN_DEPTH", 0):
+        yield
+
+
+def _tree_walk_interpreter():
+    return dsl_interpreter.Interpreter(OPERATORS)
+
+
+def _flat_interpreter():
+    return dsl_interpreter.Interpreter(OPERATORS, flat_execution=True)
+
+
+@pytest.mark.asyncio
+async def test_flat_execution_same_results_as_tree_walk():
+    for expression in EXPRESSIONS:
+        tree_walk_interpreter = _tree_walk_interpreter()
+        flat_interpreter = _flat_interpreter()
+        tree_walk_interpreter.prepare(expression)
+        flat_interpreter.prepare(expression)
+        assert flat_interpreter._flat_executor is not None
+        # compute multiple times to ensure buffers are reset between executions
+        for _ in range(3):
+            assert await flat_interpreter.compute_expression() == \
+                await tree_walk_interpreter.compute_expression(), expression
+
+
+@pytest.mark.asyncio
+async def test_flat_execution_with_constant_expression():
+    interpreter = _flat_interpreter()
+    interpreter.prepare("42")
+    assert interpreter._flat_executor is None
+    assert await interpreter.compute_expression() == 42
+    assert await interpreter.interprete("'a'") == "a"
+    assert await interpreter.interprete("1 + 1") == 2
+
+
+@pytest.mark.asyncio
+async def test_flat_executor_instructions():
+    interpreter = _flat_interpreter()
+    interpreter.prepare("(1 + 2) * -3")
+    # Mult, Add, USub
+    assert interpreter._flat_executor.get_instructions_count() == 3
+    assert await interpreter.compute_expression() == -9
+    # computed parameters are only set while computing
+    assert interpreter._operator_tree_or_constant._flat_execution_parameters is None
+    assert interpreter._flat_executor._instructions[-1][2] == [None, None]
+    assert interpreter._operator_tree_or_constant.get_computed_parameters() == [3, -3]
+
+    # nested operators of operators that don't support flat execution are not compiled
+    interpreter.prepare("1 if 1 + 1 > 1 else 2")
+    assert interpreter._flat_executor.get_instructions_count() == 1
+    assert await interpreter.compute_expression() == 1
+    interpreter.prepare("first(1 + 1, 1 / 0)")
+    assert interpreter._flat_executor.get_instructions_count() == 1
+    assert await interpreter.compute_expression() == 2
+
+
+@pytest.mark.asyncio
+async def test_flat_executor_min_depth():
+    interpreter = _tree_walk_interpreter()
+    interpreter.prepare("(1 + 2) * -3")
+    tree = interpreter._operator_tree_or_constant
+    # depth is 2
+    assert dsl_interpreter.FlatExecutor(tree, min_depth=2).get_instructions_count() == 3
+    tree_walk_executor = dsl_interpreter.FlatExecutor(tree, min_depth=3)
+    assert tree_walk_executor.get_instructions_count() == 0
+    assert tree_walk_executor.execute() == -9
+    with mock.patch.object(octobot_commons.constants, "DSL_FLAT_EXECUTION_MIN_DEPTH", 3):
+        flat_interpreter = _flat_interpreter()
+        flat_interpreter.prepare("(1 + 2) * -3")
+        # too shallow: computed using the regular tree walk
+        assert flat_interpreter._flat_executor is None
+        assert await flat_interpreter.compute_expression() == -9
+
+
+@pytest.mark.asyncio
+async def test_flat_executor_resets_computed_parameters_on_error():
+    interpreter = _flat_interpreter()
+    interpreter.prepare("(counter + 1) * (1 / (counter + -1))")
+    with pytest.raises(ZeroDivisionError):
+        await interpreter.compute_expression()
+    for _, operator, computed_parameters, indexes in interpreter._flat_executor._instructions:
+        if indexes is not None:
+            assert operator._flat_execution_parameters is None
+            assert all(computed_parameters[index] is None for index in indexes)
+    assert await interpreter.compute_expression() == 3 * (1 / 1)
+
+
+@pytest.mark.asyncio
+async def test_flat_execution_results_are_not_shared_between_executions():
+    tree_walk_interpreter = _tree_walk_interpreter()
+    flat_interpreter = _flat_interpreter()
+    tree_walk_interpreter.prepare("[counter, 2]")
+    flat_interpreter.prepare("[counter, 2]")
+    tree_walk_results = [await tree_walk_interpreter.compute_expression() for _ in range(2)]
+    flat_results = [await flat_interpreter.compute_expression() for _ in range(2)]
+    assert tree_walk_results == [[1, 2], [2, 2]]
+    assert flat_results == tree_walk_results
@@ -14,6 +14,7 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 import mock
+import collections
 import dataclasses
 import typing
 import pytest
@@ -132,3 +133,85 @@ async def test_get_dependencies(interpreter):
             ChannelDependency("time_channel"),
             ChannelDependency("plop_channel")
         ]
+
+
+class CloseOperator(dsl_interpreter.NameOperator):
+    def __init__(self, *parameters: dsl_interpreter.OperatorParameterType, **kwargs: typing.Any):
+        super().__init__(*parameters, **kwargs)
+        self.last_close = None
+
+    @staticmethod
+    def get_name() -> str:
+        return "close"
+
+    def on_frame(self, frame: typing.Any) -> None:
+        self.last_close = frame["close"]
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        return self.last_close
+
+
+class RollingSumOperator(dsl_interpreter.CallOperator):
+    def __init__(self, *parameters: dsl_interpreter.OperatorParameterType, **kwargs: typing.Any):
+        super().__init__(*parameters, **kwargs)
+        self.window = collections.deque(maxlen=3)
+
+    @staticmethod
+    def get_name() -> str:
+        return "rolling_sum_3"
+
+    def on_frame(self, frame: typing.Any) -> None:
+        self.window.append(frame["close"])
+
+    def compute(self) -> dsl_interpreter.ComputedOperatorParameterType:
+        return sum(self.window)
+
+
+async def _frames(count, read_frames=None):
+    for i in range(count):
+        if read_frames is not None:
+            read_frames.append(i)
+        yield {"close": i}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("flat_execution", [False, True])
+async def test_interprete_stream(flat_execution):
+    interpreter = dsl_interpreter.Interpreter(
+        [CloseOperator, RollingSumOperator, AddOperator], flat_execution=flat_execution
+    )
+    results = [
+        result
+        async for result in interpreter.interprete_stream("close + rolling_sum_3()", _frames(5))
+    ]
+    assert results == [0 + 0, 1 + 1, 2 + 3, 3 + 6, 4 + 9]
+    # constant expression
+    assert [result async for result in interpreter.interprete_stream("1", _frames(2))] == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_interprete_stream_bounded_buffer():
+    interpreter = dsl_interpreter.Interpreter([CloseOperator])
+    read_frames = []
+    stream = interpreter.interprete_stream("close", _frames(100, read_frames), max_buffered_frames=2)
+    async for result in stream:
+        # at most max_buffered_frames + 1 pending frames are read ahead
+        assert len(read_frames) - result <= 4
+        if result == 10:
+            break
+    await stream.aclose()
+    assert len(read_frames) < 20
+
+
+@pytest.mark.asyncio
+async def test_interprete_stream_frames_error():
+    async def _failing_frames():
+        yield {"close": 1}
+        raise ValueError("frames error")
+
+    interpreter = dsl_interpreter.Interpreter([CloseOperator])
+    results = []
+    with pytest.raises(ValueError, match="frames error"):
+        async for result in interpreter.interprete_stream("close", _failing_frames()):
+            results.append(result)
+    assert results == [1]
@@ -13,6 +13,7 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import threading
 import mock
 import pytest
 
@@ -74,3 +75,122 @@ def test_exception(logger, call_wrapper):
 
     logger.exception(err, True, "error", skip_post_callback=True)
     call_wrapper.callback_mock.assert_not_called()
+
+
+def test_global_logger_level():
+    previous_level = logging.get_global_logger_level()
+    try:
+        logging.set_global_logger_level(logging_util.logging.ERROR)
+        assert logging_util._get_root_logger_level() == logging_util.logging.ERROR
+        assert logging_util.BotLogger._is_published(logging_util.logging.WARNING) is False
+        logging.set_global_logger_level(logging_util.logging.INFO)
+        assert logging_util._get_root_logger_level() == logging_util.logging.INFO
+        assert logging_util.BotLogger._is_published(logging_util.logging.WARNING) is True
+    finally:
+        logging.set_global_logger_level(previous_level)
+
+
+def test_root_logger_level_changed_outside_of_set_global_logger_level():
+    previous_level = logging.get_global_logger_level()
+    bot_logger = logging.get_logger("test_root_logger_level")
+    try:
+        logging.set_global_logger_level(logging_util.logging.DEBUG)
+        with mock.patch.object(logging_util, "add_log", mock.Mock()) as add_log_mock:
+            bot_logger.warning("published")
+            add_log_mock.assert_called_once()
+            add_log_mock.reset_mock()
+            logging_util.logging.getLogger().setLevel(logging_util.logging.ERROR)
+            assert bot_logger._is_ignored(logging_util.logging.WARNING)
+            bot_logger.warning("not published")
+            add_log_mock.assert_not_called()
+    finally:
+        logging.set_global_logger_level(previous_level)
+
+
+def test_disabled_level_skips_log_callback(logger):
+    callback = mock.Mock(side_effect=lambda message: message)
+    logging.register_log_callback(callback)
+    try:
+        with logging.temporary_log_level(logging_util.logging.INFO):
+            logger.debug("debug")
+            callback.assert_not_called()
+            logger.info("info")
+            callback.assert_called_once_with("info")
+    finally:
+        logging.register_log_callback(None)
+
+
+def test_queue_logging_pipeline(logger):
+    root_logger = logging_util.logging.getLogger()
+    handler = logging_util.logging.StreamHandler()
+    root_logger.addHandler(handler)
+    emitting_threads = []
+    try:
+        with mock.patch.object(
+            handler, "emit", mock.Mock(side_effect=lambda _: emitting_threads.append(threading.get_ident()))
+        ):
+            assert logging.is_queue_logging_pipeline_enabled() is False
+            logging.enable_queue_logging_pipeline()
+            logging.enable_queue_logging_pipeline()
+            assert logging.is_queue_logging_pipeline_enabled() is True
+            assert handler not in root_logger.handlers
+            assert handler.level in logging.get_logger_level_per_handler()
+            with logging.temporary_log_level(logging_util.logging.INFO):
+                logger.info("info")
+                logging.disable_queue_logging_pipeline()
+            assert logging.is_queue_logging_pipeline_enabled() is False
+            assert handler in root_logger.handlers
+            # log emitted from the listener thread
+            assert len(emitting_threads) == 1
+            assert emitting_threads[0] != threading.get_ident()
+    finally:
+        logging.disable_queue_logging_pipeline()
+        root_logger.removeHandler(handler)
+
+
+def test_get_logger_is_cached():
+    assert logging.get_logger("cached") is logging.get_logger("cached")
+    assert logging.get_logger("cached") is not logging.get_logger("other")
+    assert logging.get_logger("cached").logger_name == "cached"
+
+
+def test_lazy_messages(logger):
+    message_builder = mock.Mock(return_value="built")
+    with logging.temporary_log_level(logging_util.logging.INFO), \
+            mock.patch.object(logger.logger, "info", mock.Mock()) as info_mock, \
+            mock.patch.object(logging_util, "add_log", mock.Mock()) as add_log_mock:
+        logger.debug(message_builder)
+        message_builder.assert_not_called()
+        logger.info(message_builder)
+        message_builder.assert_called_once_with()
+        info_mock.assert_called_once_with("built")
+        add_log_mock.assert_not_called()
+        info_mock.reset_mock()
+        logger.warning("%s and %s", 1, "2")
+        # formatted for publication only
+        add_log_mock.assert_called_once_with(
+            logging_util.logging.WARNING, "test", "1 and 2", call_notifiers=logging_util.ERROR_PUBLICATION_ENABLED
+        )
+        add_log_mock.reset_mock()
+        logger.warning("%(first)s and %(second)s", {"first": 1, "second": "2"})
+        # a single mapping argument is used as the message mapping, as in logging.LogRecord
+        add_log_mock.assert_called_once_with(
+            logging_util.logging.WARNING, "test", "1 and 2", call_notifiers=logging_util.ERROR_PUBLICATION_ENABLED
+        )
+
+
+def test_ignored_error_processes_log_callback(logger, call_wrapper):
+    callback = mock.Mock(side_effect=lambda message: f"processed {message}")
+    logging.BotLogger.register_error_callback(call_wrapper.other_callback)
+    logging.register_log_callback(callback)
+    try:
+        with logging.temporary_log_level(logging_util.logging.CRITICAL), \
+                mock.patch.object(logging_util.BotLogger, "_is_published", mock.Mock(return_value=False)):
+            assert logger._is_ignored(logging_util.logging.ERROR)
+            logger.error(lambda: "err")
+        # same message as when the error is not ignored
+        callback.assert_called_once_with("err")
+        call_wrapper.callback_mock.assert_called_once_with(None, "processed err")
+    finally:
+        logging.register_log_callback(None)
+        logging.BotLogger.register_error_callback(logging_util._default_callback)
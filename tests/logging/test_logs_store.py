@@ -0,0 +1,84 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import logging
+import time
+import pytest
+
+import octobot_commons.logging as commons_logging
+import octobot_commons.timestamp_util as timestamp_util
+
+
+def _add_logs(buffer, count, start=0):
+    for index in range(start, start + count):
+        buffer.add(time.time(), logging.ERROR, "source", f"message {index}")
+
+
+def test_add_and_read():
+    buffer = commons_logging.LogsRingBuffer(3)
+    assert len(buffer) == 0
+    assert list(buffer) == []
+    timestamp = time.time()
+    buffer.add(timestamp, logging.WARNING, 1, "message")
+    assert len(buffer) == 1
+    assert list(buffer) == [{
+        "Time": timestamp_util.convert_timestamp_to_datetime(
+            timestamp, time_format="%Y-%m-%d %H:%M:%S", local_timezone=True
+        ),
+        "Level": "WARNING",
+        "Source": "1",
+        "Message": "message",
+    }]
+
+
+def test_ring_buffer_capacity():
+    buffer = commons_logging.LogsRingBuffer(3)
+    _add_logs(buffer, 5)
+    assert len(buffer) == 3
+    assert [log["Message"] for log in buffer] == ["message 2", "message 3", "message 4"]
+    assert [log["Message"] for log in reversed(buffer)] == ["message 4", "message 3", "message 2"]
+    assert buffer[0]["Message"] == "message 2"
+    assert buffer[-1]["Message"] == "message 4"
+    assert [log["Message"] for log in buffer[1:]] == ["message 3", "message 4"]
+    with pytest.raises(IndexError):
+        buffer[3]
+
+
+def test_iter_since():
+    buffer = commons_logging.LogsRingBuffer(3)
+    _add_logs(buffer, 2)
+    cursor = buffer.get_cursor()
+    assert cursor == 2
+    assert list(buffer.iter_since(cursor)) == []
+    _add_logs(buffer, 1, start=2)
+    new_logs = list(buffer.iter_since(cursor))
+    assert [(log.index, log.message) for log in new_logs] == [(2, "message 2")]
+    # too old logs are skipped
+    _add_logs(buffer, 4, start=3)
+    assert [log.index for log in buffer.iter_since(cursor)] == [4, 5, 6]
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.get_cursor() == 7
+    assert list(buffer.iter_since(0)) == []
+
+
+def test_add_log():
+    cursor = commons_logging.get_logs_cursor()
+    errors_count = commons_logging.get_errors_count()
+    commons_logging.add_log(logging.ERROR, "source", "error message")
+    commons_logging.add_log(logging.ERROR, "source", "not kept", keep_log=False)
+    assert [log.message for log in commons_logging.iter_logs_since(cursor)] == ["error message"]
+    assert commons_logging.logs_database[commons_logging.LOG_DATABASE][-1]["Level"] == "ERROR"
+    assert commons_logging.get_errors_count() == errors_count + 1
@@ -13,6 +13,8 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import copy
+import pickle
 import pytest
 
 import octobot_commons.symbols
@@ -95,23 +97,71 @@ def test_is_inverse(spot_symbol, perpetual_future_symbol, option_symbol):
 
 
 def test_merged_str_symbol_with_full_option(option_symbol, put_option_symbol):
-    call_symbol = octobot_commons.symbols.Symbol("ETH/USDT:USDT-211225-40000-C")
-    call_symbol.option_type = octobot_commons.enums.OptionTypes.CALL.value
-    call_symbol.strike_price = 40000
-    call_symbol.identifier = "211225"
-    assert call_symbol.merged_str_symbol() == "ETH/USDT:USDT-211225-40000-C"
-    
-    put_symbol = octobot_commons.symbols.Symbol("BTC/USDT:BTC-211225-60000-P")
-    put_symbol.option_type = octobot_commons.enums.OptionTypes.PUT.value
-    put_symbol.strike_price = 60000
-    put_symbol.identifier = "211225"
-    assert put_symbol.merged_str_symbol() == "BTC/USDT:BTC-211225-60000-P"
+    assert option_symbol.merged_str_symbol() == "ETH/USDT:USDT-211225-40000-C"
+    assert put_option_symbol.merged_str_symbol() == "BTC/USDT:BTC-211225-60000-P"
 
     custom_symbol = octobot_commons.symbols.Symbol("BTC/USDT:BTC-211225-60000-yES")
-    custom_symbol.option_type = "YES"
-    custom_symbol.strike_price = 60000
-    custom_symbol.identifier = "211225"
+    assert custom_symbol.option_type == "YES"
     assert custom_symbol.merged_str_symbol() == "BTC/USDT:BTC-211225-60000-YES"
+    assert custom_symbol.merged_str_symbol(
+        market_separator="g", settlement_separator="d", option_separator="_"
+    ) == "BTCgUSDTdBTC_211225_60000_YES"
+
+
+def test_merge_symbol_parts():
+    assert octobot_commons.symbols.merge_symbol_parts("BTC", "USDT") == "BTC/USDT"
+    assert octobot_commons.symbols.merge_symbol_parts(
+        "BTC", "USDT", "BTC", "211225", 60000, octobot_commons.enums.OptionTypes.PUT.value
+    ) == "BTC/USDT:BTC-211225-60000-P"
+    # option details are ignored when incomplete
+    assert octobot_commons.symbols.merge_symbol_parts("BTC", "USDT", "BTC", "211225") == "BTC/USDT:BTC"
+
+
+def test_immutable(spot_symbol):
+    with pytest.raises(AttributeError):
+        spot_symbol.base = "ETH"
+    with pytest.raises(AttributeError):
+        del spot_symbol.quote
+    with pytest.raises(AttributeError):
+        spot_symbol.other = 1
+    assert spot_symbol.base == "BTC"
+
+
+def test_interned(spot_symbol, option_symbol):
+    assert octobot_commons.symbols.Symbol("BTC/USDT") is spot_symbol
+    assert octobot_commons.symbols.Symbol("ETH/USDT:USDT-211225-40000-C") is option_symbol
+    assert octobot_commons.symbols.Symbol("BTC-USDT", market_separator="-") is not spot_symbol
+    assert copy.copy(spot_symbol) is spot_symbol
+    assert copy.deepcopy(spot_symbol) is spot_symbol
+    table_size = octobot_commons.symbols.get_symbols_table_size()
+    octobot_commons.symbols.Symbol("XYZ/USDT")
+    # unused symbols are removed from the symbols table
+    assert octobot_commons.symbols.get_symbols_table_size() == table_size
+
+
+def test_hash_and_pickle(spot_symbol, option_symbol):
+    assert {spot_symbol: 1}[octobot_commons.symbols.Symbol("BTC/USDT")] == 1
+    assert len({spot_symbol, option_symbol, octobot_commons.symbols.Symbol("BTC/USDT")}) == 2
+    for symbol in (spot_symbol, option_symbol):
+        unpickled = pickle.loads(pickle.dumps(symbol))
+        assert unpickled == symbol
+        assert hash(unpickled) == hash(symbol)
+        assert unpickled.option_type == symbol.option_type
+        # unpickled symbols are interned
+        assert unpickled is symbol
+    custom_separators_symbol = octobot_commons.symbols.Symbol("BTC|USDT", market_separator="|")
+    unpickled = pickle.loads(pickle.dumps(custom_separators_symbol))
+    assert unpickled is custom_separators_symbol
+    assert unpickled.base_and_quote() == ("BTC", "USDT")
+
+
+def test_parse_unparsable_symbol():
+    with pytest.raises(AttributeError):
+        octobot_commons.symbols.Symbol("BTCUSDT:USDT")
+    symbol = octobot_commons.symbols.Symbol("BTC/USDT:BTC-211225-60000-P-extra")
+    assert symbol.base_and_quote() == ("BTC", "USDT")
+    assert symbol.settlement_asset == "BTC"
+    assert symbol.option_type == "P"
 
 
 def test_is_put_option():
@@ -20,6 +20,20 @@ def test_parse_symbol():
     assert octobot_commons.symbols.parse_symbol("BTC/USDT") == octobot_commons.symbols.Symbol("BTC/USDT")
 
 
+def test_parse_symbols():
+    parsed = octobot_commons.symbols.parse_symbols(
+        ["BTC/USDT", "ETH/USDT:USDT-211225-40000-C", "BTC/USDT"]
+    )
+    assert parsed == [
+        octobot_commons.symbols.Symbol("BTC/USDT"),
+        octobot_commons.symbols.Symbol("ETH/USDT:USDT-211225-40000-C"),
+        octobot_commons.symbols.Symbol("BTC/USDT"),
+    ]
+    assert parsed[0] is parsed[2]
+    assert parsed[1].strike_price == "40000"
+    assert octobot_commons.symbols.parse_symbols([]) == []
+
+
 def test_merge_symbol():
     assert octobot_commons.symbols.merge_symbol("BTC/USDT") == "BTCUSDT"
     assert octobot_commons.symbols.merge_symbol("BTC/USDT:USDT") == "BTCUSDT_USDT"
@@ -14,13 +14,19 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 import contextlib
+import hashlib
+import json
+import os
 import mock
 import pytest
 import aiohttp
+import aiohttp.web
 import certifi
+import yarl
 
 import octobot_commons.aiohttp_util as aiohttp_util
 import octobot_commons.constants as commons_constants
+import octobot_commons.errors as errors
 
 pytestmark = pytest.mark.asyncio
 
@@ -107,3 +113,298 @@ async def test_counter_client_session():
             assert session.per_min.paths == {"[GET] /": 1}
             assert session.per_hour.paths == {"[GET] /": 1}
             assert session.per_day.paths == {"[GET] /": 1}
+
+
+@contextlib.asynccontextmanager
+async def _local_server(handler=None, path="/"):
+    async def _ok_handler(request):
+        return aiohttp.web.Response(text="ok")
+
+    app = aiohttp.web.Application()
+    app.router.add_get(path, handler or _ok_handler)
+    runner = aiohttp.web.AppRunner(app)
+    await runner.setup()
+    site = aiohttp.web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        yield f"http://127.0.0.1:{runner.addresses[0][1]}{path}"
+    finally:
+        await runner.cleanup()
+
+
+async def test_client_session_manager():
+    manager = aiohttp_util.ClientSessionManager(limit_per_host=2)
+    try:
+        async with _local_server() as url:
+            async with manager.session() as session:
+                assert session.connector is manager.get_connector()
+                assert session.connector.limit_per_host == 2
+                async with session.get(url) as resp:
+                    assert await resp.text() == "ok"
+            # session closed, shared connector kept open with its connection
+            assert session.closed
+            connector = manager.get_connector()
+            assert not connector.closed
+            assert (
+                sum(len(connections) for connections in connector._conns.values()) == 1
+            )
+            async with manager.session("counter") as counter_session:
+                assert isinstance(counter_session, aiohttp_util.CounterClientSession)
+                assert counter_session.connector is connector
+                async with counter_session.get(url) as resp:
+                    assert resp.status == 200
+                assert counter_session.per_min.paths == {"[GET] /": 1}
+            # certifi sessions use their own connector
+            assert manager.get_connector(use_certifi=True) is not connector
+    finally:
+        await manager.close()
+    assert connector.closed
+
+
+async def test_get_client_session_manager():
+    manager = aiohttp_util.get_client_session_manager()
+    try:
+        assert aiohttp_util.ClientSessionManager.get_instance_if_exists() is manager
+        assert aiohttp_util.get_client_session_manager() is manager
+        connector = manager.get_connector()
+        await aiohttp_util.close_client_session_manager()
+        assert connector.closed
+        # a new connector is created when necessary
+        assert not manager.get_connector().closed
+    finally:
+        await aiohttp_util.close_client_session_manager()
+
+
+async def test_get_request_path():
+    assert (
+        aiohttp_util.get_request_path("GET", "https://a.com/api/v3/ticker?symbol=BTC")
+        == "[GET] /api/v3/ticker"
+    )
+    assert (
+        aiohttp_util.get_request_path("POST", yarl.URL("https://a.com/api/order"))
+        == "[POST] /api/order"
+    )
+    aiohttp_util._get_request_path.cache_clear()
+    for timestamp in range(10):
+        assert (
+            aiohttp_util.get_request_path(
+                "GET", f"https://a.com/api/order?timestamp={timestamp}&signature=abc"
+            )
+            == "[GET] /api/order"
+        )
+    # query is not part of the cache key
+    assert aiohttp_util._get_request_path.cache_info().currsize == 1
+
+
+async def test_sliding_window_rate_tracker():
+    tracker = aiohttp_util.SlidingWindowRateTracker(window=10)
+    assert tracker.count("[GET] /a", now=0) == 0
+    for timestamp in (1, 2, 3, 4):
+        tracker.add("[GET] /a", timestamp)
+    tracker.add("[GET] /b", 4)
+    assert tracker.count("[GET] /a", now=4) == 4
+    assert tracker.count("[GET] /a", seconds=2, now=4) == 2
+    assert tracker.count("[GET] /a", seconds=100, now=4) == 4
+    assert tracker.count_all(now=4) == 5
+    assert tracker.get_counts(seconds=1, now=4) == {"[GET] /a": 1, "[GET] /b": 1}
+    # 1 and 2 are out of the window
+    assert tracker.count("[GET] /a", now=12) == 2
+    tracker.add("[GET] /a", 13)
+    assert tracker.count("[GET] /a", now=13) == 2
+    assert tracker.get_counts(now=20) == {"[GET] /a": 1}
+    assert tracker.get_counts(now=30) == {}
+    assert tracker._timestamps_by_path == {}
+
+
+async def test_sliding_window_rate_tracker_prunes_expired_paths():
+    tracker = aiohttp_util.SlidingWindowRateTracker(window=10)
+    with mock.patch.object(
+        commons_constants, "REQUESTS_RATE_TRACKER_PRUNE_INTERVAL", 5
+    ):
+        for index in range(4):
+            tracker.add(f"[GET] /orders/{index}", index)
+        assert len(tracker._timestamps_by_path) == 4
+        # 5th add: expired paths are removed
+        tracker.add("[GET] /orders/5", 12)
+        assert list(tracker._timestamps_by_path) == [
+            "[GET] /orders/3",
+            "[GET] /orders/5",
+        ]
+
+
+async def test_sliding_window_rate_tracker_delay_before_next_request():
+    tracker = aiohttp_util.SlidingWindowRateTracker(window=10)
+    for timestamp in (1, 2, 3):
+        tracker.add("[GET] /a", timestamp)
+    assert tracker.get_delay_before_next_request("[GET] /a", 4, now=3) == 0
+    assert tracker.get_delay_before_next_request("[GET] /a", 3, now=3) == 8
+    assert tracker.get_delay_before_next_request("[GET] /a", 2, seconds=5, now=3) == 4
+    assert tracker.get_delay_before_next_request("[GET] /a", 1, seconds=5, now=3) == 5
+    assert tracker.get_delay_before_next_request("[GET] /a", 3, now=11) == 0
+    tracker.clear()
+    assert tracker.count_all(now=3) == 0
+
+
+async def test_counter_client_session_rate_tracker():
+    async with _local_server() as url:
+        async with aiohttp_util.CounterClientSession("test") as session:
+            for _ in range(3):
+                async with session.get(url) as resp:
+                    assert resp.status == 200
+            async with session.post(url) as resp:
+                assert resp.status == 405
+            assert session.per_min.paths == {"[GET] /": 3, "[POST] /": 1}
+            assert session.rate_tracker.count("[GET] /") == 3
+            assert session.rate_tracker.get_counts(seconds=10) == {
+                "[GET] /": 3,
+                "[POST] /": 1,
+            }
+
+
+
+class _FilesServer:
+    def __init__(self, content, support_ranges=True):
+        self.content = content
+        self.support_ranges = support_ranges
+        self.failing_range_starts = set()
+        self.requests = []
+
+    async def handler(self, request):
+        self.requests.append((request.method, request.headers.get("Range")))
+        headers = {"ETag": '"v1"', "Last-Modified": "Mon, 19 Oct 2026 10:00:00 GMT"}
+        if not self.support_ranges:
+            return aiohttp.web.Response(body=self.content, headers=headers)
+        headers["Accept-Ranges"] = "bytes"
+        if "Range" not in request.headers:
+            return aiohttp.web.Response(body=self.content, headers=headers)
+        http_range = request.http_range
+        if http_range.start in self.failing_range_starts:
+            self.failing_range_starts.remove(http_range.start)
+            return aiohttp.web.Response(status=500, text="error")
+        return aiohttp.web.Response(
+            status=206, body=self.content[http_range], headers=headers
+        )
+
+
+def _read(file_path):
+    with open(file_path, "rb") as file:
+        return file.read()
+
+
+async def test_download_file_in_parallel_chunks(tmp_path):
+    content = os.urandom(10_000)
+    files_server = _FilesServer(content)
+    file_path = os.path.join(tmp_path, "file.zip")
+    progress = []
+    async with _local_server(files_server.handler, "/file") as url:
+        last_modified = await aiohttp_util.download_file(
+            file_path,
+            url,
+            chunk_size=3_000,
+            max_parallel_chunks=2,
+            expected_sha256=hashlib.sha256(content).hexdigest(),
+            progress_callback=lambda downloaded, total: progress.append(
+                (downloaded, total)
+            ),
+        )
+    assert last_modified == "Mon, 19 Oct 2026 10:00:00 GMT"
+    assert _read(file_path) == content
+    assert not os.path.exists(f"{file_path}.manifest.json")
+    assert files_server.requests[0] == ("HEAD", None)
+    assert sorted(files_server.requests[1:]) == [
+        ("GET", "bytes=0-2999"),
+        ("GET", "bytes=3000-5999"),
+        ("GET", "bytes=6000-8999"),
+        ("GET", "bytes=9000-9999"),
+    ]
+    assert progress[-1] == (10_000, 10_000)
+
+
+async def test_download_file_resume(tmp_path):
+    content = os.urandom(10_000)
+    files_server = _FilesServer(content)
+    files_server.failing_range_starts = {3000}
+    file_path = os.path.join(tmp_path, "file.zip")
+    async with _local_server(files_server.handler, "/file") as url:
+        async with aiohttp.ClientSession() as session:
+            with pytest.raises(RuntimeError):
+                await aiohttp_util.download_file(
+                    file_path, url, session, chunk_size=3_000
+                )
+            with open(f"{file_path}.manifest.json") as manifest_file:
+                assert sorted(json.load(manifest_file)["completed_chunks"]) == [0, 2, 3]
+            files_server.requests.clear()
+            progress = []
+            await aiohttp_util.download_file(
+                file_path,
+                url,
+                session,
+                chunk_size=3_000,
+                expected_sha256=hashlib.sha256(content).hexdigest(),
+                progress_callback=lambda downloaded, total: progress.append(downloaded),
+            )
+    # only the missing chunk is downloaded
+    assert files_server.requests == [("HEAD", None), ("GET", "bytes=3000-5999")]
+    assert progress[-1] == 10_000
+    assert _read(file_path) == content
+    assert not os.path.exists(f"{file_path}.manifest.json")
+
+
+async def test_download_file_without_range_support(tmp_path):
+    content = os.urandom(10_000)
+    files_server = _FilesServer(content, support_ranges=False)
+    file_path = os.path.join(tmp_path, "file.zip")
+    async with _local_server(files_server.handler, "/file") as url:
+        await aiohttp_util.download_file(
+            file_path,
+            url,
+            chunk_size=3_000,
+            expected_sha256=hashlib.sha256(content).hexdigest(),
+        )
+        assert _read(file_path) == content
+        assert files_server.requests == [("HEAD", None), ("GET", None)]
+        with pytest.raises(errors.InvalidChecksumError):
+            await aiohttp_util.download_file(file_path, url, expected_sha256="invalid")
+    assert not os.path.exists(file_path)
+
+
+async def test_download_file_invalid_checksum(tmp_path):
+    content = os.urandom(10_000)
+    file_path = os.path.join(tmp_path, "file.zip")
+    async with _local_server(_FilesServer(content).handler, "/file") as url:
+        with pytest.raises(errors.InvalidChecksumError):
+            await aiohttp_util.download_file(
+                file_path, url, chunk_size=3_000, expected_sha256="invalid"
+            )
+    assert not os.path.exists(file_path)
+    assert not os.path.exists(f"{file_path}.manifest.json")
+
+
+async def test_download_file_hashes_chunks_while_writing(tmp_path):
+    content = os.urandom(10_000)
+    file_path = os.path.join(tmp_path, "file.zip")
+    async with _local_server(_FilesServer(content).handler, "/file") as url:
+        with mock.patch.object(
+            aiohttp_util._ChunkedDownload,
+            "_hash_chunk",
+            autospec=True,
+            side_effect=aiohttp_util._ChunkedDownload._hash_chunk,
+        ) as _hash_chunk_mock:
+            # sequential chunks: hashed while writing
+            await aiohttp_util.download_file(
+                file_path,
+                url,
+                chunk_size=3_000,
+                max_parallel_chunks=1,
+                expected_sha256=hashlib.sha256(content).hexdigest(),
+            )
+            _hash_chunk_mock.assert_not_called()
+            # chunks completed out of order may be read back from the file
+            await aiohttp_util.download_file(
+                file_path,
+                url,
+                chunk_size=3_000,
+                max_parallel_chunks=4,
+                expected_sha256=hashlib.sha256(content).hexdigest(),
+            )
+    assert _read(file_path) == content
@@ -15,11 +15,15 @@
 #  License along with this library.
 import asyncio
 import os
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
 
 from mock import AsyncMock, patch
 import pytest
 
+import octobot_commons.async_job as async_job
+import octobot_commons.enums as enums
 from octobot_commons.async_job import AsyncJob
 from octobot_commons.asyncio_tools import wait_asyncio_next_cycle
 
@@ -165,3 +169,130 @@ async def test_run():
             assert mocked_test_job_callback.call_count in (5, 6)    # can be 5 or 6 depending on the current computer
 
     job.stop()
+
+
+async def test_metrics():
+    async def slow_callback():
+        await asyncio.sleep(0.05)
+
+    job = AsyncJob(slow_callback, is_periodic=False, enable_multiple_runs=True)
+    await job.run(force=True, wait_for_task_execution=False)
+    await wait_asyncio_next_cycle()
+    await job.run(force=True, wait_for_task_execution=True)
+    await asyncio.sleep(0.06)
+    metrics = job.get_metrics()
+    assert metrics["runs"] == 2
+    assert metrics["failures"] == 0
+    assert metrics["overlapping_runs"] == 1
+    assert metrics["run_durations"]["count"] == 2
+    assert metrics["run_durations"]["min"] >= 0.04
+    assert metrics["scheduling_lags"]["count"] == 0
+
+    failing_job = AsyncJob(AsyncMock(__name__="failing", side_effect=RuntimeError), execution_interval_delay=0.1)
+    await failing_job.run()
+    await asyncio.sleep(0.15)
+    failing_job.stop()
+    metrics = failing_job.get_metrics()
+    assert metrics["runs"] == 2
+    assert metrics["failures"] == 2
+    assert metrics["scheduling_lags"]["count"] == 2
+    assert metrics["scheduling_lags"]["max"] < 0.1
+
+
+async def test_dependencies_wait_metrics():
+    release = asyncio.Event()
+
+    async def dependency_callback():
+        await release.wait()
+
+    dependency = AsyncJob(dependency_callback, is_periodic=False)
+    job = AsyncJob(callback, is_periodic=False)
+    job.add_job_dependency(dependency)
+    await dependency.run(force=True)
+    await wait_asyncio_next_cycle()
+    assert not dependency.is_job_idle()
+    await job.run(force=True)
+    await asyncio.sleep(0.05)
+    assert job.get_metrics()["runs"] == 0
+    release.set()
+    await asyncio.sleep(0.01)
+    metrics = job.get_metrics()
+    assert metrics["runs"] == 1
+    assert metrics["dependencies_waits"]["count"] == 1
+    assert metrics["dependencies_waits"]["min"] >= 0.04
+
+
+def _cpu_bound_callback(iterations=1000):
+    if iterations < 0:
+        raise ValueError("negative iterations")
+    return sum(i * i for i in range(iterations))
+
+
+async def test_thread_executor():
+    threads = []
+    release = threading.Event()
+
+    def blocking_callback(value=None):
+        threads.append((threading.current_thread().name, value))
+        release.wait(1)
+
+    job = AsyncJob(blocking_callback, is_periodic=False, executor_type=enums.AsyncJobExecutorTypes.THREAD)
+    await job.run(force=True, value=1)
+    await asyncio.sleep(0.05)
+    # event loop is not blocked
+    assert not job.is_job_idle()
+    assert threads[0][0].startswith("AsyncJob")
+    assert threads[0][1] == 1
+    release.set()
+    await asyncio.wait_for(job.idle_task_event.wait(), 1)
+    assert job.get_metrics()["runs"] == 1
+
+    failing_job = AsyncJob(
+        _cpu_bound_callback, is_periodic=False, executor_type=enums.AsyncJobExecutorTypes.THREAD
+    )
+    await failing_job.run(force=True, wait_for_task_execution=True, iterations=-1)
+    assert failing_job.successive_failures == 1
+    assert failing_job.get_metrics()["failures"] == 1
+    await failing_job.run(force=True, wait_for_task_execution=True, iterations=10)
+    assert failing_job.successive_failures == 0
+    async_job.stop_executors()
+    assert async_job._EXECUTORS == {}
+
+
+async def test_get_executor_with_unknown_type():
+    with pytest.raises(ValueError):
+        async_job.get_executor("unknown")
+    assert async_job._EXECUTORS == {}
+
+
+async def test_stop_executors_does_not_wait_for_running_callbacks():
+    release = threading.Event()
+    executor = async_job.get_executor(enums.AsyncJobExecutorTypes.THREAD)
+    running_futures = [
+        executor.submit(release.wait, 1)
+        for _ in range(executor._max_workers)
+    ]
+    pending_future = executor.submit(release.wait, 1)
+    t0 = time.perf_counter()
+    async_job.stop_executors()
+    assert time.perf_counter() - t0 < 0.5
+    assert pending_future.cancelled()
+    assert async_job._EXECUTORS == {}
+    release.set()
+    for future in running_futures:
+        assert future.result(1) is True
+
+
+async def test_process_executor():
+    job = AsyncJob(
+        _cpu_bound_callback, is_periodic=False, executor_type=enums.AsyncJobExecutorTypes.PROCESS
+    )
+    try:
+        await job.run(force=True, wait_for_task_execution=True, iterations=100)
+        assert job.get_metrics()["runs"] == 1
+        assert job.successive_failures == 0
+        await job.run(force=True, wait_for_task_execution=True, iterations=-1)
+        assert job.successive_failures == 1
+        assert isinstance(async_job._EXECUTORS[enums.AsyncJobExecutorTypes.PROCESS], ProcessPoolExecutor)
+    finally:
+        async_job.stop_executors()
@@ -0,0 +1,199 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+
+from mock import AsyncMock
+import pytest
+
+from octobot_commons.async_job import AsyncJob
+from octobot_commons.async_job_scheduler import AsyncJobScheduler
+from octobot_commons.asyncio_tools import wait_asyncio_next_cycle
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_scheduled_periodic_runs():
+    scheduler = AsyncJobScheduler()
+    callback_1 = AsyncMock(__name__="callback_1")
+    callback_2 = AsyncMock(__name__="callback_2")
+    job_1 = AsyncJob(callback_1, execution_interval_delay=0.1, scheduler=scheduler)
+    job_2 = AsyncJob(callback_2, execution_interval_delay=0.1, first_execution_delay=0.3, scheduler=scheduler)
+    await job_1.run(plop=1)
+    await job_2.run()
+    assert job_1.is_started
+    assert job_1.job_periodic_task is None
+    assert scheduler.is_scheduled(job_1)
+    await wait_asyncio_next_cycle()
+    await wait_asyncio_next_cycle()
+    callback_1.assert_called_once_with(plop=1)
+    callback_2.assert_not_called()
+    await asyncio.sleep(0.35)
+    assert callback_1.call_count in (3, 4, 5)
+    callback_2.assert_called_once()
+    job_1.stop()
+    assert not scheduler.is_scheduled(job_1)
+    assert not job_1.is_started
+    call_count = callback_1.call_count
+    await asyncio.sleep(0.15)
+    assert callback_1.call_count == call_count
+    assert callback_2.call_count >= 2
+    stats = scheduler.get_stats()
+    assert stats["scheduled_jobs"] == 1
+    assert stats["jobs"][0]["name"] == job_2.logger.logger_name
+    assert stats["jobs"][0]["runs"] == callback_2.call_count
+    assert stats["jobs"][0]["max_run_time"] >= 0
+    scheduler.stop()
+    assert not scheduler.is_scheduled(job_2)
+
+
+async def test_concurrency_limit_and_priorities():
+    scheduler = AsyncJobScheduler(max_concurrent_runs=1)
+    started = []
+    release = asyncio.Event()
+
+    def _callback(name):
+        async def callback():
+            started.append(name)
+            await release.wait()
+        callback.__name__ = name
+        return callback
+
+    jobs = [
+        AsyncJob(_callback(name), execution_interval_delay=10, scheduler=scheduler, priority=priority)
+        for name, priority in (("low", 0), ("high", 10), ("medium", 5))
+    ]
+    # schedule all jobs at the same time
+    for job in jobs:
+        scheduler.schedule(job, priority=job.priority)
+    await asyncio.sleep(0.05)
+    assert started == ["high"]
+    assert scheduler.get_queue_depth() == 2
+    assert scheduler.get_stats()["running_jobs"] == 1
+    release.set()
+    await asyncio.sleep(0.05)
+    assert started == ["high", "medium", "low"]
+    assert scheduler.get_queue_depth() == 0
+    low_stats = [stats for stats in scheduler.get_stats()["jobs"] if stats["name"] == "AsyncJob-low"][0]
+    assert low_stats["runs"] == 1
+    assert low_stats["max_lateness"] > 0
+    scheduler.stop()
+
+
+async def test_unschedule_cancels_running_job():
+    scheduler = AsyncJobScheduler()
+    cancelled = asyncio.Event()
+
+    async def callback():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    job = AsyncJob(callback, scheduler=scheduler)
+    await job.run()
+    await asyncio.sleep(0.02)
+    assert scheduler.get_stats()["running_jobs"] == 1
+    job.stop()
+    await asyncio.sleep(0.01)
+    assert cancelled.is_set()
+    assert scheduler.get_stats()["running_jobs"] == 0
+    assert job.is_job_idle()
+
+
+async def test_jobs_waiting_for_dependencies_do_not_use_run_slots():
+    scheduler = AsyncJobScheduler(max_concurrent_runs=1)
+    release_dependency = asyncio.Event()
+    started = []
+
+    async def dependency_callback():
+        await release_dependency.wait()
+
+    def _callback(name):
+        async def callback():
+            started.append(name)
+        callback.__name__ = name
+        return callback
+
+    dependency = AsyncJob(dependency_callback, is_periodic=False)
+    waiting_job = AsyncJob(_callback("waiting"), execution_interval_delay=10, scheduler=scheduler)
+    waiting_job.add_job_dependency(dependency)
+    ready_job = AsyncJob(_callback("ready"), execution_interval_delay=10, scheduler=scheduler)
+    dependency_task = asyncio.create_task(dependency.run(force=True, wait_for_task_execution=True))
+    await wait_asyncio_next_cycle()
+    assert not dependency.is_job_idle()
+    scheduler.schedule(waiting_job, priority=10)
+    scheduler.schedule(ready_job)
+    await asyncio.sleep(0.05)
+    # the higher priority job is waiting for its dependency without blocking the other job
+    assert started == ["ready"]
+    waiting_stats = [stats for stats in scheduler.get_stats()["jobs"] if stats["name"] == "AsyncJob-waiting"][0]
+    assert waiting_stats["is_waiting"] is True
+    assert waiting_stats["runs"] == 0
+    release_dependency.set()
+    await dependency_task
+    await asyncio.sleep(0.02)
+    assert started == ["ready", "waiting"]
+    scheduler.stop()
+
+
+async def test_timed_out_waits_run_without_waiting_again():
+    scheduler = AsyncJobScheduler(max_concurrent_runs=1)
+    release_dependency = asyncio.Event()
+
+    async def dependency_callback():
+        await release_dependency.wait()
+
+    async def waiting_callback():
+        pass
+
+    dependency = AsyncJob(dependency_callback, is_periodic=False)
+    waiting_job = AsyncJob(waiting_callback, execution_interval_delay=10, scheduler=scheduler)
+    waiting_job.DEPENDENCIES_WAIT_TIMEOUT = 0.1
+    waiting_job.add_job_dependency(dependency)
+    dependency_task = asyncio.create_task(dependency.run(force=True, wait_for_task_execution=True))
+    await wait_asyncio_next_cycle()
+    scheduler.schedule(waiting_job)
+    await asyncio.sleep(0.15)
+    # ran after the first timeout, its run slot is not used to wait for its dependency again
+    assert waiting_job.metrics.runs == 1
+    assert waiting_job.metrics.dependencies_waits.count == 1
+    release_dependency.set()
+    await dependency_task
+    scheduler.stop()
+
+
+async def test_running_job_wait_uses_self_running_timeout():
+    scheduler = AsyncJobScheduler()
+    release_first_call = asyncio.Event()
+    calls = []
+
+    async def callback():
+        calls.append(None)
+        if len(calls) == 1:
+            await release_first_call.wait()
+
+    job = AsyncJob(callback, execution_interval_delay=10, scheduler=scheduler)
+    job.SELF_RUNNING_WAIT_TIMEOUT = 0.05
+    run_task = asyncio.create_task(job._run())
+    await wait_asyncio_next_cycle()
+    assert not job.is_job_idle()
+    scheduler.schedule(job)
+    await asyncio.sleep(0.15)
+    assert len(calls) == 2
+    release_first_call.set()
+    await run_task
+    scheduler.stop()
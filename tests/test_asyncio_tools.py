@@ -14,9 +14,11 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 import asyncio
+import inspect
 import pytest
 
 import octobot_commons.asyncio_tools as asyncio_tools
+import octobot_commons.errors as errors
 
 # All test coroutines will be treated as marked.
 pytestmark = pytest.mark.asyncio
@@ -255,5 +257,279 @@ async def test_RLock_error_setup_2():
             pass
 
 
+async def test_gather_with_concurrency_limit():
+    running = []
+    max_running = []
+
+    async def _coro(value):
+        running.append(value)
+        max_running.append(len(running))
+        await asyncio.sleep(0.001 * (5 - value))
+        running.remove(value)
+        return value
+
+    assert await asyncio_tools.gather_with_concurrency_limit(
+        *(_coro(i) for i in range(5)), max_concurrency=2
+    ) == [0, 1, 2, 3, 4]
+    assert max(max_running) == 2
+    assert await asyncio_tools.gather_with_concurrency_limit(max_concurrency=2) == []
+
+
+async def test_gather_with_concurrency_limit_waits_for_all_before_raising():
+    done = []
+
+    async def _coro(value):
+        await asyncio.sleep(0.001 * value)
+        if value in (1, 2):
+            raise RuntimeError(value)
+        done.append(value)
+
+    with pytest.raises(RuntimeError, match="1"):
+        await asyncio_tools.gather_with_concurrency_limit(
+            *(_coro(i) for i in range(4)), max_concurrency=2
+        )
+    assert sorted(done) == [0, 3]
+
+
+async def test_iterate_as_completed():
+    created = []
+
+    async def _coro(value):
+        await asyncio.sleep(0.001 * (4 - value))
+        return value
+
+    def _coros():
+        for i in range(4):
+            created.append(i)
+            yield _coro(i)
+
+    results = []
+    async for result in asyncio_tools.iterate_as_completed(_coros(), 4):
+        results.append(result)
+    assert results == [3, 2, 1, 0]
+
+    created.clear()
+    results = []
+    async for result in asyncio_tools.iterate_as_completed(_coros(), 2, ordered=True):
+        results.append(result)
+        # coros are lazily created
+        assert len(created) <= result + 3
+    assert results == [0, 1, 2, 3]
+
+
+async def test_iterate_as_completed_with_errors():
+    async def _coro(value):
+        await asyncio.sleep(0)
+        if value == 1:
+            raise RuntimeError(value)
+        return value
+
+    results = []
+    with pytest.raises(RuntimeError):
+        async for result in asyncio_tools.iterate_as_completed(
+            (_coro(i) for i in range(4)), 2, ordered=True
+        ):
+            results.append(result)
+    assert results == [0, 2, 3]
+
+
+async def test_iterate_as_completed_interrupted():
+    cancelled = []
+
+    async def _coro(value):
+        try:
+            await asyncio.sleep(0.001 if value == 0 else 1)
+        except asyncio.CancelledError:
+            cancelled.append(value)
+            raise
+        return value
+
+    iterator = asyncio_tools.iterate_as_completed((_coro(i) for i in range(5)), 3)
+    async for result in iterator:
+        assert result == 0
+        break
+    await iterator.aclose()
+    assert sorted(cancelled) == [1, 2]
+
+
+async def test_unstarted_coros_closed_when_interrupted():
+    async def _coro(value):
+        await asyncio.sleep(0.001 if value == 0 else 1)
+        return value
+
+    coros = [_coro(i) for i in range(5)]
+    task = asyncio.create_task(asyncio_tools.gather_with_concurrency_limit(*coros, max_concurrency=2))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert all(inspect.getcoroutinestate(coro) == inspect.CORO_CLOSED for coro in coros)
+
+    coros = [_coro(i) for i in range(5)]
+    iterator = asyncio_tools.iterate_as_completed(coros, 2)
+    async for result in iterator:
+        assert result == 0
+        break
+    await iterator.aclose()
+    assert all(inspect.getcoroutinestate(coro) == inspect.CORO_CLOSED for coro in coros)
+
+
+async def test_task_group():
+    async def _coro(value):
+        await asyncio.sleep(0.001)
+        return value
+
+    async with asyncio_tools.TaskGroup(max_concurrency=2) as task_group:
+        tasks = [task_group.create_task(_coro(i)) for i in range(5)]
+    assert [task.result() for task in tasks] == [0, 1, 2, 3, 4]
+
+
+async def test_task_group_errors():
+    async def _coro(value):
+        await asyncio.sleep(0)
+        if value:
+            raise RuntimeError(value)
+        return value
+
+    with pytest.raises(errors.TaskGroupError) as err:
+        async with asyncio_tools.TaskGroup() as task_group:
+            task = task_group.create_task(_coro(0))
+            task_group.create_task(_coro(1))
+            task_group.create_task(_coro(2))
+    assert [str(error) for error in err.value.errors] == ["1", "2"]
+    assert task.result() == 0
+
+
+async def test_task_group_cancels_tasks_on_body_error_and_cancellation():
+    async def _coro():
+        await asyncio.sleep(1)
+
+    with pytest.raises(ZeroDivisionError):
+        async with asyncio_tools.TaskGroup() as task_group:
+            task = task_group.create_task(_coro())
+            1 / 0
+    assert task.cancelled()
+
+    inner_tasks = []
+
+    async def _group():
+        async with asyncio_tools.TaskGroup() as task_group:
+            inner_tasks.append(task_group.create_task(_coro()))
+
+    group_task = asyncio.create_task(_group())
+    await asyncio.sleep(0.001)
+    group_task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await group_task
+    assert inner_tasks[0].cancelled()
+
+
+async def test_FastRLock_reentrancy():
+    lock = asyncio_tools.FastRLock()
+    assert not lock.locked()
+    async with lock:
+        async with lock:
+            assert lock.locked()
+        assert lock.locked()
+    assert not lock.locked()
+    with pytest.raises(RuntimeError):
+        lock.release()
+    assert lock.get_metrics()["contended_acquisitions"] == 0
+
+
+async def test_FastRLock_uncontended_acquire_does_not_yield():
+    lock = asyncio_tools.FastRLock()
+    other_task_calls = []
+
+    async def _other_task():
+        other_task_calls.append(1)
+
+    task = asyncio.create_task(_other_task())
+    for _ in range(10):
+        await lock.acquire()
+    # other task did not run: lock acquisition never yielded to the event loop
+    assert other_task_calls == []
+    for _ in range(10):
+        lock.release()
+    await task
+    assert other_task_calls == [1]
+
+
+@pytest.mark.parametrize("fair", [True, False])
+async def test_FastRLock_mutual_exclusion(fair):
+    lock = asyncio_tools.FastRLock(fair=fair, track_hold_time=True)
+    in_lock = []
+    order = []
+
+    async def _locked(value):
+        async with lock:
+            async with lock:
+                in_lock.append(value)
+                assert len(in_lock) == 1
+                await asyncio.sleep(0.001)
+                order.append(value)
+                in_lock.remove(value)
+
+    await asyncio.gather(*(_locked(i) for i in range(5)))
+    assert sorted(order) == list(range(5))
+    metrics = lock.get_metrics()
+    assert metrics["contended_acquisitions"] == 4
+    assert metrics["max_hold_time"] >= 0.001
+    assert metrics["max_wait_time"] > 0
+    assert metrics["waiters"] == 0
+    assert not lock.locked()
+
+
+async def test_FastRLock_fairness():
+    lock = asyncio_tools.FastRLock(fair=True)
+    order = []
+
+    async def _locked(value):
+        async with lock:
+            order.append(value)
+
+    await lock.acquire()
+    tasks = [asyncio.create_task(_locked(i)) for i in range(3)]
+    await asyncio_tools.wait_asyncio_next_cycle()
+    lock.release()
+    # released lock is handed over to the first waiter: it can't be taken by another task
+    barging_task = asyncio.create_task(_locked("barging"))
+    await asyncio.gather(*tasks, barging_task)
+    assert order == [0, 1, 2, "barging"]
+
+    unfair_lock = asyncio_tools.FastRLock()
+    order.clear()
+    lock = unfair_lock
+    await lock.acquire()
+    tasks = [asyncio.create_task(_locked(i)) for i in range(3)]
+    await asyncio_tools.wait_asyncio_next_cycle()
+    lock.release()
+    await _locked("barging")
+    await asyncio.gather(*tasks)
+    assert order == ["barging", 0, 1, 2]
+
+
+@pytest.mark.parametrize("fair", [True, False])
+async def test_FastRLock_cancelled_waiter(fair):
+    lock = asyncio_tools.FastRLock(fair=fair)
+    order = []
+
+    async def _locked(value):
+        async with lock:
+            order.append(value)
+
+    await lock.acquire()
+    tasks = [asyncio.create_task(_locked(i)) for i in range(3)]
+    await asyncio_tools.wait_asyncio_next_cycle()
+    tasks[0].cancel()
+    lock.release()
+    # cancel a woken up waiter
+    tasks[1].cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    assert order == [2]
+    assert not lock.locked()
+    assert lock.get_metrics()["waiters"] == 0
+
+
 def _exception_raiser():
     raise RuntimeError("error")
@@ -0,0 +1,82 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import time
+import mock
+import pytest
+
+import octobot_commons.event_loop_monitor as event_loop_monitor
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+async def test_lag_stats():
+    monitor = event_loop_monitor.EventLoopMonitor(
+        heartbeat_interval=0.01, slow_callback_threshold=0.05
+    )
+    with mock.patch.object(monitor.logger, "warning", mock.Mock()) as warning_mock:
+        await monitor.start()
+        assert monitor.is_running()
+        await asyncio.sleep(0.05)
+        _blocking_callback(0.1)
+        await asyncio.sleep(0.03)
+        monitor.stop()
+        assert not monitor.is_running()
+        warning_mock.assert_called_once()
+    stats = monitor.get_stats()
+    assert stats["heartbeats"] >= 3
+    assert stats["lag"]["count"] == stats["heartbeats"]
+    assert stats["lag"]["max"] >= 0.05
+    assert stats["slow_callbacks_count"] == 1
+    assert stats["slow_callbacks"][0]["duration"] >= 0.05
+    # not sampling: no stack
+    assert stats["slow_callbacks"][0]["stack"] is None
+    monitor.reset_stats()
+    assert monitor.get_stats()["heartbeats"] == 0
+
+
+async def test_sampling_slow_callback_stack():
+    monitor = event_loop_monitor.EventLoopMonitor(
+        heartbeat_interval=0.01, slow_callback_threshold=0.05, sampling=True
+    )
+    with mock.patch.object(monitor.logger, "warning", mock.Mock()) as warning_mock:
+        await monitor.start()
+        await asyncio.sleep(0.03)
+        _blocking_callback(0.2)
+        await asyncio.sleep(0.03)
+        monitor.stop()
+        warning_mock.assert_called_once()
+        assert "_blocking_callback" in warning_mock.mock_calls[0].args[0]
+    slow_callback = monitor.get_stats()["slow_callbacks"][0]
+    assert any("_blocking_callback" in line for line in slow_callback["stack"])
+
+
+async def test_start_stop_event_loop_monitor():
+    assert event_loop_monitor.get_event_loop_stats() is None
+    await event_loop_monitor.start_event_loop_monitor(heartbeat_interval=0.01)
+    try:
+        await asyncio.sleep(0.03)
+        assert event_loop_monitor.get_event_loop_stats()["heartbeats"] >= 1
+    finally:
+        await event_loop_monitor.stop_event_loop_monitor()
+        event_loop_monitor.EventLoopMonitor._instances.pop(
+            event_loop_monitor.EventLoopMonitor, None
+        )
+
+
+def _blocking_callback(duration):
+    time.sleep(duration)
@@ -0,0 +1,169 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import contextlib
+import http.server
+import json
+import os
+import threading
+import time
+import aiohttp
+import pytest
+
+import octobot_commons.external_resources_manager as external_resources_manager
+
+pytestmark = pytest.mark.asyncio
+
+RESOURCES = {"key": "value", "other": 1}
+ETAG = '"v1"'
+
+
+class _ResourcesHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests_headers.append(dict(self.headers))
+        time.sleep(self.server.delay)
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(RESOURCES).encode()
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+@contextlib.contextmanager
+def _resources_server(delay=0):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _ResourcesHandler)
+    server.requests_headers = []
+    server.delay = delay
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server, f"http://127.0.0.1:{server.server_address[1]}/resources.json"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def _client(url, tmp_path, ttl=60):
+    return external_resources_manager.ExternalResourcesClient(
+        url=url,
+        ttl=ttl,
+        cache_file_path=os.path.join(tmp_path, "cache", "resources.json"),
+    )
+
+
+async def test_get_resources_cache_and_revalidation(tmp_path):
+    with _resources_server() as (server, url):
+        client = _client(url, tmp_path)
+        assert client.get_resources() == RESOURCES
+        assert client.get_resources() == RESOURCES
+        assert len(server.requests_headers) == 1
+        assert "If-None-Match" not in server.requests_headers[0]
+        # expired: revalidated using ETag
+        client.invalidate()
+        assert client.get_resources() == RESOURCES
+        assert len(server.requests_headers) == 2
+        assert server.requests_headers[1]["If-None-Match"] == ETAG
+        assert client.fetches_count == 2
+        with open(client.cache_file_path) as cache_file:
+            assert json.load(cache_file) == {
+                "etag": ETAG,
+                "last_modified": None,
+                "resources": RESOURCES,
+            }
+        await client.close()
+
+
+async def test_async_get_resources_coalesces_requests(tmp_path):
+    with _resources_server(delay=0.1) as (server, url):
+        client = _client(url, tmp_path)
+        results = await asyncio.gather(
+            *(client.async_get_resources() for _ in range(10))
+        )
+        assert all(result == RESOURCES for result in results)
+        assert len(server.requests_headers) == 1
+        assert client.fetches_count == 1
+        # use the given session
+        client.invalidate()
+        async with aiohttp.ClientSession() as session:
+            assert await client.async_get_resources(session) == RESOURCES
+        assert server.requests_headers[1]["If-None-Match"] == ETAG
+        await client.close()
+
+
+async def test_offline_fallback_to_cache_file(tmp_path):
+    with _resources_server() as (server, url):
+        assert _client(url, tmp_path).get_resources() == RESOURCES
+    # server is down
+    offline_client = _client(url, tmp_path)
+    assert await offline_client.async_get_resources() == RESOURCES
+    assert offline_client.get_resources() == RESOURCES
+    await offline_client.close()
+    # restarted server: cached copy is revalidated
+    with _resources_server() as (server, url):
+        client = _client(url, tmp_path)
+        assert client.get_resources() == RESOURCES
+        assert server.requests_headers[0]["If-None-Match"] == ETAG
+    # no cache
+    no_cache_client = _client(url, os.path.join(tmp_path, "other"))
+    with pytest.raises(Exception):
+        no_cache_client.get_resources()
+    with pytest.raises(aiohttp.ClientError):
+        await no_cache_client.async_get_resources()
+    await no_cache_client.close()
+
+
+async def test_get_external_resource(tmp_path):
+    with _resources_server() as (server, url):
+        client = _client(url, tmp_path)
+        external_resources_manager.ExternalResourcesClient._instances[
+            external_resources_manager.ExternalResourcesClient
+        ] = client
+        try:
+            assert external_resources_manager.get_external_resource("key") == "value"
+            async with aiohttp.ClientSession() as session:
+                assert (
+                    await external_resources_manager.async_get_external_resource(
+                        "other", session
+                    )
+                    == 1
+                )
+                assert (
+                    await external_resources_manager.async_get_external_resource(
+                        "unknown",
+                        session,
+                        catch_exception=True,
+                        default_response="default",
+                    )
+                    == "default"
+                )
+            with pytest.raises(KeyError):
+                external_resources_manager.get_external_resource("unknown")
+            assert len(server.requests_headers) == 1
+        finally:
+            external_resources_manager.ExternalResourcesClient._instances.pop(
+                external_resources_manager.ExternalResourcesClient
+            )
+            await client.close()
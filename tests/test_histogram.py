@@ -0,0 +1,67 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+from octobot_commons.histogram import Histogram
+
+
+def test_observe():
+    histogram = Histogram(bounds=(1, 5, 10))
+    assert histogram.bucket_counts == [0, 0, 0, 0]
+    assert histogram.get_percentile(50) is None
+    assert histogram.get_average() is None
+    for value in (0.5, 1, 2, 3, 7, 20):
+        histogram.observe(value)
+    assert histogram.bucket_counts == [2, 2, 1, 1]
+    assert histogram.count == 6
+    assert histogram.total == 33.5
+    assert histogram.min == 0.5
+    assert histogram.max == 20
+
+
+def test_get_percentile():
+    histogram = Histogram(bounds=(1, 5, 10))
+    for value in (0.5, 1, 2, 3, 7, 20):
+        histogram.observe(value)
+    assert histogram.get_percentile(0) == 1
+    assert histogram.get_percentile(30) == 1
+    assert histogram.get_percentile(50) == 5
+    assert histogram.get_percentile(80) == 10
+    assert histogram.get_percentile(99) == 20
+    assert histogram.get_percentile(100) == 20
+    histogram.reset()
+    histogram.observe(2)
+    # max is lower than the bucket bound
+    assert histogram.get_percentile(50) == 2
+
+
+def test_to_dict_and_reset():
+    histogram = Histogram(bounds=(1, 5))
+    histogram.observe(3)
+    histogram.observe(8)
+    assert histogram.to_dict() == {
+        "count": 2,
+        "total": 11,
+        "min": 3,
+        "max": 8,
+        "average": 5.5,
+        "p50": 5,
+        "p90": 8,
+        "p99": 8,
+        "buckets": {"1": 0, "5": 1, "+Inf": 1},
+    }
+    histogram.reset()
+    assert histogram.count == 0
+    assert histogram.bucket_counts == [0, 0, 0]
+    assert histogram.min is None
@@ -0,0 +1,151 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import os
+import threading
+import mock
+import pytest
+
+import octobot_commons.async_job as async_job
+import octobot_commons.errors as errors
+import octobot_commons.metrics_registry as metrics_registry
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def registry():
+    return metrics_registry.MetricsRegistry()
+
+
+async def test_counter(registry):
+    counter = registry.counter("requests_total", "requests", ("method",))
+    assert registry.counter("requests_total", "requests", ("method",)) is counter
+    counter.inc(labels=("GET",))
+    counter.inc(2, labels=("GET",))
+    counter.inc(labels=("POST",))
+    assert counter.get(("GET",)) == 3
+    assert counter.get(("PUT",)) == 0
+    with pytest.raises(errors.InvalidMetricError):
+        counter.inc()
+    with pytest.raises(errors.InvalidMetricError):
+        registry.gauge("requests_total", "requests", ("method",))
+    with pytest.raises(errors.InvalidMetricError):
+        registry.counter("requests_total", "requests", ("path",))
+
+
+async def test_gauge(registry):
+    gauge = registry.gauge("queue_depth")
+    gauge.set(3)
+    gauge.inc()
+    gauge.dec(2)
+    assert gauge.get() == 2
+
+
+async def test_histogram(registry):
+    histogram = registry.histogram("duration_seconds", label_names=("job",), bounds=(1, 5))
+    histogram.observe(0.5, ("a",))
+    histogram.observe(3, ("a",))
+    histogram.observe(10, ("b",))
+    assert histogram.get(("a",)).count == 2
+    assert histogram.get(("c",)) is None
+
+
+async def test_thread_safe_counter(registry):
+    counter = registry.counter("thread_safe_total", thread_safe=True)
+
+    def _increment():
+        for _ in range(10000):
+            counter.inc()
+
+    threads = [threading.Thread(target=_increment) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.get() == 40000
+
+
+async def test_to_dict_and_reset(registry):
+    registry.counter("requests_total", "requests", ("method",)).inc(labels=("GET",))
+    registry.histogram("duration_seconds", bounds=(1,)).observe(0.5)
+    snapshot = registry.to_dict()
+    assert snapshot["requests_total"] == {
+        "type": "counter",
+        "description": "requests",
+        "label_names": ["method"],
+        "values": [{"labels": {"method": "GET"}, "value": 1}],
+    }
+    assert snapshot["duration_seconds"]["values"][0]["value"]["count"] == 1
+    registry.reset()
+    assert registry.to_dict()["requests_total"]["values"] == []
+    assert registry.get_metric("requests_total").get(("GET",)) == 0
+    assert registry.get_metric("unknown") is None
+
+
+async def test_to_prometheus_text(registry):
+    assert registry.to_prometheus_text() == ""
+    registry.counter("requests_total", "requests", ("path",)).inc(labels=('/a"b',))
+    registry.histogram("duration_seconds", "durations", bounds=(1, 5)).observe(3)
+    assert registry.to_prometheus_text() == (
+        "# HELP requests_total requests\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{path="/a\\"b"} 1\n'
+        "# HELP duration_seconds durations\n"
+        "# TYPE duration_seconds histogram\n"
+        'duration_seconds_bucket{le="1"} 0\n'
+        'duration_seconds_bucket{le="5"} 1\n'
+        'duration_seconds_bucket{le="+Inf"} 1\n'
+        "duration_seconds_sum 3\n"
+        "duration_seconds_count 1\n"
+    )
+
+
+async def test_export_to_file(registry, tmp_path):
+    registry.gauge("queue_depth", "depth").set(2)
+    file_path = os.path.join(tmp_path, "metrics.prom")
+    registry.export_to_file(file_path)
+    with open(file_path) as metrics_file:
+        assert metrics_file.read() == registry.to_prometheus_text()
+    assert os.listdir(tmp_path) == ["metrics.prom"]
+
+
+async def test_server(registry):
+    registry.gauge("queue_depth", "depth").set(2)
+    port = await registry.start_server()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = (await reader.read()).decode()
+        writer.close()
+        assert response.startswith("HTTP/1.1 200 OK")
+        assert response.endswith(registry.to_prometheus_text())
+    finally:
+        await registry.stop_server()
+
+
+async def test_async_job_publishes_metrics(registry):
+    with mock.patch.object(metrics_registry, "get_metrics_registry", mock.Mock(return_value=registry)):
+        async def failing_callback():
+            raise RuntimeError
+
+        job = async_job.AsyncJob(failing_callback, is_periodic=False)
+        with mock.patch.object(job.logger, "exception", mock.Mock()):
+            await job.run(force=True, wait_for_task_execution=True)
+        job.stop()
+    assert registry.get_metric("octobot_async_job_failures_total").get(("failing_callback",)) == 1
+    assert registry.get_metric("octobot_async_job_run_duration_seconds").get(("failing_callback",)).count == 1
@@ -0,0 +1,94 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import os
+import threading
+import time
+import mock
+
+import octobot_commons.sampling_profiler as sampling_profiler
+import octobot_commons.system_resources_watcher as system_resources_watcher
+
+
+def _busy_function(stop_event):
+    while not stop_event.is_set():
+        time.sleep(0.001)
+
+
+def _read_profile(file_path):
+    with open(file_path) as profile_file:
+        return [line.rsplit(" ", 1) for line in profile_file.read().splitlines()]
+
+
+def test_sample_and_dump(tmp_path):
+    prefix = os.path.join(tmp_path, "resources_profile")
+    profiler = sampling_profiler.SamplingProfiler(prefix, min_dump_interval=10)
+    stop_event = threading.Event()
+    thread = threading.Thread(target=_busy_function, args=(stop_event,), name="busy")
+    thread.start()
+    try:
+        profiler.sample()
+        profiler.sample()
+    finally:
+        stop_event.set()
+        thread.join()
+    assert profiler.samples_count == 2
+    file_path = profiler.dump()
+    assert file_path.startswith(prefix) and file_path.endswith(".collapsed")
+    stacks = _read_profile(file_path)
+    busy_stacks = [(stack, count) for stack, count in stacks if stack.startswith("busy;")]
+    assert busy_stacks
+    assert all("_busy_function (test_sampling_profiler.py" in stack for stack, _ in busy_stacks)
+    assert sum(int(count) for _, count in busy_stacks) == 2
+    # rate limited
+    profiler.sample()
+    assert profiler.dump() is None
+
+
+def test_start_stop_and_rotation(tmp_path):
+    prefix = os.path.join(tmp_path, "resources_profile")
+    profiler = sampling_profiler.SamplingProfiler(prefix, frequency=200, rotation_interval=0.02, max_files=2)
+    profiler.start()
+    assert profiler.is_running()
+    time.sleep(0.2)
+    profiler.stop()
+    assert not profiler.is_running()
+    assert profiler.samples_count > 1
+    files = os.listdir(tmp_path)
+    # rotated files, only the most recent ones are kept
+    assert len(files) == 2
+    assert all(file.startswith("resources_profile_") for file in files)
+
+
+def test_get_profile_file_path_prefix():
+    assert sampling_profiler.get_profile_file_path_prefix(os.path.join("a", "resources.csv")) == \
+        os.path.join("a", "resources_profile")
+
+
+def test_system_resources_watcher_profiler(tmp_path):
+    watcher = system_resources_watcher.SystemResourcesWatcher(
+        False, False, os.path.join(tmp_path, "resources.csv"), profile_cpu=True
+    )
+    assert watcher.profiler.file_path_prefix == os.path.join(tmp_path, "resources_profile")
+    with mock.patch.object(watcher.profiler, "dump", mock.Mock(return_value="path")) as dump_mock:
+        assert watcher.dump_profile() == "path"
+        dump_mock.assert_called_once_with()
+    assert system_resources_watcher.SystemResourcesWatcher(
+        False, False, "resources.csv"
+    ).dump_profile() is None
+    # no output file to write profiles next to
+    watcher = system_resources_watcher.SystemResourcesWatcher(False, False, None, profile_cpu=True)
+    assert watcher.profiler is None
+    assert watcher.dump_profile() is None
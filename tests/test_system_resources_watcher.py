@@ -0,0 +1,155 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import json
+import os
+import threading
+import tracemalloc
+import mock
+
+import octobot_commons.constants as commons_constants
+import octobot_commons.os_util as os_util
+import octobot_commons.system_resources_watcher as system_resources_watcher
+import octobot_commons.databases as databases
+
+
+def _read_resources(file_path):
+    with open(file_path) as resources_file:
+        return [json.loads(line) for line in resources_file.read().splitlines()]
+
+
+def test_get_sampled_objects_count():
+    counts = system_resources_watcher.get_sampled_objects_count(stride=1, top_types=3)
+    assert len(counts) == 3
+    assert all(count > 0 for count in counts.values())
+    assert list(counts.values()) == sorted(counts.values(), reverse=True)
+
+
+def test_memory_containers():
+    sizes = system_resources_watcher.get_memory_containers_sizes()
+    assert {"logs_database", "caches", "global_shared_memory_storage"} <= set(sizes)
+    storage = databases.GlobalSharedMemoryStorage.instance()
+    try:
+        storage["test_memory_containers"] = 1
+        assert system_resources_watcher.get_memory_containers_sizes()[
+            "global_shared_memory_storage"
+        ] == len(storage)
+    finally:
+        storage.clear()
+    try:
+        system_resources_watcher.register_memory_container("test", lambda: 3)
+        assert system_resources_watcher.get_memory_containers_sizes()["test"] == 3
+    finally:
+        system_resources_watcher._MEMORY_CONTAINERS.pop("test")
+
+
+def test_watch_memory_tracemalloc_window():
+    watcher = system_resources_watcher.SystemResourcesWatcher(False, True, "resources")
+    try:
+        details = watcher._watch_memory(1)
+        assert details["objects"]
+        assert "logs_database" in details["containers"]
+        assert details["tracemalloc"] is False
+        assert watcher.reference_process_ram == 1
+        # growth below threshold: no tracing
+        watcher._watch_memory(1.01)
+        assert not tracemalloc.is_tracing()
+        # growth above threshold: tracing until next call
+        growth = 1 + commons_constants.MEMORY_WATCHER_GROWTH_THRESHOLD_PERCENT / 100
+        assert watcher._watch_memory(growth + 0.1)["tracemalloc"] is False
+        assert tracemalloc.is_tracing()
+        assert watcher.first_memory_snapshot is not None
+        with mock.patch.object(watcher, "_log_memory", mock.Mock()) as _log_memory_mock:
+            assert watcher._watch_memory(growth + 0.2)["tracemalloc"] is True
+            _log_memory_mock.assert_called_once_with()
+        assert not tracemalloc.is_tracing()
+        assert watcher.first_memory_snapshot is None
+        assert watcher.reference_process_ram == growth + 0.2
+    finally:
+        watcher._stop_tracemalloc()
+
+
+def test_watch_memory_objects_count_interval():
+    watcher = system_resources_watcher.SystemResourcesWatcher(False, True, "resources")
+    try:
+        assert watcher._watch_memory(1)["objects"]
+        for _ in range(commons_constants.MEMORY_WATCHER_OBJECTS_COUNT_CALLS_INTERVAL - 1):
+            assert "objects" not in watcher._watch_memory(1)
+        assert watcher._watch_memory(1)["objects"]
+        assert "objects" not in watcher._watch_memory(1)
+    finally:
+        watcher._stop_tracemalloc()
+
+
+def test_memory_containers_from_loop():
+    watcher = system_resources_watcher.SystemResourcesWatcher(False, True, "resources")
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever)
+    loop_thread.start()
+    calling_threads = []
+    try:
+        watcher._loop = loop
+        system_resources_watcher.register_memory_container(
+            "test", lambda: calling_threads.append(threading.current_thread()) or 3
+        )
+        assert watcher._get_memory_containers_sizes()["test"] == 3
+        # computed from the event loop thread
+        assert calling_threads == [loop_thread]
+    finally:
+        system_resources_watcher._MEMORY_CONTAINERS.pop("test")
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join()
+        loop.close()
+
+
+def test_dump_resources(tmp_path):
+    output_file = os.path.join(tmp_path, "resources.jsonl")
+    with open(output_file, "w") as previous_file:
+        previous_file.write("previous run\n")
+    watcher = system_resources_watcher.SystemResourcesWatcher(True, False, output_file)
+    with mock.patch.object(
+        os_util, "get_cpu_and_ram_usage", mock.Mock(return_value=(10, 20, 2, 0.5))
+    ):
+        watcher._exec_log_used_resources()
+        watcher._exec_log_used_resources()
+    resources = _read_resources(output_file)
+    assert len(resources) == 2
+    assert resources[0]["used_cpu_percent"] == 10
+    assert resources[0]["process_used_ram"] == 0.5
+    assert "objects" not in resources[0]
+    watcher.watch_ram = True
+    with mock.patch.object(
+        os_util, "get_cpu_and_ram_usage", mock.Mock(return_value=(10, 20, 2, 0.5))
+    ):
+        watcher._exec_log_used_resources()
+    watcher.stop()
+    assert watcher._output_file_handle is None
+    resources = _read_resources(output_file)
+    assert len(resources) == 3
+    assert resources[2]["objects"]
+    assert resources[2]["tracemalloc"] is False
+    assert "caches" in resources[2]["containers"]
+
+
+def test_dump_resources_after_stop(tmp_path):
+    output_file = os.path.join(tmp_path, "resources.jsonl")
+    watcher = system_resources_watcher.SystemResourcesWatcher(True, False, output_file)
+    watcher._dump_resources({"time": 1})
+    watcher.stop()
+    # a run still in flight when stopping: the output file is not reopened
+    watcher._dump_resources({"time": 2})
+    assert watcher._output_file_handle is None
+    assert _read_resources(output_file) == [{"time": 1}]
@@ -0,0 +1,60 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import numpy as np
+
+import octobot_commons.enums as enums
+import octobot_commons.time_frame_alignment as time_frame_alignment
+import octobot_commons.time_frame_manager as time_frame_manager
+
+TIME_FRAMES = [enums.TimeFrames.FIVE_MINUTES, enums.TimeFrames.ONE_HOUR, enums.TimeFrames.FOUR_HOURS]
+# 1m timestamps over 10 hours, starting at 2023-11-14 22:00
+TIMESTAMPS = np.arange(1699999200, 1699999200 + 10 * 3600, 60)
+
+
+def test_align_timestamps():
+    aligned = time_frame_alignment.align_timestamps(TIMESTAMPS, TIME_FRAMES)
+    assert aligned.shape == (3, len(TIMESTAMPS))
+    for time_frame, time_frame_starts in zip(TIME_FRAMES, aligned):
+        assert time_frame_starts.tolist() == [
+            time_frame_manager.get_last_timeframe_time(time_frame, timestamp) for timestamp in TIMESTAMPS
+        ]
+    assert time_frame_alignment.align_timestamps(TIMESTAMPS, []).shape == (0, len(TIMESTAMPS))
+    assert time_frame_alignment.get_group_indices(TIMESTAMPS, []).shape == (0, len(TIMESTAMPS))
+
+
+def test_get_group_indices():
+    group_indices = time_frame_alignment.get_group_indices(TIMESTAMPS, TIME_FRAMES)
+    five_minutes, one_hour, four_hours = group_indices
+    assert five_minutes[:11].tolist() == [0] * 5 + [1] * 5 + [2]
+    assert five_minutes[-1] == 10 * 12 - 1
+    assert one_hour[-1] == 9
+    # 22:00 to 00:00, 00:00 to 04:00, 04:00 to 08:00
+    assert four_hours.tolist() == [0] * 120 + [1] * 240 + [2] * 240
+    assert time_frame_alignment.get_group_start_indices(four_hours).tolist() == [0, 120, 360]
+    assert time_frame_alignment.get_group_indices(np.array([]), TIME_FRAMES).shape == (3, 0)
+
+
+def test_resample_candles():
+    candles = np.array([
+        [timestamp, index, index + 2, index - 2, index + 1, 10]
+        for index, timestamp in enumerate(TIMESTAMPS[57:65], 1)
+    ], dtype=np.float64)
+    resampled = time_frame_alignment.resample_candles(candles, enums.TimeFrames.ONE_HOUR)
+    assert resampled.tolist() == [
+        [1699999200, 1, 5, -1, 4, 30],
+        [1700002800, 4, 10, 2, 9, 50],
+    ]
+    assert time_frame_alignment.resample_candles(np.empty((0, 6)), enums.TimeFrames.ONE_HOUR).shape == (0, 6)
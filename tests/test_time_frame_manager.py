@@ -13,10 +13,14 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import numpy as np
+import pytest
+
 from octobot_commons.enums import TimeFrames
 from octobot_commons.tests.test_config import load_test_config
 from octobot_commons.time_frame_manager import get_config_time_frame, parse_time_frames, find_min_time_frame, \
-    get_previous_time_frame, get_display_time_frame, sort_time_frames
+    get_previous_time_frame, get_display_time_frame, sort_time_frames, is_time_frame, get_time_frame_seconds, \
+    get_lower_time_frame, get_higher_time_frame, get_last_timeframe_time, get_last_timeframe_times
 
 
 def test_get_config_time_frame():
@@ -56,3 +60,41 @@ def test_get_previous_time_frame():
 def test_get_display_time_frame():
     assert get_display_time_frame(load_test_config(), TimeFrames.ONE_MONTH) == TimeFrames.ONE_DAY
     assert get_display_time_frame(load_test_config(), TimeFrames.FOUR_HOURS) == TimeFrames.FOUR_HOURS
+
+
+def test_find_min_time_frame_with_strings_and_min_time_frame():
+    assert find_min_time_frame([]) == TimeFrames.ONE_MINUTE
+    assert find_min_time_frame(["4h", "1d", "plop", "15m"]) == TimeFrames.FIFTEEN_MINUTES
+    assert find_min_time_frame(["4h", "1d", "15m"], TimeFrames.ONE_HOUR) == TimeFrames.FOUR_HOURS
+    assert find_min_time_frame(["4h", "1d", "15m"], TimeFrames.ONE_WEEK) == TimeFrames.ONE_WEEK
+
+
+def test_is_time_frame():
+    assert is_time_frame("1h") is True
+    assert is_time_frame(TimeFrames.ONE_HOUR) is True
+    assert is_time_frame("1z") is False
+    assert is_time_frame(None) is False
+    assert is_time_frame([]) is False
+
+
+def test_sort_time_frames_with_strings():
+    assert sort_time_frames(["1d", "1m"], reverse=True) == [TimeFrames.ONE_DAY, TimeFrames.ONE_MINUTE]
+    with pytest.raises(ValueError):
+        sort_time_frames(["1d", "1z"])
+
+
+def test_time_frames_tables():
+    assert get_time_frame_seconds(TimeFrames.ONE_HOUR) == 3600
+    assert get_lower_time_frame(TimeFrames.ONE_HOUR) is TimeFrames.THIRTY_MINUTES
+    assert get_lower_time_frame(TimeFrames.ONE_MINUTE) is None
+    assert get_higher_time_frame(TimeFrames.ONE_HOUR) is TimeFrames.TWO_HOURS
+    assert get_higher_time_frame(TimeFrames.ONE_YEAR) is None
+
+
+def test_get_last_timeframe_times():
+    timestamps = np.array([1700000000, 1700003599, 1700003600, 1700005000.5])
+    expected = [get_last_timeframe_time(TimeFrames.ONE_HOUR, timestamp) for timestamp in timestamps]
+    assert get_last_timeframe_times(TimeFrames.ONE_HOUR, timestamps).tolist() == expected
+    assert get_last_timeframe_times(TimeFrames.ONE_HOUR, [3601, 7300]).tolist() == [3600, 7200]
+    int_timestamps = np.array([3601, 7300], dtype=np.int64)
+    assert get_last_timeframe_times(TimeFrames.ONE_HOUR, int_timestamps).dtype == np.int64
@@ -146,3 +146,52 @@ def test_get_nested_children_with_path():
         ("test-string", ["test", "test2", "test3"]),
         ("test-string_2", ["test", "test2", "test3_2"])
     ]
+
+
+def test_base_tree_path_index():
+    base_tree = BaseTree(use_path_index=True)
+    base_tree.set_node_at_path("test-string", "test-type", ["test", "test2", "test3"])
+    base_tree.set_node_at_path("test-string_2", None, ["test", "test2", "test3_2"])
+    node = base_tree.get_node(["test", "test2", "test3"])
+    assert base_tree._nodes_by_path[("test", "test2", "test3")] is node
+    # indexed on first lookup
+    assert ("test", "test2") not in base_tree._nodes_by_path
+    parent = base_tree.get_node(["test", "test2"])
+    assert base_tree._nodes_by_path[("test", "test2")] is parent
+    assert base_tree.get_or_create_node(("test", "test2")) is parent
+    with pytest.raises(NodeExistsError):
+        base_tree.get_node(["test", "test2", "test4"])
+    assert ("test", "test2", "test4") not in base_tree._nodes_by_path
+
+    # deleting a node removes its children from the index
+    assert base_tree.delete_node(["test", "test2"]) is parent
+    assert base_tree._nodes_by_path == {}
+    with pytest.raises(NodeExistsError):
+        base_tree.get_node(["test", "test2", "test3"])
+    new_node = base_tree.get_or_create_node(["test", "test2", "test3"])
+    assert new_node is not node
+    assert base_tree.get_node(["test", "test2", "test3"]) is new_node
+
+    # relative delete
+    test_node = base_tree.get_node(["test"])
+    base_tree.delete_node(["test2", "test3"], starting_node=test_node)
+    with pytest.raises(NodeExistsError):
+        base_tree.get_node(["test", "test2", "test3"])
+    assert base_tree.get_node(["test"]) is test_node
+
+    base_tree.clear()
+    assert base_tree._nodes_by_path == {}
+    with pytest.raises(NodeExistsError):
+        base_tree.get_node(["test"])
+
+
+def test_get_nested_children_with_path_with_path_index():
+    base_tree = BaseTree(use_path_index=True)
+    base_tree.set_node_at_path("test-string", "test-type", ["test", "test2", "test3"])
+    base_tree.set_node_at_path("test-string_4", None, ["test", "test3"])
+    assert [(n.node_value, p) for n, p in base_tree.get_nested_children_with_path()] == [
+        ("test-string", ["test", "test2", "test3"]),
+        ("test-string_4", ["test", "test3"])
+    ]
+    with pytest.raises(NodeExistsError):
+        list(base_tree.get_nested_children_with_path(["plop"]))
@@ -0,0 +1,88 @@
+#  Drakkar-Software OctoBot-Commons
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import mock
+import pytest
+
+import octobot_commons.tree as tree
+
+BOT_ID = "bot_id"
+
+
+@pytest.fixture
+def event_provider():
+    provider = tree.EventProvider()
+    yield provider
+    provider.remove_event_tree(BOT_ID)
+
+
+def _paths():
+    return [
+        tree.get_exchange_path("binance", "ohlcv", symbol, time_frame)
+        for symbol in ("BTC/USDT", "ETH/USDT")
+        for time_frame in ("1h", "4h")
+    ]
+
+
+def test_trigger_events(event_provider):
+    paths = _paths()
+    for path in paths:
+        event_provider.create_event_at_path(BOT_ID, path)
+    event_provider.trigger_events(BOT_ID, paths[:-1])
+    assert all(event_provider.get_or_create_event(BOT_ID, path).is_triggered() for path in paths[:-1])
+    assert not event_provider.get_or_create_event(BOT_ID, ["binance"]).is_triggered()
+    event_provider.trigger_events(BOT_ID, paths[-1:])
+    assert event_provider.get_or_create_event(BOT_ID, ["binance"]).is_triggered()
+
+    # missing events
+    event_provider.trigger_events(BOT_ID, [["kucoin", "ohlcv"]], allow_creation=False)
+    with pytest.raises(tree.NodeExistsError):
+        event_provider.get_or_create_event(BOT_ID, ["kucoin", "ohlcv"], allow_creation=False)
+    event_provider.trigger_events(BOT_ID, [["kucoin", "ohlcv"], paths[0]])
+    assert event_provider.get_or_create_event(BOT_ID, ["kucoin", "ohlcv"], allow_creation=False).is_triggered()
+    assert event_provider.get_or_create_event(BOT_ID, []).is_triggered()
+
+
+def test_trigger_events_keeps_creation_order(event_provider):
+    event_provider.create_event_at_path(BOT_ID, ["a", "x"])
+    event_provider.create_event_at_path(BOT_ID, ["a", "y"])
+    event_provider.get_or_create_event(BOT_ID, ["a", "x"]).trigger()
+    # ["a"] is triggered before ["a", "z"] is created: creating ["a", "z"] updates ["a"] from
+    # its children, as when calling trigger_event on each path
+    event_provider.trigger_events(BOT_ID, [["a"], ["a", "z"]])
+    assert not event_provider.get_or_create_event(BOT_ID, ["a"]).is_triggered()
+    assert event_provider.get_or_create_event(BOT_ID, ["a", "z"]).is_triggered()
+    assert not event_provider.get_or_create_event(BOT_ID, ["a", "y"]).is_triggered()
+
+
+def test_deferred_triggers(event_provider):
+    paths = _paths()
+    for path in paths:
+        event_provider.create_event_at_path(BOT_ID, path)
+    with mock.patch.object(tree.EventTree, "trigger_nodes", autospec=True, side_effect=tree.EventTree.trigger_nodes) \
+            as trigger_nodes_mock:
+        with event_provider.deferred_triggers(BOT_ID):
+            event_provider.trigger_event(BOT_ID, paths[0])
+            with event_provider.deferred_triggers(BOT_ID):
+                event_provider.trigger_events(BOT_ID, paths[1:3])
+            event_provider.trigger_event(BOT_ID, paths[3])
+            event_provider.trigger_event(BOT_ID, ["kucoin"], allow_creation=False)
+            assert not event_provider.get_or_create_event(BOT_ID, paths[0]).is_triggered()
+            trigger_nodes_mock.assert_not_called()
+        trigger_nodes_mock.assert_called_once()
+    assert all(event_provider.get_or_create_event(BOT_ID, path).is_triggered() for path in paths)
+    assert event_provider.get_or_create_event(BOT_ID, []).is_triggered()
+    with pytest.raises(tree.NodeExistsError):
+        event_provider.get_or_create_event(BOT_ID, ["kucoin"], allow_creation=False)
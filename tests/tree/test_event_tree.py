@@ -14,6 +14,8 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 import asyncio
+import random
+import mock
 import pytest
 
 import octobot_commons.tree as tree
@@ -159,3 +161,165 @@ def test_event_tree_node_get_child_key(event_tree_node):
     other = tree.EventTreeNode()
     event_tree_node.children["dd"] = other
     assert event_tree_node.get_child_key(other) == "dd"
+
+
+def test_event_tree_untriggered_children_count(event_tree):
+    event_tree.create_node_at_path(["a", "1"], False)
+    event_tree.create_node_at_path(["a", "2"], False)
+    event_tree.create_node_at_path(["b", "1"], True)
+    node_a = event_tree.get_node(["a"])
+    assert node_a._untriggered_children_count == 2
+    assert event_tree.root._untriggered_children_count == 1
+    assert not event_tree.root.is_triggered()
+    event_tree.get_node(["a", "1"]).trigger()
+    assert node_a._untriggered_children_count == 1
+    assert not node_a.is_triggered()
+    event_tree.get_node(["a", "2"]).trigger()
+    assert node_a._untriggered_children_count == 0
+    assert node_a.is_triggered()
+    assert event_tree.root._untriggered_children_count == 0
+    assert event_tree.root.is_triggered()
+    # triggering again does not change counts
+    event_tree.get_node(["a", "2"]).trigger()
+    assert node_a._untriggered_children_count == 0
+    event_tree.get_node(["a", "2"]).clear()
+    assert node_a._untriggered_children_count == 1
+    assert event_tree.root._untriggered_children_count == 1
+    assert not event_tree.root.is_triggered()
+
+    # pop untriggered child
+    event_tree.delete_node(["a", "2"])
+    assert node_a._untriggered_children_count == 0
+    assert node_a.is_triggered()
+    assert event_tree.root.is_triggered()
+
+    # replace triggered child by untriggered child
+    node_a.set_child("1", tree.EventTreeNode(triggered=False))
+    assert node_a._untriggered_children_count == 1
+    assert not event_tree.root.is_triggered()
+    # recount
+    node_a.on_child_change()
+    assert node_a._untriggered_children_count == 1
+
+
+def test_event_tree_get_path_to_root_uses_parent_keys(event_tree):
+    event_tree.create_node_at_path(["a", "b", "c"], False)
+    node = event_tree.get_node(["a", "b", "c"])
+    with mock.patch.object(tree.EventTreeNode, "get_child_key", mock.Mock()) as get_child_key_mock:
+        assert node.get_path_to_root() == ["a", "b", "c"]
+        get_child_key_mock.assert_not_called()
+
+
+def test_event_tree_node_trigger_does_not_build_path_when_not_debugging(event_tree):
+    event_tree.create_node_at_path(["a", "b"], False)
+    node = event_tree.get_node(["a", "b"])
+    with mock.patch.object(node._logger.logger, "isEnabledFor", mock.Mock(return_value=False)), \
+         mock.patch.object(tree.EventTreeNode, "get_path_to_root", mock.Mock()) as get_path_to_root_mock:
+        node.trigger()
+        node.clear()
+        get_path_to_root_mock.assert_not_called()
+    with mock.patch.object(node._logger.logger, "isEnabledFor", mock.Mock(return_value=True)), \
+         mock.patch.object(tree.EventTreeNode, "get_path_to_root", mock.Mock(return_value=["a", "b"])) as get_path_to_root_mock:
+        node.trigger()
+        # called for b and its triggered parents
+        assert get_path_to_root_mock.call_count == 3
+
+
+def test_event_tree_trigger_nodes(event_tree):
+    paths = [["a", str(i), tf] for i in range(3) for tf in ("1h", "4h")]
+    for path in paths:
+        event_tree.create_node_at_path(path, False)
+    node_a = event_tree.get_node(["a"])
+    with mock.patch.object(asyncio.Event, "set", autospec=True, side_effect=asyncio.Event.set) as set_mock:
+        event_tree.trigger_nodes(paths[:-1])
+        # only the 5 given nodes and their 2 fully triggered parents are set
+        assert set_mock.call_count == 5 + 2
+        assert not node_a.is_triggered()
+        assert node_a._untriggered_children_count == 1
+        set_mock.reset_mock()
+        event_tree.trigger_nodes([paths[-1]])
+        # last node, its parent, "a" and root
+        assert set_mock.call_count == 4
+    assert node_a.is_triggered()
+    assert event_tree.root.is_triggered()
+    assert event_tree.root._untriggered_children_count == 0
+    event_tree.get_node(paths[0]).clear()
+    assert not event_tree.root.is_triggered()
+
+    with pytest.raises(tree.NodeExistsError):
+        event_tree.trigger_nodes([paths[0], ["unknown"]])
+    # already triggered node is still propagated
+    assert event_tree.root.is_triggered()
+
+
+def _get_triggered_states(event_tree):
+    return {
+        "|".join(path): node.is_triggered()
+        for node, path in event_tree.get_nested_children_with_path(select_leaves_only=False)
+    }
+
+
+def test_event_tree_trigger_nodes_same_as_sequential_triggers():
+    for paths in (
+        [["a", "x"], ["a"]],
+        [["a"], ["a", "x"]],
+        [["a", "x"], ["a"], ["a", "y"]],
+        [["a", "x", "1"], ["a"], ["b"]],
+        [["a"], ["a", "x", "1"], ["a", "y"], ["b"]],
+    ):
+        batch_tree = tree.EventTree()
+        sequential_tree = tree.EventTree()
+        for event_tree in (batch_tree, sequential_tree):
+            for path in (["a", "x", "1"], ["a", "x", "2"], ["a", "y"], ["b"]):
+                event_tree.create_node_at_path(path, False)
+        batch_tree.trigger_nodes(paths)
+        for path in paths:
+            sequential_tree.get_node(path).trigger()
+        assert _get_triggered_states(batch_tree) == _get_triggered_states(sequential_tree), paths
+    # explicitly triggered inner node
+    event_tree = tree.EventTree()
+    event_tree.create_node_at_path(["a", "x"], False)
+    event_tree.create_node_at_path(["a", "y"], False)
+    event_tree.trigger_nodes([["a", "x"], ["a"]])
+    assert event_tree.get_node(["a"]).is_triggered()
+    assert event_tree.root.is_triggered()
+    # reviewed case: a is explicitly triggered after its children changes
+    batch_tree = tree.EventTree()
+    sequential_tree = tree.EventTree()
+    paths = [["a", "x", "1"], ["a"], ["a", "x"]]
+    for event_tree in (batch_tree, sequential_tree):
+        for path in (["a", "x", "1"], ["a", "x", "2"], ["a", "y", "1"]):
+            event_tree.create_node_at_path(path, False)
+        event_tree.get_node(["a", "x", "2"]).trigger()
+    batch_tree.trigger_nodes(paths)
+    for path in paths:
+        sequential_tree.get_node(path).trigger()
+    assert batch_tree.get_node(["a"]).is_triggered()
+    assert _get_triggered_states(batch_tree) == _get_triggered_states(sequential_tree)
+
+
+def test_event_tree_trigger_nodes_same_as_sequential_triggers_on_random_trees():
+    for seed in range(3000):
+        rand = random.Random(seed)
+        leaves = [
+            [rand.choice("ab"), rand.choice("xyz"), rand.choice("123")][:rand.randint(1, 3)]
+            for _ in range(rand.randint(1, 8))
+        ]
+        all_paths = sorted({tuple(leaf[:depth]) for leaf in leaves for depth in range(1, len(leaf) + 1)})
+        initial_triggers = rand.sample(all_paths, rand.randint(0, len(all_paths)))
+        paths = [list(rand.choice(all_paths)) for _ in range(rand.randint(1, 8))]
+        batch_tree = tree.EventTree()
+        sequential_tree = tree.EventTree()
+        for event_tree in (batch_tree, sequential_tree):
+            for leaf in leaves:
+                event_tree.create_node_at_path(leaf, False)
+            for path in initial_triggers:
+                event_tree.get_node(list(path)).trigger()
+        batch_tree.trigger_nodes(paths)
+        for path in paths:
+            sequential_tree.get_node(path).trigger()
+        assert _get_triggered_states(batch_tree) == _get_triggered_states(sequential_tree), seed
+        for node, _ in batch_tree.get_nested_children_with_path(select_leaves_only=False):
+            assert node._untriggered_children_count == sum(
+                1 for child in node.children.values() if not child.is_triggered()
+            ), seed